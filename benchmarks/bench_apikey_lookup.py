@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""
+Benchmark: API key lookups straight from Redis vs through ApiKeyCache.
+
+Requires a reachable Redis configured through the usual REDIS_* variables:
+
+    PYTHONPATH=src/skelv2 python benchmarks/bench_apikey_lookup.py [iterations]
+"""
+
+__updated__ = "2026-10-17 09:55:03"
+
+import sys
+import time
+
+from config import get_config
+from db import create_redis_client, create_redis_pool, get_apikey_metadata
+from db.apikey_cache import ApiKeyCache
+
+BENCH_KEY = "bench-apikey"
+
+
+def _run(label: str, lookup, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        lookup(BENCH_KEY)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {iterations / elapsed:>12,.0f} lookups/s  {elapsed / iterations * 1e6:>8.2f} us/lookup")
+    return elapsed
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    config = get_config()
+    r = create_redis_client(create_redis_pool(config))
+    r.hset(
+        f"apikey:{BENCH_KEY}",
+        mapping={
+            "customer_id": "bench",
+            "tier": "pro",
+            "rate_limit": "800",
+            "quota_daily": "10000",
+            "disabled": "0",
+            "allowed_endpoints": '["/hello", "/calc"]',
+            "metadata": '{"country": "ES"}',
+        },
+    )
+    try:
+        direct = _run("redis", lambda key: get_apikey_metadata(r, key), iterations)
+        cache = ApiKeyCache(lambda key: get_apikey_metadata(r, key))
+        cached = _run("cached", cache.get, iterations)
+        print(f"speed-up     {direct / cached:>12.1f}x  stats={cache.stats()}")
+    finally:
+        r.delete(f"apikey:{BENCH_KEY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""
+Benchmark: JSON log encoding, original encoder vs JsonStdoutHandler.format_record.
+
+No backing services needed:
+
+    PYTHONPATH=src/skelv2 python benchmarks/bench_log_encoder.py [records]
+"""
+
+__updated__ = "2026-10-17 15:19:30"
+
+import json
+import logging
+import re
+import sys
+import time
+from datetime import datetime, timezone
+
+from stdoutlog import formatter
+from stdoutlog.formatter import JsonStdoutHandler
+
+ANSI_ESCAPE_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+WERKZEUG_REQUEST_RE = re.compile(r"\"([A-Z]+ .+?)\"")
+
+
+def legacy_format(handler: JsonStdoutHandler, record: logging.LogRecord) -> str:
+    """The encoder as it was before the rewrite, kept here for comparison."""
+    ts = datetime.fromtimestamp(record.created, tz=timezone.utc)
+    timestamp = ts.isoformat().replace("+00:00", "Z")
+    message = ANSI_ESCAPE_RE.sub("", record.getMessage())
+    if record.name == "werkzeug":
+        message = WERKZEUG_REQUEST_RE.sub(r"[\1] ", message)
+    log = {
+        "timestamp": timestamp,
+        "level": record.levelname,
+        "logger": record.name,
+        "message": message,
+        "service": handler.service_name,
+        "env": handler.environment,
+        "file": record.pathname,
+        "line": record.lineno,
+        "function": record.funcName,
+    }
+    request_id = getattr(record, "request_id", None)
+    if request_id is not None:
+        log["request_id"] = request_id
+    for field in (
+        "http_method",
+        "http_path",
+        "remote_ip",
+        "client_id",
+        "auth_result",
+        "reason",
+        "callsign",
+        "canonical_cid",
+        "pg_status",
+        "redis_status",
+    ):
+        value = getattr(record, field, None)
+        if value is not None:
+            log[field] = value
+    duration_ms = getattr(record, "duration_ms", None)
+    if duration_ms is not None:
+        log["duration_ms"] = duration_ms
+    return json.dumps(log, ensure_ascii=False) + "\n"
+
+
+def make_records(count: int) -> list:
+    logger = logging.getLogger("util.decorators")
+    records = []
+    for i in range(count):
+        record = logger.makeRecord(
+            logger.name,
+            logging.DEBUG,
+            __file__,
+            42,
+            "API key validated for customer %s",
+            (f"c{i % 100:03d}",),
+            None,
+            func="wrapper",
+            extra={
+                "request_id": "0f8e7c1a-4a1b-4f9e-9d5c-2b7f1e3a9c10",
+                "http_method": "GET",
+                "http_path": "/ready",
+                "remote_ip": "10.0.0.1",
+                "redis_status": "ok",
+            },
+        )
+        # Records arrive in bursts within the same second, as under load
+        record.created = 1760000000 + i / count
+        records.append(record)
+    return records
+
+
+def _run(label: str, encode, records: list) -> float:
+    start = time.perf_counter()
+    for record in records:
+        encode(record)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {len(records) / elapsed:>12,.0f} records/s")
+    return elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    handler = JsonStdoutHandler(service_name="skelv2-service", environment="prod")
+    records = make_records(count)
+
+    before = _run("before", lambda r: legacy_format(handler, r), records)
+    backend = formatter.orjson
+    formatter.orjson = None
+    after_json = _run("after (json)", handler.format_record, records)
+    formatter.orjson = backend
+    if backend is not None:
+        after_orjson = _run("after (orjson)", handler.format_record, records)
+        print(f"speed-up {before / after_json:.2f}x (json), {before / after_orjson:.2f}x (orjson)")
+    else:
+        print(f"speed-up {before / after_json:.2f}x (json); install orjson for the fast backend")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""
+Benchmark: single-row INSERTs vs multi-row insert_many vs COPY (copy_rows).
+
+Requires a reachable Postgres configured through the usual PG_* variables;
+rows go to a temporary table:
+
+    PYTHONPATH=src/skelv2 python benchmarks/bench_pg_bulk.py [rows]
+"""
+
+__updated__ = "2026-10-17 22:36:44"
+
+import datetime
+import sys
+import time
+
+from config import get_config
+from db import create_pg_pool
+from db.pg_bulk import copy_rows, insert_many
+
+COLUMNS = ("id", "callsign", "band", "logged_at", "details")
+
+
+def _rows(count: int):
+    now = datetime.datetime(2026, 10, 17, tzinfo=datetime.timezone.utc)
+    for i in range(count):
+        yield (i, f"EA{i % 10}ABC", "20m", now, '{"mode": "FT8"}')
+
+
+def _run(label: str, conn, load, count: int) -> float:
+    with conn.cursor() as cursor:
+        cursor.execute("TRUNCATE bench_qso;")
+        start = time.perf_counter()
+        load(cursor)
+        conn.commit()
+        elapsed = time.perf_counter() - start
+        cursor.execute("SELECT count(*) FROM bench_qso;")
+        assert cursor.fetchone()[0] == count
+    print(f"{label:<12} {count / elapsed:>12,.0f} rows/s  {elapsed:>8.3f} s")
+    return elapsed
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    pg_pool = create_pg_pool(get_config())
+    with pg_pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE bench_qso (id int PRIMARY KEY, callsign text, band text, "
+                "logged_at timestamptz, details jsonb);"
+            )
+        conn.commit()
+
+        def single(cursor):
+            for row in _rows(count):
+                cursor.execute("INSERT INTO bench_qso VALUES (%s, %s, %s, %s, %s);", row)
+
+        def paged(cursor):
+            insert_many(cursor, "bench_qso", COLUMNS, _rows(count), page_size=1000)
+
+        def copied(cursor):
+            copy_rows(cursor, "bench_qso", COLUMNS, _rows(count))
+
+        baseline = _run("single-row", conn, single, count)
+        batched = _run("insert_many", conn, paged, count)
+        copy = _run("copy_rows", conn, copied, count)
+        print(f"speed-up     insert_many {baseline / batched:.1f}x  copy_rows {baseline / copy:.1f}x")
+    pg_pool.closeall()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""
+Benchmark: ad-hoc vs server-side prepared execution of a catalog join.
+
+Requires a reachable Postgres configured through the usual PG_* variables:
+
+    PYTHONPATH=src/skelv2 python benchmarks/bench_pg_statements.py [iterations]
+"""
+
+__updated__ = "2026-10-17 21:31:40"
+
+import sys
+import time
+
+from config import get_config
+from db import create_pg_pool
+from db.pg_statements import PreparedStatements
+
+BENCH_SQL = (
+    "SELECT c.relname, n.nspname, count(a.attnum) "
+    "FROM pg_class c "
+    "JOIN pg_namespace n ON n.oid = c.relnamespace "
+    "JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 "
+    "LEFT JOIN pg_index i ON i.indrelid = c.oid "
+    "WHERE c.relname = %s "
+    "GROUP BY c.relname, n.nspname"
+)
+BENCH_PARAMS = ("pg_class",)
+
+
+def _run(label: str, execute, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        execute()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {iterations / elapsed:>12,.0f} queries/s  {elapsed / iterations * 1e6:>8.2f} us/query")
+    return elapsed
+
+
+def _planning_ms(cursor, sql: str, params: tuple) -> float:
+    cursor.execute(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}", params)
+    return float(cursor.fetchone()[0][0]["Planning Time"])
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    pg_pool = create_pg_pool(get_config())
+    statements = PreparedStatements()
+    statement = statements.register("bench_catalog_join", BENCH_SQL)
+
+    with pg_pool.connection() as conn:
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+
+            def adhoc():
+                cursor.execute(BENCH_SQL, BENCH_PARAMS)
+                cursor.fetchall()
+
+            def prepared():
+                statements.execute(cursor, "bench_catalog_join", BENCH_PARAMS)
+                cursor.fetchall()
+
+            plain = _run("ad-hoc", adhoc, iterations)
+            fast = _run("prepared", prepared, iterations)
+            print(f"speed-up     {plain / fast:>12.2f}x  stats={statements.stats()}")
+
+            # Server-side view: planning time per execution (generic plan once cached)
+            adhoc_plan = _planning_ms(cursor, BENCH_SQL, BENCH_PARAMS)
+            prepared_plan = _planning_ms(cursor, statement.execute_sql(), statement.bind(BENCH_PARAMS))
+            print(f"planning     ad-hoc {adhoc_plan:.3f} ms  prepared {prepared_plan:.3f} ms")
+            cursor.execute(f"DEALLOCATE {statement.name};")
+    pg_pool.closeall()
+
+
+if __name__ == "__main__":
+    main()
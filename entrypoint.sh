@@ -7,7 +7,11 @@ PORT="${GUNIPORT:-$DEFAULT_PORT}"
 APP_TYPE="${APP_TYPE:-api}"
 APP_MODULE="${APP_MODULE:-skel}"
 GUNICORN_APP="${GUNICORN_APP:-${APP_MODULE}.wsgi:app}"
+# Master hooks: one shared METRICS_DIR for all workers, files of exited workers merged
+GUNICORN_CONF="${GUNICORN_CONF:-python:${APP_MODULE}.gunicorn_conf}"
 WORKER_TARGET="${WORKER_TARGET:-${APP_MODULE}.app}"
+# The app emits its own structured access log; opt back in to Gunicorn's text one
+GUNICORN_ACCESS_LOG="${GUNICORN_ACCESS_LOG:-false}"
 
 poetry_exec() {
     if command -v poetry >/dev/null 2>&1; then
@@ -20,7 +24,12 @@ poetry_exec() {
 case "$APP_TYPE" in
     api)
         echo "Starting API via Gunicorn on port $PORT"
-        exec poetry_exec gunicorn -b "0.0.0.0:${PORT}" "$GUNICORN_APP" --access-logfile=-
+        # Workers share metric files here; the master empties it on every boot
+        export METRICS_DIR="${METRICS_DIR:-/tmp/metrics}"
+        if [ "$GUNICORN_ACCESS_LOG" = "true" ]; then
+            exec poetry_exec gunicorn -c "$GUNICORN_CONF" -b "0.0.0.0:${PORT}" "$GUNICORN_APP" --access-logfile=-
+        fi
+        exec poetry_exec gunicorn -c "$GUNICORN_CONF" -b "0.0.0.0:${PORT}" "$GUNICORN_APP"
         ;;
     worker)
         echo "Starting worker process"
@@ -5,25 +5,51 @@
 
 """API package"""
 
-__updated__ = "2025-12-16 21:38:55"
+__updated__ = "2026-10-18 06:44:21"
 
 from flask import jsonify
 
+from db import create_redis_client, create_redis_pool
 from util.decorators import require_apikey
 
+from .probes import DependencyProber, pg_check, redis_check
+
+
+def build_prober(config: dict, stores: dict) -> DependencyProber:
+    """
+    Prober for the enabled dependencies that have a pool/client.
+    """
+    timeout = float(config.get("READY_CHECK_TIMEOUT", 2))
+    checks = {}
+    if config.get("PG_ENABLED", False) and stores.get("pg_pool") is not None:
+        checks["pg"] = pg_check(stores["pg_pool"], timeout)
+    if config.get("REDIS_ENABLED", False) and stores.get("redis") is not None:
+        # Own small pool: a hung Redis gives up at the deadline and frees its connection
+        probe_pool = create_redis_pool(
+            config, max_connections=2, timeout=timeout, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        checks["redis"] = redis_check(create_redis_client(probe_pool))
+    return DependencyProber(
+        checks,
+        interval=float(config.get("READY_PROBE_INTERVAL", 5)),
+        deadline=timeout,
+    )
+
 
 def register_health_routes(app, *, config: dict, stores: dict | None = None):
     """
     Register basic health/ready endpoints.
 
     - GET /health  -> simple liveness check
-    - GET /ready   -> can be extended to check DB, etc.
+    - GET /ready   -> last dependency status from the background prober
     """
     service_name = config.get("SERVICE_NAME", "micro-service")
     service_version = config.get("SERVICE_VERSION", "0.1.0")
     redis_enabled = config.get("REDIS_ENABLED", False)
     stores = stores or {}
     redis_client = stores.get("redis")
+    prober = build_prober(config, stores)
+    prober.ensure_started()
 
     def protect(handler):
         if redis_enabled and redis_client:
@@ -43,40 +69,43 @@ def register_health_routes(app, *, config: dict, stores: dict | None = None):
     @app.route("/ready", methods=["GET"])
     @protect
     def ready():
+        # Starts the prober in forked workers; afterwards only a pid comparison
+        prober.ensure_started()
+        probes = prober.snapshot()
+
         pg_status = {"enabled": bool(config.get("PG_ENABLED", False)), "status": "disabled"}
         if pg_status["enabled"]:
-            pool = stores.get("pg_pool")
-            conn = None
-            if pool is None:
+            if stores.get("pg_pool") is None:
                 pg_status["status"] = "missing_pool"
             else:
-                try:
-                    conn = pool.getconn()
-                    with conn.cursor() as cursor:
-                        cursor.execute("SELECT 1;")
-                        cursor.fetchone()
-                    pg_status["status"] = "ok"
-                except Exception as exc:  # pylint: disable=broad-except
-                    pg_status["status"] = "error"
-                    pg_status["error"] = str(exc)
-                finally:
-                    if conn:
-                        pool.putconn(conn)
+                pg_status.update(probes["pg"])
+                pg_status["pool"] = stores["pg_pool"].stats()
 
         redis_status = {
             "enabled": bool(config.get("REDIS_ENABLED", False)),
             "status": "disabled",
         }
         if redis_status["enabled"]:
-            redis_client = stores.get("redis")
-            if redis_client is None:
+            if stores.get("redis") is None:
                 redis_status["status"] = "missing_client"
             else:
-                try:
-                    redis_status["status"] = "ok" if redis_client.ping() else "error"
-                except Exception as exc:  # pylint: disable=broad-except
-                    redis_status["status"] = "error"
-                    redis_status["error"] = str(exc)
+                redis_status.update(probes["redis"])
+            redis_pool = stores.get("redis_pool")
+            if redis_pool is not None:
+                redis_status["pool"] = redis_pool.stats()
+
+            apikey_cache = stores.get("apikey_cache")
+            if apikey_cache is not None:
+                redis_status["apikey_cache"] = apikey_cache.stats()
+            apikey_breaker = stores.get("apikey_breaker")
+            if apikey_breaker is not None:
+                redis_status["apikey_breaker"] = apikey_breaker.stats()
+            apikey_filter = stores.get("apikey_filter")
+            if apikey_filter is not None:
+                redis_status["apikey_filter"] = apikey_filter.stats()
+            quota_counter = stores.get("quota_counter")
+            if quota_counter is not None:
+                redis_status["quota"] = quota_counter.stats()
 
         required_keys = ("SERVICE_NAME", "SERVICE_VERSION", "SERVICE_ENV")
         missing_keys = [key for key in required_keys if not config.get(key)]
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""API package - Request metrics and the Prometheus /metrics endpoint"""
+
+__updated__ = "2026-10-18 09:45:10"
+
+import time
+
+from flask import Response, g, request
+
+from metrics import CONTENT_TYPE, REGISTRY, generate_latest
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests",
+    "HTTP requests handled, by Flask endpoint, method and status.",
+    ("endpoint", "method", "status"),
+)
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds, by Flask endpoint and status.",
+    ("endpoint", "status"),
+)
+PG_POOL_CONNECTIONS = REGISTRY.gauge(
+    "pg_pool_connections",
+    "Postgres pool connections per state, summed over live processes.",
+    ("state",),
+)
+REDIS_POOL_CONNECTIONS = REGISTRY.gauge(
+    "redis_pool_connections",
+    "Redis pool connections per state, summed over live processes.",
+    ("state",),
+)
+
+
+def _pool_collector(stores: dict):
+    def collect() -> None:
+        pg_pool = stores.get("pg_pool")
+        if pg_pool is not None:
+            pg_stats = pg_pool.stats()
+            PG_POOL_CONNECTIONS.labels("in_use").set(pg_stats["in_use"])
+            PG_POOL_CONNECTIONS.labels("idle").set(pg_stats["idle"])
+            PG_POOL_CONNECTIONS.labels("waiting").set(pg_stats["waiting"])
+        redis_pool = stores.get("redis_pool")
+        if redis_pool is not None:
+            redis_stats = redis_pool.stats()
+            REDIS_POOL_CONNECTIONS.labels("in_use").set(redis_stats["in_use"])
+            REDIS_POOL_CONNECTIONS.labels("idle").set(redis_stats["idle"])
+            REDIS_POOL_CONNECTIONS.labels("waiting").set(redis_stats["waiting"])
+
+    return collect
+
+
+def register_metrics_routes(app, *, config: dict, stores: dict | None = None):
+    """
+    Record per-request metrics and expose them.
+
+    - GET /metrics -> Prometheus text format, aggregated over every process
+      writing to METRICS_DIR (all gunicorn workers of this container)
+    """
+    if not config.get("METRICS_ENABLED", True):
+        return
+
+    REGISTRY.configure(config.get("METRICS_DIR") or None, float(config.get("METRICS_FLUSH_INTERVAL", 1)))
+    REGISTRY.add_collector(_pool_collector(stores or {}))
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started_at = g.get("request_started_at")
+        if started_at is None:
+            return response
+        endpoint = request.endpoint or "unmatched"
+        status = str(response.status_code)
+        HTTP_REQUESTS.labels(endpoint, request.method, status).inc()
+        duration = HTTP_REQUEST_DURATION.labels(endpoint, status)
+        if response.is_streamed:
+            # The body is produced after this hook: observe once the server closes it
+            response.call_on_close(lambda: duration.observe(time.perf_counter() - started_at))
+        else:
+            duration.observe(time.perf_counter() - started_at)
+        return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        return Response(generate_latest(REGISTRY), content_type=CONTENT_TYPE)
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""API package - Background dependency prober for /ready"""
+
+__updated__ = "2026-10-17 20:38:12"
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# A check returns normally when the dependency is healthy and raises otherwise.
+# It may also have a `cancel()` method, called from the prober thread when
+# the check misses the deadline.
+Check = Callable[[], None]
+
+
+class PgCheck:
+    """
+    `SELECT 1` on a pooled connection, bounded by a transaction-local
+    statement_timeout. `cancel()` aborts the running query so the connection
+    goes back to the pool right away instead of when the query gives up.
+    """
+
+    def __init__(self, pool, timeout: float) -> None:
+        self._pool = pool
+        self._timeout = float(timeout)
+        self._timeout_ms = max(1, int(timeout * 1000))
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def __call__(self) -> None:
+        conn = self._pool.getconn(timeout=self._timeout)
+        with self._lock:
+            self._conn = conn
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET LOCAL statement_timeout = %s;", (self._timeout_ms,))
+                cursor.execute("SELECT 1;")
+                cursor.fetchone()
+            # Ends the implicit transaction and with it the SET LOCAL
+            conn.rollback()
+        finally:
+            with self._lock:
+                self._conn = None
+            # The pool rolls back a connection left in a failed transaction
+            self._pool.putconn(conn)
+
+    def cancel(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.cancel()
+
+
+def pg_check(pool, timeout: float) -> Check:
+    return PgCheck(pool, timeout)
+
+
+def redis_check(client) -> Check:
+    """
+    `PING`; `client` should come from a pool with socket timeouts set.
+    """
+
+    def check() -> None:
+        if not client.ping():
+            raise RuntimeError("PING not acknowledged")
+
+    return check
+
+
+class DependencyProber:
+    """
+    Refresh dependency status from a background thread every `interval` seconds.
+
+    `/ready` reads `snapshot()`, which only copies the last results, so
+    probe traffic no longer scales with the number of kubelet probes.
+    Each result carries the measured latency and the age of the check; a
+    result older than `max_age` seconds (the prober is stuck) reads "stale".
+
+    All checks of a round run concurrently on a small executor under one
+    `deadline` (seconds), so a round lasts as long as its slowest check,
+    never longer than the deadline. A check that misses it reports
+    "timeout" and is cancelled; while it is still winding down, later
+    rounds report "timeout" for it instead of piling up new attempts.
+
+    The thread is (re)started lazily by `ensure_started()`, so a prober
+    created before a fork also runs in the forked worker.
+    """
+
+    def __init__(
+        self,
+        checks: dict[str, Check],
+        *,
+        interval: float = 5.0,
+        deadline: float = 2.0,
+        max_age: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.checks = dict(checks)
+        self.interval = float(interval)
+        self.deadline = float(deadline)
+        self.max_age = float(max_age) if max_age is not None else 3 * self.interval
+        self._clock = clock
+        # name -> result dict, replaced (never mutated) so readers need no lock
+        self._results: dict[str, dict] = {}
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._inflight: dict[str, Future] = {}
+
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid() or not self.checks:
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, name="ready-prober", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval)
+
+    def probe_once(self) -> None:
+        executor = self._get_executor()
+        started = self._clock()
+        futures: dict[str, Future] = {}
+        for name, check in self.checks.items():
+            previous = self._inflight.get(name)
+            if previous is not None and not previous.done():
+                self._results[name] = self._timeout_result(started, "previous check still running")
+                continue
+            futures[name] = self._inflight[name] = executor.submit(self._run_check, check)
+
+        done, _ = wait(futures.values(), timeout=self.deadline)
+        for name, future in futures.items():
+            if future in done:
+                self._results[name] = future.result()
+                continue
+            cancel = getattr(self.checks[name], "cancel", None)
+            if cancel is not None:
+                try:
+                    cancel()
+                except Exception:  # pylint: disable=broad-except
+                    logger.exception("Cancelling the %s check failed", name)
+            self._results[name] = self._timeout_result(started, f"no answer within {self.deadline}s")
+
+    def snapshot(self) -> dict[str, dict]:
+        """
+        {name: {"status", "latency_ms", "age_s"[, "error"]}} for every check.
+        """
+        now = self._clock()
+        snapshot = {}
+        for name in self.checks:
+            result = self._results.get(name)
+            if result is None:
+                snapshot[name] = {"status": "pending"}
+                continue
+            entry = {key: value for key, value in result.items() if key != "checked_at"}
+            age = now - result["checked_at"]
+            entry["age_s"] = round(age, 3)
+            if age > self.max_age:
+                entry["status"] = "stale"
+            snapshot[name] = entry
+        return snapshot
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # One worker per check: a slow check never queues behind another one
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, len(self.checks)), thread_name_prefix="ready-check"
+            )
+            self._executor_pid = os.getpid()
+            self._inflight = {}
+        return self._executor
+
+    def _timeout_result(self, started: float, error: str) -> dict:
+        now = self._clock()
+        return {
+            "status": "timeout",
+            "error": error,
+            "latency_ms": round((now - started) * 1000.0, 3),
+            "checked_at": now,
+        }
+
+    def _run_check(self, check: Check) -> dict:
+        started = self._clock()
+        result = {"status": "ok"}
+        try:
+            check()
+        except Exception as exc:  # pylint: disable=broad-except
+            result = {"status": "error", "error": str(exc)}
+        finished = self._clock()
+        result["latency_ms"] = round((finished - started) * 1000.0, 3)
+        result["checked_at"] = finished
+        return result
+
+    def _run(self) -> None:
+        stop = self._stop
+        while True:
+            try:
+                self.probe_once()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Dependency probe failed")
+            if stop.wait(self.interval):
+                return
@@ -7,17 +7,22 @@
 
 from __future__ import annotations
 
-__updated__ = "2025-12-16 20:03:18"
+__updated__ = "2026-10-18 09:44:02"
 
 import logging
 import time
-from flask import Flask, g, jsonify, url_for
+from flask import Flask, g, jsonify, request, url_for
 
-from db import init_datastores
+from db import init_apikey_stores, init_datastores
 from stdoutlog import init_logging
+from util.pg_request import init_request_pg
 from util.request_id import get_or_create_request_id
+from util.timing import server_timing_header
 
 from .health import register_health_routes
+from .metrics import register_metrics_routes
+
+access_logger = logging.getLogger("api.access")
 
 
 def create_api_app(config: dict) -> Flask:
@@ -26,14 +31,23 @@ def create_api_app(config: dict) -> Flask:
     """
     init_logging(config)
     stores = init_datastores(config)
+    stores.update(init_apikey_stores(config, stores))
 
     app = Flask(__name__)
     app.json.sort_keys = False
 
-    # Allow Werkzeug / Gunicorn access logs to flow to our JSON handler
+    # Handlers use util.pg_request.get_db(): one lazy checkout per request
+    if stores.get("pg_pool") is not None:
+        init_request_pg(app, stores["pg_pool"])
+    # Rows fetched per round trip by api.streaming.stream_query
+    app.config["STREAM_ITERSIZE"] = int(config.get("STREAM_ITERSIZE", 2000))
+
+    # Werkzeug logs still flow to our JSON handler; its text request lines are
+    # dropped when the structured access log below is enabled
+    access_log_enabled = bool(config.get("ACCESS_LOG_ENABLED", True))
     werkzeug_logger = logging.getLogger("werkzeug")
     werkzeug_logger.disabled = False
-    werkzeug_logger.setLevel(logging.INFO)
+    werkzeug_logger.setLevel(logging.WARNING if access_log_enabled else logging.INFO)
     werkzeug_logger.propagate = True  # keep stdout logging in every env
 
     metadata = {
@@ -53,6 +67,55 @@ def create_api_app(config: dict) -> Flask:
         g.request_started_at = time.perf_counter()
         get_or_create_request_id()
 
+    ############################################################################
+    #
+    # Timing and access logging once the response is built
+    #
+    ############################################################################
+
+    def _log_access(record: dict, duration_ms: float) -> None:
+        access_logger.info(
+            "%s %s %s",
+            record["http_method"],
+            record["http_path"],
+            record["http_status"],
+            extra={**record, "duration_ms": duration_ms},
+        )
+
+    @app.after_request
+    def _log_request_end(response):
+        started_at = g.get("request_started_at")
+        if started_at is None:
+            return response
+        elapsed_ms = round((time.perf_counter() - started_at) * 1000.0, 3)
+        phases = g.setdefault("server_timing", {})
+        record = {
+            "request_id": g.get("request_id"),
+            "http_method": request.method,
+            "http_path": request.path,
+            "http_status": response.status_code,
+            "response_bytes": response.content_length,
+            "endpoint": request.endpoint,
+            "remote_ip": request.remote_addr,
+        }
+
+        if not response.is_streamed:
+            response.headers["Server-Timing"] = server_timing_header(phases, elapsed_ms)
+            if access_log_enabled:
+                _log_access(record, elapsed_ms)
+            return response
+
+        # Streamed body: headers leave before it is produced, so they can only
+        # carry the time to the first byte; the real total is logged once the
+        # server closes the body (request context already gone by then)
+        response.headers["Server-Timing"] = server_timing_header(phases, elapsed_ms, "ttfb")
+        if access_log_enabled:
+            record.update(streamed=True, ttfb_ms=elapsed_ms)
+            response.call_on_close(
+                lambda: _log_access(record, round((time.perf_counter() - started_at) * 1000.0, 3))
+            )
+        return response
+
     ############################################################################
     #
     # Apex endpoint, informational and HATEOAS
@@ -103,6 +166,7 @@ def create_api_app(config: dict) -> Flask:
     ############################################################################
 
     register_health_routes(app, config=config, stores=stores)
+    register_metrics_routes(app, config=config, stores=stores)
 
     return app
 
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""API package - Streaming NDJSON / JSON responses from server-side cursors"""
+
+__updated__ = "2026-10-17 21:58:37"
+
+import logging
+import uuid
+from typing import Any, Iterator, Optional
+
+from flask import Response, current_app
+
+from stdoutlog.formatter import json_dumps
+from util.pg_request import EXTENSION_KEY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ITERSIZE = 2000
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+class _QueryStream:
+    """
+    Owns one pooled connection and a named cursor for the lifetime of the
+    response body. `close()` is idempotent and runs on normal completion,
+    on errors, on client disconnect (the WSGI server closes the body) and
+    when the body is never iterated at all.
+    """
+
+    def __init__(self, pg_pool, sql: str, params: Any, itersize: int) -> None:
+        self._pool = pg_pool
+        self._conn = pg_pool.getconn()
+        self.rows = 0
+        try:
+            # Named cursor: rows stay on the server until fetched, itersize at a time
+            self._cursor = self._conn.cursor(name=f"stream_{uuid.uuid4().hex}")
+            self._cursor.itersize = itersize
+            # Executed now, so SQL errors become a normal 500 before any byte is sent
+            self._cursor.execute(sql, params)
+        except BaseException:
+            self._cursor = None
+            self.close()
+            raise
+
+    def batches(self, itersize: int) -> Iterator[list]:
+        cursor = self._cursor
+        batch = cursor.fetchmany(itersize)
+        # description is only known after the first fetch on a named cursor
+        columns = [column[0] for column in cursor.description or ()]
+        while batch:
+            self.rows += len(batch)
+            yield [dict(zip(columns, row)) for row in batch]
+            batch = cursor.fetchmany(itersize)
+
+    def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if self._cursor is not None and not self._cursor.closed:
+                self._cursor.close()
+        except Exception:  # pylint: disable=broad-except
+            # Typically the connection broke under us; the pool discards it
+            logger.debug("Closing the streaming cursor failed", exc_info=True)
+        finally:
+            self._pool.putconn(conn)
+
+
+def stream_query(
+    sql: str,
+    params: Any = None,
+    *,
+    fmt: str = "ndjson",
+    itersize: Optional[int] = None,
+    pg_pool=None,
+) -> Response:
+    """
+    Stream the rows of `sql` as NDJSON (one object per line) or as a JSON
+    array, without loading the result set into memory.
+
+    Rows are read from a server-side cursor `itersize` at a time (default
+    STREAM_ITERSIZE) and written one batch per chunk, so memory stays bounded
+    by one batch whatever the result size. The stream uses its own pooled
+    connection (the request-scoped one is released before the body is sent)
+    and gives it back as soon as the body finishes or the client goes away.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported stream format {fmt!r}, use one of {tuple(FORMATS)}")
+    itersize = int(itersize or current_app.config.get("STREAM_ITERSIZE", DEFAULT_ITERSIZE))
+    pg_pool = pg_pool or current_app.extensions.get(EXTENSION_KEY)
+    if pg_pool is None:
+        raise RuntimeError("Postgres is not enabled for this app (see init_request_pg)")
+
+    stream = _QueryStream(pg_pool, sql, params, itersize)
+
+    def generate() -> Iterator[str]:
+        try:
+            if fmt == "json":
+                yield "["
+                separator = ""
+                for batch in stream.batches(itersize):
+                    yield separator + ",".join(json_dumps(row) for row in batch)
+                    separator = ","
+                yield "]\n"
+            else:
+                for batch in stream.batches(itersize):
+                    yield "".join(json_dumps(row) + "\n" for row in batch)
+        except GeneratorExit:
+            logger.info("Client went away after %d streamed rows", stream.rows)
+            raise
+        finally:
+            stream.close()
+
+    response = Response(generate(), mimetype=FORMATS[fmt])
+    response.call_on_close(stream.close)
+    return response
+
@@ -5,7 +5,7 @@
 
 """Configuration module / Defaults for everything yet to configure"""
 
-__updated__ = "2025-12-16 17:29:48"
+__updated__ = "2026-10-18 09:22:10"
 
 import os
 from dotenv import load_dotenv, find_dotenv
@@ -56,6 +56,21 @@ def get_config() -> dict:
         "SERVICE_NAMESPACE": os.getenv("SERVICE_NAMESPACE", "default"),
         # --- Logging ---
         "LOG_LEVEL": os.getenv("LOG_LEVEL", default_log_level),
+        # Background writer: bounded queue, one write per flush interval (seconds)
+        "LOG_ASYNC": str_to_bool(os.getenv("LOG_ASYNC", "false"), default=False),
+        "LOG_QUEUE_SIZE": int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+        "LOG_FLUSH_INTERVAL": float(os.getenv("LOG_FLUSH_INTERVAL", "0.05")),
+        # When the queue is full: block, drop_oldest or drop_debug
+        "LOG_OVERFLOW_POLICY": os.getenv("LOG_OVERFLOW_POLICY", "drop_debug").lower(),
+        # Sampling below WARNING, "logger[:LEVEL]=value,...", for records that reach
+        # the root handler (not gunicorn.*, which logs through its own handlers):
+        # - rates are fractions kept, e.g. "werkzeug=0.1,util.decorators:DEBUG=0.01"
+        # - limits are records per second, e.g. "api.access=100"
+        "LOG_SAMPLE_RATES": os.getenv("LOG_SAMPLE_RATES", ""),
+        "LOG_RATE_LIMITS": os.getenv("LOG_RATE_LIMITS", ""),
+        "LOG_SUPPRESSED_SUMMARY_INTERVAL": float(os.getenv("LOG_SUPPRESSED_SUMMARY_INTERVAL", "60")),
+        # One structured record per request (replaces the werkzeug text access lines)
+        "ACCESS_LOG_ENABLED": str_to_bool(os.getenv("ACCESS_LOG_ENABLED", "true")),
         # Explicit override for Flask debug/reloader; defaults to inferred below
         "FLASK_DEBUG": os.getenv("FLASK_DEBUG"),
         # --- Flask ---
@@ -71,6 +86,16 @@ def get_config() -> dict:
         "PG_MIN_CONN": int(os.getenv("PG_MIN_CONN", "1")),
         "PG_MAX_CONN": int(os.getenv("PG_MAX_CONN", "5")),
         "PG_SSLMODE": os.getenv("PG_SSLMODE", "prefer"),  # use if TLS is ever required
+        # Seconds to wait for a free pooled connection, and to open a new one
+        "PG_POOL_TIMEOUT": float(os.getenv("PG_POOL_TIMEOUT", "5")),
+        "PG_CONNECT_TIMEOUT": int(os.getenv("PG_CONNECT_TIMEOUT", "5")),
+        # Connection lifecycle (seconds): retire after, close when idle for (above
+        # PG_MIN_CONN), and run SELECT 1 on checkout after this much idle time
+        "PG_MAX_LIFETIME": float(os.getenv("PG_MAX_LIFETIME", "1800")),
+        "PG_MAX_IDLE": float(os.getenv("PG_MAX_IDLE", "300")),
+        "PG_VALIDATE_AFTER": float(os.getenv("PG_VALIDATE_AFTER", "30")),
+        # Rows per server-side cursor fetch in streamed responses (api.streaming)
+        "STREAM_ITERSIZE": int(os.getenv("STREAM_ITERSIZE", "2000")),
         # --- Redis ---
         "REDIS_ENABLED": str_to_bool(os.getenv("REDIS_ENABLED", "false"), default=False),
         "REDIS_HOST": os.getenv("REDIS_HOST", "redis"),
@@ -78,4 +103,125 @@ def get_config() -> dict:
         "REDIS_DB": int(os.getenv("REDIS_DB", "0")),
         "REDIS_PASSWORD": os.getenv("REDIS_PASSWORD"),
         "REDIS_MAX_CONN": int(os.getenv("REDIS_MAX_CONN", "20")),
+        # Blocking pool: seconds to wait for a free connection before giving up
+        "REDIS_POOL_TIMEOUT": float(os.getenv("REDIS_POOL_TIMEOUT", "5")),
+        "REDIS_SOCKET_TIMEOUT": float(os.getenv("REDIS_SOCKET_TIMEOUT", "5")),
+        "REDIS_CONNECT_TIMEOUT": float(os.getenv("REDIS_CONNECT_TIMEOUT", "2")),
+        "REDIS_KEEPALIVE": str_to_bool(os.getenv("REDIS_KEEPALIVE", "true")),
+        # PING a connection idle for longer than this (seconds) before reusing it
+        "REDIS_HEALTH_CHECK_INTERVAL": float(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30")),
+        # Close pooled sockets unused for this long (seconds, 0 keeps them open)
+        "REDIS_MAX_IDLE_TIME": float(os.getenv("REDIS_MAX_IDLE_TIME", "300")),
+        # stores["redis_autopipe"]: concurrent commands share pipelines; the window
+        # (microseconds) holds each batch open longer, 0 sends what is queued at once
+        "REDIS_AUTOPIPE_ENABLED": str_to_bool(os.getenv("REDIS_AUTOPIPE_ENABLED", "true")),
+        "REDIS_AUTOPIPE_WINDOW_US": float(os.getenv("REDIS_AUTOPIPE_WINDOW_US", "0")),
+        "REDIS_AUTOPIPE_MAX_BATCH": int(os.getenv("REDIS_AUTOPIPE_MAX_BATCH", "128")),
+        # --- API keys ---
+        # Per-process metadata cache in front of Redis (sizes in entries, times in seconds)
+        "APIKEY_CACHE_ENABLED": str_to_bool(os.getenv("APIKEY_CACHE_ENABLED", "true")),
+        "APIKEY_CACHE_MAX_SIZE": int(os.getenv("APIKEY_CACHE_MAX_SIZE", "10000")),
+        "APIKEY_CACHE_TTL": float(os.getenv("APIKEY_CACHE_TTL", "30")),
+        "APIKEY_CACHE_STALE_TTL": float(os.getenv("APIKEY_CACHE_STALE_TTL", "30")),
+        # Circuit breaker around API key lookups: opens when ERROR_RATE of the last
+        # WINDOW calls (at least MIN_CALLS) failed or took over SLOW_CALL_MS,
+        # then fails fast for OPEN_SECONDS before letting a trial call through
+        "APIKEY_BREAKER_ENABLED": str_to_bool(os.getenv("APIKEY_BREAKER_ENABLED", "true")),
+        "APIKEY_BREAKER_ERROR_RATE": float(os.getenv("APIKEY_BREAKER_ERROR_RATE", "0.5")),
+        "APIKEY_BREAKER_MIN_CALLS": int(os.getenv("APIKEY_BREAKER_MIN_CALLS", "10")),
+        "APIKEY_BREAKER_WINDOW": int(os.getenv("APIKEY_BREAKER_WINDOW", "20")),
+        "APIKEY_BREAKER_SLOW_CALL_MS": float(os.getenv("APIKEY_BREAKER_SLOW_CALL_MS", "250")),
+        "APIKEY_BREAKER_OPEN_SECONDS": float(os.getenv("APIKEY_BREAKER_OPEN_SECONDS", "10")),
+        # While Redis is unreachable, serve cached metadata loaded at most this long ago (0 = never)
+        "APIKEY_STALE_FALLBACK_TTL": float(os.getenv("APIKEY_STALE_FALLBACK_TTL", "300")),
+        # Negative lookups: recently unknown/disabled keys are rejected locally
+        "APIKEY_NEGATIVE_ENABLED": str_to_bool(os.getenv("APIKEY_NEGATIVE_ENABLED", "true")),
+        "APIKEY_NEGATIVE_MAX_SIZE": int(os.getenv("APIKEY_NEGATIVE_MAX_SIZE", "100000")),
+        "APIKEY_NEGATIVE_TTL": float(os.getenv("APIKEY_NEGATIVE_TTL", "60")),
+        # Optional Bloom filter of every apikey:* key (rebuilt with SCAN)
+        "APIKEY_BLOOM_ENABLED": str_to_bool(os.getenv("APIKEY_BLOOM_ENABLED", "false"), default=False),
+        "APIKEY_BLOOM_FP_RATE": float(os.getenv("APIKEY_BLOOM_FP_RATE", "0.001")),
+        "APIKEY_BLOOM_REBUILD_INTERVAL": float(os.getenv("APIKEY_BLOOM_REBUILD_INTERVAL", "300")),
+        # Cross-process invalidation: pub/sub channel + optional keyspace notifications
+        "APIKEY_EVENTS_CHANNEL": os.getenv("APIKEY_EVENTS_CHANNEL", "apikey:events"),
+        "APIKEY_KEYSPACE_EVENTS": str_to_bool(os.getenv("APIKEY_KEYSPACE_EVENTS", "true")),
+        # --- Rate limiting (apikey rate_limit field, requests per RATELIMIT_PERIOD seconds) ---
+        "RATELIMIT_ENABLED": str_to_bool(os.getenv("RATELIMIT_ENABLED", "true")),
+        "RATELIMIT_PERIOD": float(os.getenv("RATELIMIT_PERIOD", "60")),
+        "RATELIMIT_TIMEOUT_MS": float(os.getenv("RATELIMIT_TIMEOUT_MS", "50")),
+        # When Redis is slow or down: "open" lets requests through, "closed" rejects them
+        "RATELIMIT_FAILURE_POLICY": os.getenv("RATELIMIT_FAILURE_POLICY", "open").lower(),
+        # --- Daily quota (apikey quota_daily field, write-behind counters) ---
+        "QUOTA_ENABLED": str_to_bool(os.getenv("QUOTA_ENABLED", "true")),
+        "QUOTA_FLUSH_INTERVAL": float(os.getenv("QUOTA_FLUSH_INTERVAL", "1")),
+        # Max unflushed requests per key and process (bounds the overshoot)
+        "QUOTA_MAX_OVERSHOOT": int(os.getenv("QUOTA_MAX_OVERSHOOT", "50")),
+        # Keys with this many requests left or fewer are counted synchronously
+        "QUOTA_SYNC_MARGIN": int(os.getenv("QUOTA_SYNC_MARGIN", "500")),
+        # --- Readiness ---
+        # /ready answers from a background prober: seconds between probes, and one
+        # deadline for all checks of a probe (they run concurrently)
+        "READY_PROBE_INTERVAL": float(os.getenv("READY_PROBE_INTERVAL", "5")),
+        "READY_CHECK_TIMEOUT": float(os.getenv("READY_CHECK_TIMEOUT", "2")),
+        # --- Metrics ---
+        "METRICS_ENABLED": str_to_bool(os.getenv("METRICS_ENABLED", "true")),
+        # Directory shared by all gunicorn workers. When empty, gunicorn_conf creates
+        # one in the master; outside gunicorn each process uses a private temp dir
+        "METRICS_DIR": os.getenv("METRICS_DIR", ""),
+        "METRICS_FLUSH_INTERVAL": float(os.getenv("METRICS_FLUSH_INTERVAL", "1")),
+        # --- Worker ---
+        # Worker processes forked by a supervisor (1 = run in this process, no supervisor)
+        "WORKER_CONCURRENCY": int(os.getenv("WORKER_CONCURRENCY", "1")),
+        # Recycle a worker process after this many units or above this RSS (0 = never)
+        "WORKER_MAX_TASKS_PER_CHILD": int(os.getenv("WORKER_MAX_TASKS_PER_CHILD", "0")),
+        "WORKER_MAX_RSS_MB": float(os.getenv("WORKER_MAX_RSS_MB", "0")),
+        # Crashed children restart after 1s, doubling per consecutive crash up to this
+        "WORKER_RESTART_MAX_DELAY": float(os.getenv("WORKER_RESTART_MAX_DELAY", "60")),
+        # Idle polls back off from WORKER_POLL_MIN_INTERVAL to WORKER_POLL_INTERVAL
+        # seconds (doubling, +/- WORKER_POLL_JITTER); a poll that found work polls again at once
+        "WORKER_POLL_INTERVAL": int(os.getenv("WORKER_POLL_INTERVAL", "5")),
+        "WORKER_POLL_MIN_INTERVAL": float(os.getenv("WORKER_POLL_MIN_INTERVAL", "0.05")),
+        "WORKER_POLL_JITTER": float(os.getenv("WORKER_POLL_JITTER", "0.2")),
+        # Seconds between "Worker alive" log lines (a scheduler task)
+        "WORKER_HEARTBEAT_INTERVAL": float(os.getenv("WORKER_HEARTBEAT_INTERVAL", "60")),
+        # Where units come from: "poll" (_fetch_work; the placeholder runs
+        # _perform_work once every WORKER_POLL_INTERVAL),
+        # "redis_stream" (consumer group on WORKER_STREAM) or "pg_queue" (table
+        # WORKER_PG_QUEUE_TABLE, see worker.pg_queue)
+        "WORKER_SOURCE": os.getenv("WORKER_SOURCE", "poll").lower(),
+        # Jobs per unit handed to _perform_work (and per XACK)
+        "WORKER_BATCH_SIZE": int(os.getenv("WORKER_BATCH_SIZE", "100")),
+        "WORKER_STREAM": os.getenv("WORKER_STREAM", "jobs"),
+        "WORKER_STREAM_GROUP": os.getenv("WORKER_STREAM_GROUP", "workers"),
+        # Consumer name within the group (default: hostname-pid)
+        "WORKER_STREAM_CONSUMER": os.getenv("WORKER_STREAM_CONSUMER", ""),
+        # XREADGROUP wait; keep it below REDIS_SOCKET_TIMEOUT (0: no wait, poll
+        # every WORKER_POLL_INTERVAL instead)
+        "WORKER_STREAM_BLOCK_MS": int(os.getenv("WORKER_STREAM_BLOCK_MS", "2000")),
+        # Entries pending this long on another consumer are reclaimed (XAUTOCLAIM),
+        # checked every WORKER_STREAM_CLAIM_INTERVAL seconds
+        "WORKER_STREAM_CLAIM_IDLE_MS": int(os.getenv("WORKER_STREAM_CLAIM_IDLE_MS", "60000")),
+        "WORKER_STREAM_CLAIM_INTERVAL": float(os.getenv("WORKER_STREAM_CLAIM_INTERVAL", "30")),
+        # Reclaimed entries delivered more often than this (0: no limit) are
+        # moved to WORKER_STREAM_DEAD_LETTER (default "<WORKER_STREAM>:dead")
+        "WORKER_STREAM_MAX_DELIVERIES": int(os.getenv("WORKER_STREAM_MAX_DELIVERIES", "5")),
+        "WORKER_STREAM_DEAD_LETTER": os.getenv("WORKER_STREAM_DEAD_LETTER", ""),
+        "WORKER_PG_QUEUE_TABLE": os.getenv("WORKER_PG_QUEUE_TABLE", "worker_jobs"),
+        "WORKER_PG_QUEUE": os.getenv("WORKER_PG_QUEUE", "default"),
+        # NOTIFY channel that wakes idle workers (empty: poll every WORKER_POLL_INTERVAL)
+        "WORKER_PG_QUEUE_CHANNEL": os.getenv("WORKER_PG_QUEUE_CHANNEL", "worker_jobs"),
+        # Seconds a claimed job stays invisible before another worker may take it
+        "WORKER_PG_VISIBILITY_TIMEOUT": float(os.getenv("WORKER_PG_VISIBILITY_TIMEOUT", "300")),
+        # Failed jobs are retried after RETRY_DELAY x 2^(attempt-1) seconds, MAX_ATTEMPTS times
+        "WORKER_PG_MAX_ATTEMPTS": int(os.getenv("WORKER_PG_MAX_ATTEMPTS", "5")),
+        "WORKER_PG_RETRY_DELAY": float(os.getenv("WORKER_PG_RETRY_DELAY", "10")),
+        # Units run on a "thread" or "process" pool of WORKER_EXECUTOR_SIZE workers;
+        # fetching pauses while WORKER_MAX_IN_FLIGHT units are pending (0 = 2 x size)
+        "WORKER_EXECUTOR": os.getenv("WORKER_EXECUTOR", "thread").lower(),
+        "WORKER_EXECUTOR_SIZE": int(os.getenv("WORKER_EXECUTOR_SIZE", "4")),
+        "WORKER_MAX_IN_FLIGHT": int(os.getenv("WORKER_MAX_IN_FLIGHT", "0")),
+        # Seconds granted to in-flight units on SIGTERM before cleanup
+        "WORKER_DRAIN_TIMEOUT": float(os.getenv("WORKER_DRAIN_TIMEOUT", "30")),
+        # Seconds between throughput log lines
+        "WORKER_STATS_INTERVAL": float(os.getenv("WORKER_STATS_INTERVAL", "60")),
     }
@@ -5,11 +5,23 @@
 
 """Database management package"""
 
-__updated__ = "2025-12-15 17:19:27"
+__updated__ = "2026-10-18 06:44:21"
 
 
-from .pg_pool import create_pg_pool  # noqa: F401
-from .redis_pool import create_redis_pool, create_redis_client
+from .pg_pool import BlockingPgPool, PoolTimeout, create_pg_pool  # noqa: F401
+from .pg_statements import PreparedStatements, STATEMENTS  # noqa: F401
+from .pg_bulk import copy_rows, insert_many  # noqa: F401
+from .redis_pool import RedisPoolTimeout, create_redis_pool, create_redis_client  # noqa: F401
+from .redis_apikeys import get_apikey_metadata, get_apikey_metadata_many  # noqa: F401
+from .redis_autopipe import AutoPipeline
+from .apikey_cache import ApiKeyCache
+from .apikey_events import ApiKeyEventListener, APIKEY_EVENTS_CHANNEL
+from .apikey_filter import ApiKeyFilter, NegativeCache
+from .redis_ratelimit import RateLimiter
+from .redis_quota import QuotaCounter
+
+import redis
+from util.circuit_breaker import CircuitBreaker
 
 
 def init_datastores(config: dict) -> dict:
@@ -21,12 +33,128 @@ def init_datastores(config: dict) -> dict:
 
     redis_pool = None
     redis_client = None
+    redis_autopipe = None
     if config.get("REDIS_ENABLED", False):
         redis_pool = create_redis_pool(config)
         redis_client = create_redis_client(redis_pool)
+        if config.get("REDIS_AUTOPIPE_ENABLED", True):
+            redis_autopipe = AutoPipeline(
+                redis_client,
+                window_us=float(config.get("REDIS_AUTOPIPE_WINDOW_US", 0)),
+                max_batch=int(config.get("REDIS_AUTOPIPE_MAX_BATCH", 128)),
+            )
 
     return {
         "pg_pool": pg_pool,
         "redis_pool": redis_pool,
         "redis": redis_client,
+        "redis_autopipe": redis_autopipe,
+    }
+
+
+def init_apikey_stores(config: dict, stores: dict) -> dict:
+    """
+    Initialize the in-process helpers used to validate API keys (API mode only).
+    Return a dict to be merged into the datastores dict.
+    """
+    redis_client = stores.get("redis")
+    if redis_client is None:
+        return {
+            "apikey_cache": None,
+            "apikey_filter": None,
+            "apikey_events": None,
+            "apikey_breaker": None,
+            "ratelimiter": None,
+            "quota_counter": None,
+        }
+
+    events = ApiKeyEventListener(
+        redis_client,
+        channel=config.get("APIKEY_EVENTS_CHANNEL", APIKEY_EVENTS_CHANNEL),
+        db=int(config.get("REDIS_DB", 0)),
+        keyspace=bool(config.get("APIKEY_KEYSPACE_EVENTS", True)),
+    )
+
+    # Concurrent cache misses from different threads share pipelines
+    lookup_client = stores.get("redis_autopipe") or redis_client
+
+    # Fail fast instead of waiting on a degraded Redis for every request
+    breaker = None
+    if config.get("APIKEY_BREAKER_ENABLED", True):
+        breaker = CircuitBreaker(
+            "apikey_store",
+            error_rate=float(config.get("APIKEY_BREAKER_ERROR_RATE", 0.5)),
+            min_calls=int(config.get("APIKEY_BREAKER_MIN_CALLS", 10)),
+            window=int(config.get("APIKEY_BREAKER_WINDOW", 20)),
+            slow_call_ms=float(config.get("APIKEY_BREAKER_SLOW_CALL_MS", 250)),
+            open_seconds=float(config.get("APIKEY_BREAKER_OPEN_SECONDS", 10)),
+            failure_exceptions=(redis.exceptions.RedisError,),
+        )
+
+    def load(apikey):
+        if breaker is None:
+            return get_apikey_metadata(lookup_client, apikey)
+        return breaker.call(get_apikey_metadata, lookup_client, apikey)
+
+    cache = None
+    if config.get("APIKEY_CACHE_ENABLED", True):
+        cache = ApiKeyCache(
+            load,
+            max_size=int(config.get("APIKEY_CACHE_MAX_SIZE", 10000)),
+            ttl=float(config.get("APIKEY_CACHE_TTL", 30)),
+            stale_ttl=float(config.get("APIKEY_CACHE_STALE_TTL", 30)),
+            fallback_ttl=float(config.get("APIKEY_STALE_FALLBACK_TTL", 300)),
+        )
+        events.subscribe(cache.invalidate)
+
+    apikey_filter = None
+    if config.get("APIKEY_NEGATIVE_ENABLED", True):
+        apikey_filter = ApiKeyFilter(
+            NegativeCache(
+                max_size=int(config.get("APIKEY_NEGATIVE_MAX_SIZE", 100000)),
+                ttl=float(config.get("APIKEY_NEGATIVE_TTL", 60)),
+            ),
+            bloom_enabled=bool(config.get("APIKEY_BLOOM_ENABLED", False)),
+            bloom_fp_rate=float(config.get("APIKEY_BLOOM_FP_RATE", 0.001)),
+            bloom_rebuild_interval=float(config.get("APIKEY_BLOOM_REBUILD_INTERVAL", 300)),
+        )
+        events.subscribe(apikey_filter.on_change)
+        apikey_filter.start(redis_client)
+
+    if cache is None and apikey_filter is None:
+        events = None
+    else:
+        events.start()
+
+    ratelimiter = None
+    if config.get("RATELIMIT_ENABLED", True):
+        # Dedicated pool so a slow or exhausted Redis trips RATELIMIT_TIMEOUT_MS
+        # (and the fail-open policy), not the default timeouts
+        timeout = float(config.get("RATELIMIT_TIMEOUT_MS", 50)) / 1000.0
+        ratelimit_pool = create_redis_pool(
+            config, timeout=timeout, socket_timeout=timeout, socket_connect_timeout=timeout
+        )
+        ratelimiter = RateLimiter(
+            create_redis_client(ratelimit_pool),
+            period=float(config.get("RATELIMIT_PERIOD", 60)),
+            fail_open=config.get("RATELIMIT_FAILURE_POLICY", "open") != "closed",
+        )
+
+    quota_counter = None
+    if config.get("QUOTA_ENABLED", True):
+        quota_counter = QuotaCounter(
+            redis_client,
+            flush_interval=float(config.get("QUOTA_FLUSH_INTERVAL", 1)),
+            max_overshoot=int(config.get("QUOTA_MAX_OVERSHOOT", 50)),
+            sync_margin=int(config.get("QUOTA_SYNC_MARGIN", 500)),
+        )
+        quota_counter.start()
+
+    return {
+        "apikey_cache": cache,
+        "apikey_filter": apikey_filter,
+        "apikey_events": events,
+        "apikey_breaker": breaker,
+        "ratelimiter": ratelimiter,
+        "quota_counter": quota_counter,
     }
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - In-process API key metadata cache"""
+
+__updated__ = "2026-10-17 23:52:06"
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ApiKeyCache:
+    """
+    Bounded LRU + TTL cache in front of `get_apikey_metadata`.
+
+    - Entries younger than `ttl` are served from memory.
+    - Entries between `ttl` and `ttl + stale_ttl` are served as-is while a
+      single background refresh reloads them (stale-while-revalidate).
+    - Older entries, and misses, are loaded synchronously.
+    - Only found/enabled keys are cached; unknown keys always hit the loader.
+
+    `invalidate` is meant to be wired to `ApiKeyEventListener` so that a
+    change made by any process is visible everywhere within one message.
+    A full invalidation only expires the entries: `get` reloads them, but
+    `peek(max_age=...)` can still serve them as a last resort while Redis
+    is unreachable.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[str], Optional[Dict]],
+        *,
+        max_size: int = 10000,
+        ttl: float = 30.0,
+        stale_ttl: float = 30.0,
+        fallback_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._loader = loader
+        self._max_size = max(1, int(max_size))
+        self._ttl = float(ttl)
+        self._stale_ttl = float(stale_ttl)
+        self._fallback_ttl = float(fallback_ttl)
+        self._clock = clock
+
+        self._entries: "OrderedDict[str, tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so in-flight loads never resurrect old data
+        self._generation = 0
+        # Entries loaded at or before this time were expired by invalidate()
+        self._expired_before = float("-inf")
+        self._refreshing: set[str] = set()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.fallback_hits = 0
+
+    def get(self, apikey: Optional[str]) -> Optional[Dict]:
+        """
+        Return cached metadata for `apikey`, loading it when needed.
+        Loader exceptions (e.g. RedisError) propagate to the caller.
+        """
+        if not apikey:
+            return None
+
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(apikey)
+            if entry is not None and entry[0] > self._expired_before:
+                age = now - entry[0]
+                if age < self._ttl:
+                    self._entries.move_to_end(apikey)
+                    self.hits += 1
+                    return entry[1]
+                if age < self._ttl + self._stale_ttl:
+                    self._entries.move_to_end(apikey)
+                    self.stale_hits += 1
+                    self._schedule_refresh(apikey)
+                    return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        return self._load(apikey, generation)
+
+    def peek(self, apikey: Optional[str], max_age: Optional[float] = None) -> Optional[Dict]:
+        """
+        Return the cached entry without loading, counting or refreshing.
+        `max_age` bounds how old (in seconds) the entry may be.
+        """
+        if not apikey:
+            return None
+        with self._lock:
+            entry = self._entries.get(apikey)
+        if entry is None:
+            return None
+        if max_age is not None and self._clock() - entry[0] > max_age:
+            return None
+        return entry[1]
+
+    def last_known_good(self, apikey: Optional[str]) -> Optional[Dict]:
+        """
+        Metadata loaded at most `fallback_ttl` seconds ago, whatever its
+        freshness: what to serve when the store cannot be reached.
+        """
+        if self._fallback_ttl <= 0:
+            return None
+        metadata = self.peek(apikey, max_age=self._fallback_ttl)
+        if metadata is not None:
+            self.fallback_hits += 1
+        return metadata
+
+    def invalidate(self, apikey: Optional[str] = None) -> None:
+        """
+        Drop one API key, or expire the whole cache when `apikey` is None.
+        """
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if apikey is None:
+                self._expired_before = self._clock()
+            else:
+                self._entries.pop(apikey, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        return {
+            "size": size,
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "fallback_hits": self.fallback_hits,
+        }
+
+    def _load(self, apikey: str, generation: int) -> Optional[Dict]:
+        metadata = self._loader(apikey)
+        loaded_at = self._clock()
+        with self._lock:
+            if generation != self._generation:
+                # Invalidated while loading: answer this request, keep nothing
+                return metadata
+            if metadata is None:
+                self._entries.pop(apikey, None)
+            else:
+                self._entries[apikey] = (loaded_at, metadata)
+                self._entries.move_to_end(apikey)
+                while len(self._entries) > self._max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return metadata
+
+    def _schedule_refresh(self, apikey: str) -> None:
+        # Caller holds self._lock
+        if apikey in self._refreshing:
+            return
+        if self._refresher is None:
+            self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="apikey-refresh")
+        self._refreshing.add(apikey)
+        self._refresher.submit(self._refresh, apikey, self._generation)
+
+    def _refresh(self, apikey: str, generation: int) -> None:
+        try:
+            self._load(apikey, generation)
+            self.refreshes += 1
+        except Exception as exc:  # pylint: disable=broad-except
+            # Keep serving the stale entry until its window runs out
+            self.refresh_errors += 1
+            logger.warning("Background API key refresh failed: %s", exc)
+        finally:
+            with self._lock:
+                self._refreshing.discard(apikey)
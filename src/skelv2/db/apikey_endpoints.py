@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Compiled allowed_endpoints matcher"""
+
+__updated__ = "2026-10-18 06:02:11"
+
+import logging
+import re
+from typing import Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Marks a trie node whose subtree is fully allowed ("/reports/*")
+_PREFIX_END = object()
+
+
+class EndpointMatcher:
+    """
+    Authorization structure compiled once from an `allowed_endpoints` list.
+
+    Supported patterns:
+    - "/hello"              exact path (frozenset lookup)
+    - "/reports/*"          anything below /reports/ (segment trie)
+    - "/users/*/profile"    "*" matches one path segment (single compiled regex)
+
+    `allows(path)` walks at most one trie branch and one regex, so its cost
+    grows with the path length, not with the number of patterns.
+    """
+
+    __slots__ = ("exact", "_trie", "_pattern", "patterns")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        exact: set[str] = set()
+        trie: dict = {}
+        regexes: list[str] = []
+        kept: list[str] = []
+
+        for pattern in patterns:
+            if not isinstance(pattern, str) or not pattern:
+                continue
+            kept.append(pattern)
+            if "*" not in pattern:
+                exact.add(pattern)
+            elif pattern.endswith("/*") and "*" not in pattern[:-2]:
+                node = trie
+                for segment in _segments(pattern[:-2]):
+                    node = node.setdefault(segment, {})
+                node[_PREFIX_END] = True
+            else:
+                regexes.append(_wildcard_to_regex(pattern))
+
+        self.exact = frozenset(exact)
+        self._trie = trie
+        self._pattern = re.compile("|".join(f"(?:{rx})" for rx in regexes)) if regexes else None
+        self.patterns = tuple(kept)
+
+    def allows(self, path: str) -> bool:
+        if path in self.exact:
+            return True
+
+        node = self._trie
+        if node:
+            # A prefix node only matches when at least one segment remains below it
+            for segment in _segments(path):
+                if _PREFIX_END in node:
+                    return True
+                node = node.get(segment)
+                if node is None:
+                    break
+
+        if self._pattern is not None:
+            return self._pattern.fullmatch(path) is not None
+        return False
+
+    def __repr__(self) -> str:
+        return f"EndpointMatcher({list(self.patterns)!r})"
+
+
+# Allows nothing: the answer to an `allowed_endpoints` value that is present but invalid
+DENY_ALL = EndpointMatcher(())
+
+
+def compile_endpoints(patterns: Any, owner: str = "") -> Optional[EndpointMatcher]:
+    """
+    Compile `allowed_endpoints`. None (field missing) or an empty list means
+    "no restriction"; any other value that is not a list of patterns fails
+    closed with `DENY_ALL`. `owner` only labels the warning.
+    """
+    if patterns is None or (isinstance(patterns, (list, tuple)) and not patterns):
+        return None
+    if not isinstance(patterns, (list, tuple)):
+        logger.warning("allowed_endpoints of %s is not a list, denying every endpoint", owner or "API key")
+        return DENY_ALL
+    matcher = EndpointMatcher(patterns)
+    if not matcher.patterns:
+        logger.warning("allowed_endpoints of %s has no valid pattern, denying every endpoint", owner or "API key")
+        return DENY_ALL
+    return matcher
+
+
+def _segments(path: str) -> list[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def _wildcard_to_regex(pattern: str) -> str:
+    if pattern.endswith("/*"):
+        head, tail = pattern[:-2], "/.+"
+    else:
+        head, tail = pattern, ""
+    return "[^/]+".join(re.escape(part) for part in head.split("*")) + tail
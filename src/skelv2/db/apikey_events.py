@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - API key change notifications"""
+
+__updated__ = "2026-10-17 09:12:40"
+
+import logging
+import threading
+from typing import Callable, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Default pub/sub channel where writers announce API key changes
+APIKEY_EVENTS_CHANNEL = "apikey:events"
+
+# Payload meaning "forget everything you know about API keys"
+FLUSH_ALL = "*"
+
+
+def publish_apikey_change(r: redis.Redis, apikey: str, channel: str = APIKEY_EVENTS_CHANNEL) -> int:
+    """
+    Announce that `apikey:{apikey}` was created, changed or deleted.
+    Every API process listening on `channel` drops its local copy.
+
+    Returns the number of subscribers that received the message.
+    """
+    return r.publish(channel, apikey)
+
+
+class ApiKeyEventListener:
+    """
+    Background thread that turns Redis notifications into local callbacks.
+
+    Two sources are consumed, whichever the deployment provides:
+    - explicit messages on `channel` (see `publish_apikey_change`)
+    - keyspace notifications for `apikey:*`, when the server has
+      `notify-keyspace-events` enabled (e.g. "Kgh" or "KA")
+
+    Callbacks receive the bare API key, or None when every cached entry
+    must be discarded (startup, reconnect or a FLUSH_ALL message), since
+    notifications may have been missed while the subscription was down.
+    """
+
+    def __init__(
+        self,
+        r: redis.Redis,
+        *,
+        channel: str = APIKEY_EVENTS_CHANNEL,
+        db: int = 0,
+        keyspace: bool = True,
+        reconnect_delay: float = 1.0,
+    ) -> None:
+        self._redis = r
+        self._channel = channel
+        self._keyspace_pattern = f"__keyspace@{db}__:apikey:*" if keyspace else None
+        self._reconnect_delay = reconnect_delay
+        self._callbacks: list[Callable[[Optional[str]], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, callback: Callable[[Optional[str]], None]) -> None:
+        """
+        Register a callback invoked with the changed API key (or None).
+        """
+        self._callbacks.append(callback)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="apikey-events", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _dispatch(self, apikey: Optional[str]) -> None:
+        for callback in self._callbacks:
+            try:
+                callback(apikey)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("API key event callback failed")
+
+    def _handle_message(self, message: dict) -> None:
+        kind = message.get("type")
+        if kind in ("subscribe", "psubscribe"):
+            # (Re)subscribed: anything may have changed while we were away
+            self._dispatch(None)
+            return
+
+        if kind == "message":
+            data = message.get("data")
+            apikey = data.decode() if isinstance(data, bytes) else str(data)
+            self._dispatch(None if apikey == FLUSH_ALL else apikey)
+        elif kind == "pmessage":
+            channel = message.get("channel")
+            channel = channel.decode() if isinstance(channel, bytes) else str(channel)
+            _, _, apikey = channel.partition(":apikey:")
+            if apikey:
+                self._dispatch(apikey)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            pubsub = self._redis.pubsub()
+            try:
+                pubsub.subscribe(self._channel)
+                if self._keyspace_pattern:
+                    pubsub.psubscribe(self._keyspace_pattern)
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message:
+                        self._handle_message(message)
+            except redis.exceptions.RedisError as exc:
+                logger.warning("API key event subscription lost: %s", exc)
+                self._dispatch(None)
+                self._stop.wait(self._reconnect_delay)
+            finally:
+                try:
+                    pubsub.close()
+                except redis.exceptions.RedisError:
+                    pass
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Negative lookups for unknown API keys"""
+
+__updated__ = "2026-10-18 09:56:18"
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class NegativeCache:
+    """
+    Bounded set of API keys recently found unknown or disabled.
+    Each entry expires `ttl` seconds after it was recorded.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int = 100000,
+        ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_size = max(1, int(max_size))
+        self._ttl = float(ttl)
+        self._clock = clock
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, apikey: str) -> bool:
+        with self._lock:
+            expires_at = self._entries.get(apikey)
+            if expires_at is None:
+                return False
+            if expires_at <= self._clock():
+                del self._entries[apikey]
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, apikey: str) -> None:
+        with self._lock:
+            self._entries[apikey] = self._clock() + self._ttl
+            self._entries.move_to_end(apikey)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, apikey: str) -> None:
+        with self._lock:
+            self._entries.pop(apikey, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class BloomFilter:
+    """
+    Plain Bloom filter over strings (no false negatives, tunable false positives).
+    Positions are derived by double hashing a single BLAKE2b digest.
+    """
+
+    def __init__(self, size_bits: int, num_hashes: int) -> None:
+        self.size_bits = max(8, int(size_bits))
+        self.num_hashes = max(1, int(num_hashes))
+        self._bits = bytearray((self.size_bits + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity: int, fp_rate: float = 0.001) -> "BloomFilter":
+        capacity = max(1, int(capacity))
+        size_bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        num_hashes = round(size_bits / capacity * math.log(2))
+        return cls(size_bits, num_hashes)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class ApiKeyFilter:
+    """
+    Decide, without a network call, that an API key is certainly not valid.
+
+    - The negative cache remembers keys that Redis recently reported as
+      unknown or disabled.
+    - The optional Bloom filter holds every `apikey:*` key found by SCAN;
+      a key absent from it cannot exist. It is rebuilt periodically to
+      forget deleted keys, and is bypassed until the first build (and after
+      a lost subscription) so that valid keys are never rejected.
+
+    `on_change` is meant to be wired to `ApiKeyEventListener` so that newly
+    created or re-enabled keys are accepted immediately. Each event bumps
+    `generation`: a miss whose lookup started before an event is not
+    recorded, since the event may have created the key in between.
+    """
+
+    def __init__(
+        self,
+        negative_cache: NegativeCache,
+        *,
+        bloom_enabled: bool = False,
+        bloom_fp_rate: float = 0.001,
+        bloom_rebuild_interval: float = 300.0,
+        scan_count: int = 1000,
+    ) -> None:
+        self.negative = negative_cache
+        self._bloom_enabled = bloom_enabled
+        self._bloom_fp_rate = bloom_fp_rate
+        self._bloom_rebuild_interval = bloom_rebuild_interval
+        self._scan_count = scan_count
+
+        self._bloom: Optional[BloomFilter] = None
+        self._bloom_lock = threading.Lock()
+        # Keys announced while a rebuild is scanning, replayed into the new filter
+        self._pending_adds: Optional[list[str]] = None
+        self._rebuild_requested = threading.Event()
+        self._stop = threading.Event()
+
+        # Bumped by every change event; guards record_missing against stale misses
+        self.generation = 0
+        self._generation_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.negative_rejections = 0
+        self.bloom_rejections = 0
+
+    def rejection_reason(self, apikey: str) -> Optional[str]:
+        """
+        Return "negative_cache" or "bloom" when `apikey` is known invalid, else None.
+        """
+        if apikey in self.negative:
+            self.negative_rejections += 1
+            return "negative_cache"
+        bloom = self._bloom
+        if bloom is not None and apikey not in bloom:
+            self.bloom_rejections += 1
+            return "bloom"
+        return None
+
+    def record_missing(self, apikey: str, generation: Optional[int] = None) -> bool:
+        """
+        Remember `apikey` as invalid, unless a change event arrived since
+        `generation` (read before the lookup). Return True when recorded.
+        """
+        with self._generation_lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self.negative.add(apikey)
+            return True
+
+    def on_change(self, apikey: Optional[str]) -> None:
+        """
+        React to an API key being created/changed (or None: state unknown).
+        """
+        with self._generation_lock:
+            self.generation += 1
+
+        if apikey is None:
+            self.negative.clear()
+            if self._bloom_enabled:
+                with self._bloom_lock:
+                    self._bloom = None
+                self._rebuild_requested.set()
+            return
+
+        self.negative.discard(apikey)
+        with self._bloom_lock:
+            if self._bloom is not None:
+                self._bloom.add(apikey)
+            if self._pending_adds is not None:
+                self._pending_adds.append(apikey)
+
+    def rebuild(self, r: redis.Redis) -> int:
+        """
+        Rebuild the Bloom filter from `SCAN apikey:*`. Return the number of keys.
+        """
+        with self._bloom_lock:
+            self._pending_adds = []
+        try:
+            prefix = len("apikey:")
+            keys = [key[prefix:].decode() for key in r.scan_iter(match="apikey:*", count=self._scan_count)]
+            bloom = BloomFilter.for_capacity(max(len(keys) * 2, 1024), self._bloom_fp_rate)
+            for apikey in keys:
+                bloom.add(apikey)
+            with self._bloom_lock:
+                for apikey in self._pending_adds:
+                    bloom.add(apikey)
+                self._bloom = bloom
+        finally:
+            with self._bloom_lock:
+                self._pending_adds = None
+        logger.info("API key Bloom filter rebuilt", extra={"keys": len(keys)})
+        return len(keys)
+
+    def start(self, r: redis.Redis) -> None:
+        """
+        Build the Bloom filter in the background and keep it fresh.
+        """
+        if not self._bloom_enabled or self._thread is not None:
+            return
+        self._rebuild_requested.set()
+        self._thread = threading.Thread(target=self._run, args=(r,), name="apikey-bloom", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._rebuild_requested.set()
+
+    def stats(self) -> dict:
+        return {
+            "negative_size": len(self.negative),
+            "negative_rejections": self.negative_rejections,
+            "bloom": "disabled" if not self._bloom_enabled else ("ready" if self._bloom else "building"),
+            "bloom_rejections": self.bloom_rejections,
+        }
+
+    def _run(self, r: redis.Redis) -> None:
+        while not self._stop.is_set():
+            self._rebuild_requested.wait(self._bloom_rebuild_interval)
+            if self._stop.is_set():
+                return
+            self._rebuild_requested.clear()
+            try:
+                self.rebuild(r)
+            except redis.exceptions.RedisError as exc:
+                logger.warning("API key Bloom filter rebuild failed: %s", exc)
+                self._stop.wait(5.0)
+                self._rebuild_requested.set()
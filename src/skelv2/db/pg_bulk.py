@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Bulk writes (COPY and multi-row inserts)"""
+
+__updated__ = "2026-10-17 22:26:54"
+
+import datetime
+import io
+import json
+from typing import Any, Iterable, Optional, Sequence
+
+from psycopg2.extras import execute_values
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_COPY_BUFFER = 64 * 1024
+
+# COPY text format escapes (backslash first)
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def quote_ident(name: str) -> str:
+    """
+    Quote a possibly schema-qualified identifier: 'ops.qso' -> '"ops"."qso"'.
+    """
+    return ".".join('"' + part.replace('"', '""') + '"' for part in name.split("."))
+
+
+def _copy_value(value: Any) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (int, float)):
+        return repr(value) if isinstance(value, float) else str(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, separators=(",", ":"), default=str)
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class CopyStream(io.TextIOBase):
+    """
+    Read-only file object that renders `rows` in COPY text format on demand.
+
+    `copy_expert` pulls `size` characters at a time, so only about one
+    buffer of encoded rows exists at any moment, however many rows the
+    iterable yields.
+    """
+
+    def __init__(self, rows: Iterable[Sequence[Any]]) -> None:
+        super().__init__()
+        self._rows = iter(rows)
+        self._buffer: list[str] = []
+        self._buffered = 0
+        self.rows = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: Optional[int] = -1) -> str:
+        want = size if size is not None and size >= 0 else None
+        while want is None or self._buffered < want:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            line = "\t".join(_copy_value(value) for value in row) + "\n"
+            self._buffer.append(line)
+            self._buffered += len(line)
+            self.rows += 1
+
+        data = "".join(self._buffer)
+        if want is not None and len(data) > want:
+            data, rest = data[:want], data[want:]
+            self._buffer = [rest]
+            self._buffered = len(rest)
+        else:
+            self._buffer = []
+            self._buffered = 0
+        return data
+
+
+def copy_rows(
+    cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    buffer_size: int = DEFAULT_COPY_BUFFER,
+) -> int:
+    """
+    Stream `rows` into `table` with `COPY ... FROM STDIN` and return the
+    number of rows sent. Fastest path for plain appends; the caller commits.
+    """
+    stream = CopyStream(rows)
+    column_list = ", ".join(quote_ident(column) for column in columns)
+    cursor.copy_expert(f"COPY {quote_ident(table)} ({column_list}) FROM STDIN", stream, size=buffer_size)
+    return stream.rows
+
+
+def insert_sql(
+    table: str,
+    columns: Sequence[str],
+    *,
+    conflict_columns: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None,
+) -> str:
+    """
+    INSERT ... VALUES %s statement for `execute_values`, optionally an upsert:
+    - `conflict_columns` alone: ON CONFLICT (...) DO NOTHING
+    - with `update_columns`:   ON CONFLICT (...) DO UPDATE SET col = EXCLUDED.col
+    """
+    statement = (
+        f"INSERT INTO {quote_ident(table)} ({', '.join(quote_ident(c) for c in columns)}) VALUES %s"
+    )
+    if conflict_columns:
+        target = ", ".join(quote_ident(c) for c in conflict_columns)
+        if update_columns:
+            assignments = ", ".join(f"{quote_ident(c)} = EXCLUDED.{quote_ident(c)}" for c in update_columns)
+            statement += f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+        else:
+            statement += f" ON CONFLICT ({target}) DO NOTHING"
+    return statement
+
+
+def insert_many(
+    cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    conflict_columns: Optional[Sequence[str]] = None,
+    update_columns: Optional[Sequence[str]] = None,
+) -> int:
+    """
+    Insert (or upsert, see `insert_sql`) `rows` with one multi-row
+    statement per `page_size` rows. Return the number of rows sent.
+    Unlike COPY it handles conflicts; the caller commits.
+    """
+    statement = insert_sql(table, columns, conflict_columns=conflict_columns, update_columns=update_columns)
+    page: list = []
+    sent = 0
+    for row in rows:
+        page.append(row)
+        if len(page) >= page_size:
+            execute_values(cursor, statement, page, page_size=page_size)
+            sent += len(page)
+            page = []
+    if page:
+        execute_values(cursor, statement, page, page_size=page_size)
+        sent += len(page)
+    return sent
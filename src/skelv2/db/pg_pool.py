@@ -5,28 +5,338 @@
 
 """Database management package"""
 
-__updated__ = "2025-12-15 17:34:44"
+__updated__ = "2026-10-17 20:31:07"
 
 
-from psycopg2 import pool
-from typing import Any
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
 
+import psycopg2
+from psycopg2 import extensions, pool
+
+logger = logging.getLogger(__name__)
 
 minconn = 1  # fail-safe minimum number of connections to keep in the pool
 maxconn = 20  # fail-safe maximum number of connections to keep in the pool
 
 
-def create_pg_pool(config: dict) -> Any:
+class PoolTimeout(pool.PoolError):
     """
-    Create a psycopg2 SimpleConnectionPool based on configuration.
+    No connection became available within the checkout timeout.
     """
-    return pool.SimpleConnectionPool(
-        host=config["PG_HOST"],
-        port=config["PG_PORT"],
-        user=config["PG_USER"],
-        password=config["PG_PASSWORD"],
-        database=config["PG_DBNAME"],
+
+
+class _Slot:
+    __slots__ = ("conn", "created_at", "returned_at")
+
+    def __init__(self, conn, created_at: float) -> None:
+        self.conn = conn
+        self.created_at = created_at
+        self.returned_at = created_at
+
+
+class BlockingPgPool:
+    """
+    Thread-safe Postgres pool, a drop-in for psycopg2's pools
+    (`getconn` / `putconn` / `closeall`) that waits instead of failing.
+
+    - `getconn(timeout)` blocks up to `timeout` seconds for a free connection,
+      then raises `PoolTimeout` (a `psycopg2.pool.PoolError`)
+    - `connection()` is the context-manager form
+    - on checkout, closed connections are replaced, and connections idle for
+      more than `validate_after` seconds are checked with `SELECT 1`
+    - connections older than `max_lifetime` are retired, idle ones beyond
+      `minconn` are closed after `max_idle` seconds by `reap()`
+    - connections returned inside a transaction are rolled back, broken
+      ones are closed
+    - `stats()` reports pool usage and checkout wait times
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        *,
+        minconn: int = minconn,
+        maxconn: int = maxconn,
+        timeout: float = 5.0,
+        max_lifetime: float = 1800.0,
+        max_idle: float = 300.0,
+        validate_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Invalid pool size: minconn={minconn}, maxconn={maxconn}")
+        self._connect = connect
+        self.minconn = int(minconn)
+        self.maxconn = int(maxconn)
+        self.timeout = float(timeout)
+        self.max_lifetime = float(max_lifetime)
+        self.max_idle = float(max_idle)
+        self.validate_after = float(validate_after)
+        self._clock = clock
+
+        self._cond = threading.Condition(threading.Lock())
+        # Most recently returned last: checkouts reuse warm connections
+        self._idle: deque[_Slot] = deque()
+        self._used: dict[int, _Slot] = {}
+        # Idle + in use + being opened
+        self._size = 0
+        self._waiting = 0
+        self.closed = False
+
+        self._checkouts = 0
+        self._waited = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._replaced = 0
+
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+
+        for _ in range(self.minconn):
+            self._size += 1
+            self._idle.append(self._open())
+
+    # --- checkout ----------------------------------------------------------
+
+    def getconn(self, timeout: Optional[float] = None):
+        timeout = self.timeout if timeout is None else float(timeout)
+        started = self._clock()
+        deadline = started + timeout
+        waited = False
+
+        while True:
+            slot = None
+            with self._cond:
+                if self.closed:
+                    raise pool.PoolError("connection pool is closed")
+                self._waiting += 1
+                try:
+                    while not self._idle and self._size >= self.maxconn:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            self._timeouts += 1
+                            raise PoolTimeout(f"no connection available within {timeout}s")
+                        waited = True
+                        self._cond.wait(remaining)
+                        if self.closed:
+                            raise pool.PoolError("connection pool is closed")
+                finally:
+                    self._waiting -= 1
+                if self._idle:
+                    slot = self._idle.pop()
+                else:
+                    # Reserve the seat, connect outside the lock
+                    self._size += 1
+
+            # Network round trips happen without holding the lock
+            if slot is None:
+                slot = self._open_reserved()
+            elif not self._usable(slot):
+                self._discard(slot)
+                with self._cond:
+                    self._replaced += 1
+                continue
+
+            with self._cond:
+                self._used[id(slot.conn)] = slot
+                wait = self._clock() - started
+                self._checkouts += 1
+                self._waited += waited
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+            return slot.conn
+
+    def putconn(self, conn, key=None, close: bool = False) -> None:  # pylint: disable=unused-argument
+        with self._cond:
+            slot = self._used.pop(id(conn), None)
+        if slot is None:
+            if self.closed:
+                # closeall() already closed it under the caller
+                return
+            raise pool.PoolError("trying to put unkeyed connection")
+
+        if not close and not self.closed and self._reset(slot):
+            slot.returned_at = self._clock()
+            with self._cond:
+                if not self.closed:
+                    self._idle.append(slot)
+                    self._cond.notify()
+                    return
+        self._discard(slot)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Check out a connection for the duration of the block.
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    # --- lifecycle ---------------------------------------------------------
+
+    def reap(self) -> int:
+        """
+        Close idle connections past `max_idle` (keeping `minconn`) or past
+        `max_lifetime`. Return how many were closed.
+        """
+        now = self._clock()
+        expired = []
+        with self._cond:
+            keep = deque()
+            # Oldest returned first, so the warmest connections survive
+            for slot in self._idle:
+                idle_too_long = now - slot.returned_at > self.max_idle and self._size - len(expired) > self.minconn
+                if idle_too_long or self._expired(slot, now):
+                    expired.append(slot)
+                else:
+                    keep.append(slot)
+            self._idle = keep
+        for slot in expired:
+            self._discard(slot)
+        return len(expired)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Run `reap()` in a daemon thread every `interval` seconds.
+        """
+        if self._reaper is not None:
+            return
+        interval = interval or max(1.0, min(self.max_idle, self.max_lifetime) / 4)
+        self._reaper = threading.Thread(target=self._run, args=(interval,), name="pg-pool-reaper", daemon=True)
+        self._reaper.start()
+
+    def closeall(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self.closed = True
+            slots = list(self._idle) + list(self._used.values())
+            self._idle.clear()
+            self._used.clear()
+            self._cond.notify_all()
+        for slot in slots:
+            self._discard(slot)
+
+    def stats(self) -> dict:
+        with self._cond:
+            in_use = len(self._used)
+            return {
+                "size": self._size,
+                "in_use": in_use,
+                "idle": len(self._idle),
+                "max": self.maxconn,
+                "waiting": self._waiting,
+                "saturation": round(in_use / self.maxconn, 3),
+                "checkouts": self._checkouts,
+                "checkouts_waited": self._waited,
+                "timeouts": self._timeouts,
+                "replaced": self._replaced,
+                "wait_avg_ms": round(self._wait_total / self._checkouts * 1000.0, 3) if self._checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000.0, 3),
+            }
+
+    # --- internals ---------------------------------------------------------
+
+    def _open(self) -> _Slot:
+        return _Slot(self._connect(), self._clock())
+
+    def _open_reserved(self) -> _Slot:
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _discard(self, slot: _Slot) -> None:
+        try:
+            slot.conn.close()
+        except Exception:  # pylint: disable=broad-except
+            pass
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _expired(self, slot: _Slot, now: float) -> bool:
+        return self.max_lifetime > 0 and now - slot.created_at > self.max_lifetime
+
+    def _usable(self, slot: _Slot) -> bool:
+        conn = slot.conn
+        now = self._clock()
+        if conn.closed or self._expired(slot, now):
+            return False
+        if now - slot.returned_at < self.validate_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _reset(self, slot: _Slot) -> bool:
+        # Leave the connection as a fresh one would be; False means "close it"
+        conn = slot.conn
+        if conn.closed or self._expired(slot, self._clock()):
+            return False
+        try:
+            status = conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status == extensions.TRANSACTION_STATUS_ACTIVE:
+                # A command is still running: cheaper to drop than to wait
+                return False
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            if conn.autocommit:
+                conn.autocommit = False
+            return True
+        except psycopg2.Error:
+            logger.warning("Dropping a Postgres connection that failed to reset", exc_info=True)
+            return False
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.reap()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Postgres pool reaping failed")
+
+
+def create_pg_pool(config: dict) -> BlockingPgPool:
+    """
+    Create a BlockingPgPool based on configuration and start its reaper.
+    """
+
+    def connect():
+        return psycopg2.connect(
+            host=config["PG_HOST"],
+            port=config["PG_PORT"],
+            user=config["PG_USER"],
+            password=config["PG_PASSWORD"],
+            database=config["PG_DBNAME"],
+            sslmode=config["PG_SSLMODE"],
+            connect_timeout=int(config.get("PG_CONNECT_TIMEOUT", 5)),
+        )
+
+    pg_pool = BlockingPgPool(
+        connect,
         minconn=int(config.get("PG_MIN_CONN", minconn)),
         maxconn=int(config.get("PG_MAX_CONN", maxconn)),
-        sslmode=config["PG_SSLMODE"],
+        timeout=float(config.get("PG_POOL_TIMEOUT", 5)),
+        max_lifetime=float(config.get("PG_MAX_LIFETIME", 1800)),
+        max_idle=float(config.get("PG_MAX_IDLE", 300)),
+        validate_after=float(config.get("PG_VALIDATE_AFTER", 30)),
     )
+    pg_pool.start()
+    return pg_pool
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Server-side prepared statements per connection"""
+
+__updated__ = "2026-10-17 21:24:16"
+
+import re
+import threading
+import weakref
+from typing import Any, Optional, Sequence, Union
+
+from psycopg2 import errors, extensions
+
+# "%s", "%(name)s" and the "%%" escape, as accepted by cursor.execute()
+_PLACEHOLDER_RE = re.compile(r"%%|%\((\w+)\)s|%s")
+_NAME_RE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+Params = Union[Sequence[Any], dict, None]
+
+
+class Statement:
+    """
+    One registered query: psycopg2-style SQL rewritten to $n placeholders.
+    """
+
+    __slots__ = ("name", "sql", "server_sql", "param_names", "param_count")
+
+    def __init__(self, name: str, sql: str) -> None:
+        if not _NAME_RE.match(name):
+            raise ValueError(f"Invalid statement name {name!r} (lowercase identifier expected)")
+        self.name = name
+        self.sql = sql
+        self.param_names: list[str] = []
+        positional = 0
+        named: dict[str, int] = {}
+
+        def rewrite(match: re.Match) -> str:
+            nonlocal positional
+            if match.group(0) == "%%":
+                return "%"
+            key = match.group(1)
+            if key is None:
+                positional += 1
+                return f"${positional}"
+            if key not in named:
+                named[key] = len(named) + 1
+                self.param_names.append(key)
+            return f"${named[key]}"
+
+        self.server_sql = _PLACEHOLDER_RE.sub(rewrite, sql)
+        if positional and named:
+            raise ValueError(f"Statement {name!r} mixes %s and %(name)s placeholders")
+        self.param_count = positional or len(named)
+
+    def execute_sql(self) -> str:
+        if not self.param_count:
+            return f"EXECUTE {self.name};"
+        return f"EXECUTE {self.name} ({', '.join(['%s'] * self.param_count)});"
+
+    def bind(self, params: Params) -> tuple:
+        if self.param_names:
+            return tuple(params[key] for key in self.param_names)
+        values = tuple(params or ())
+        if len(values) != self.param_count:
+            raise ValueError(f"Statement {self.name!r} takes {self.param_count} parameters, got {len(values)}")
+        return values
+
+
+class PreparedStatements:
+    """
+    Registry of hot queries, prepared server-side on each connection the
+    first time it runs them there, so Postgres parses (and, after a few
+    executions, plans) them once per connection instead of every time.
+
+        STATEMENTS.register("customer_by_id", "SELECT * FROM customers WHERE id = %s")
+        STATEMENTS.execute(cursor, "customer_by_id", (42,))
+
+    Which connections hold which statements is tracked per connection
+    object and backend pid: a replaced or reconnected connection simply
+    prepares again. If the server lost them anyway (DISCARD ALL, a pooler
+    switching backends), the statement is prepared again and retried when
+    that is safe, i.e. when it was the first statement of the transaction.
+    """
+
+    def __init__(self) -> None:
+        self._statements: dict[str, Statement] = {}
+        # connection -> (backend pid, names prepared on that backend)
+        self._prepared: "weakref.WeakKeyDictionary[Any, tuple[int, set[str]]]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.prepares = 0
+        self.executions = 0
+
+    def register(self, name: str, sql: str) -> Statement:
+        statement = Statement(name, sql)
+        with self._lock:
+            existing = self._statements.get(name)
+            if existing is not None and existing.sql != sql:
+                raise ValueError(f"Statement {name!r} is already registered with different SQL")
+            self._statements.setdefault(name, statement)
+        return self._statements[name]
+
+    def get(self, name: str) -> Optional[Statement]:
+        return self._statements.get(name)
+
+    def execute(self, cursor, name: str, params: Params = None):
+        """
+        Run statement `name` on `cursor`, preparing it on the connection first
+        if needed. Results are read from the cursor as usual.
+        """
+        statement = self._statements[name]
+        conn = cursor.connection
+        values = statement.bind(params)
+        first_in_transaction = conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+
+        self._ensure_prepared(cursor, statement)
+        try:
+            cursor.execute(statement.execute_sql(), values)
+        except errors.InvalidSqlStatementName:
+            self.forget(conn)
+            if not first_in_transaction:
+                # The failure aborted work we cannot replay; the next call prepares again
+                raise
+            conn.rollback()
+            self._ensure_prepared(cursor, statement)
+            cursor.execute(statement.execute_sql(), values)
+        self.executions += 1
+        return cursor
+
+    def is_prepared(self, conn, name: str) -> bool:
+        entry = self._prepared.get(conn)
+        return entry is not None and entry[0] == conn.info.backend_pid and name in entry[1]
+
+    def forget(self, conn) -> None:
+        """
+        Drop what we know about `conn` (e.g. after DISCARD ALL).
+        """
+        with self._lock:
+            self._prepared.pop(conn, None)
+
+    def stats(self) -> dict:
+        return {
+            "statements": len(self._statements),
+            "connections": len(self._prepared),
+            "prepares": self.prepares,
+            "executions": self.executions,
+        }
+
+    def _ensure_prepared(self, cursor, statement: Statement) -> None:
+        conn = cursor.connection
+        if self.is_prepared(conn, statement.name):
+            return
+        backend_pid = conn.info.backend_pid
+        cursor.execute(f"PREPARE {statement.name} AS {statement.server_sql}")
+        with self._lock:
+            entry = self._prepared.get(conn)
+            if entry is None or entry[0] != backend_pid:
+                entry = self._prepared[conn] = (backend_pid, set())
+            entry[1].add(statement.name)
+            self.prepares += 1
+
+
+STATEMENTS = PreparedStatements()
@@ -5,11 +5,17 @@
 
 """Database management package"""
 
-__updated__ = "2025-12-15 17:36:06"
+__updated__ = "2026-10-18 06:04:37"
 
 import json
+import logging
 import redis
-from typing import Optional, Dict
+from typing import Dict, Iterable, Optional
+
+from .apikey_endpoints import DENY_ALL, compile_endpoints
+from .apikey_events import APIKEY_EVENTS_CHANNEL
+
+logger = logging.getLogger(__name__)
 
 
 def get_apikey_metadata(r: redis.Redis, apikey: str) -> Optional[Dict]:
@@ -17,6 +23,11 @@ def get_apikey_metadata(r: redis.Redis, apikey: str) -> Optional[Dict]:
     Return a dict with API key metadata if present and enabled,
     or None if it does not exist or is disabled.
 
+    `allowed_endpoints` is also compiled into `endpoint_matcher`
+    (see `db.apikey_endpoints`), or None when the key is unrestricted
+    (field missing or an empty list). A malformed value denies every
+    endpoint.
+
     r: existing Redis client (redis.Redis)
     
     ---
@@ -49,7 +60,29 @@ def get_apikey_metadata(r: redis.Redis, apikey: str) -> Optional[Dict]:
 
     key = f"apikey:{apikey}"
     data = r.hgetall(key)  # dict {b'field': b'value'}
+    return _decode_apikey(data)
+
+
+def get_apikey_metadata_many(r: redis.Redis, apikeys: Iterable[str]) -> Dict[str, Optional[Dict]]:
+    """
+    Bulk `get_apikey_metadata`: one pipelined round trip for every key.
+    Return {apikey: metadata or None}; empty keys map to None.
+    """
+    apikeys = list(apikeys)
+    wanted = [apikey for apikey in dict.fromkeys(apikeys) if apikey]
+    result: Dict[str, Optional[Dict]] = {apikey: None for apikey in apikeys if not apikey}
+    if not wanted:
+        return result
 
+    pipe = r.pipeline(transaction=False)
+    for apikey in wanted:
+        pipe.hgetall(f"apikey:{apikey}")
+    for apikey, data in zip(wanted, pipe.execute()):
+        result[apikey] = _decode_apikey(data)
+    return result
+
+
+def _decode_apikey(data: Dict) -> Optional[Dict]:
     if not data:
         return None
 
@@ -65,11 +98,16 @@ def get_apikey_metadata(r: redis.Redis, apikey: str) -> Optional[Dict]:
             decoded[field] = int(decoded[field])
 
     # 3) Parse JSON fields
+    owner = f"customer {decoded.get('customer_id', '?')}"
     if "allowed_endpoints" in decoded:
         try:
             decoded["allowed_endpoints"] = json.loads(decoded["allowed_endpoints"])
         except json.JSONDecodeError:
-            decoded["allowed_endpoints"] = []
+            # Present but unreadable: fail closed, never "unrestricted"
+            logger.warning("allowed_endpoints of %s is malformed JSON, denying every endpoint", owner)
+            decoded["endpoint_matcher"] = DENY_ALL
+    if "endpoint_matcher" not in decoded:
+        decoded["endpoint_matcher"] = compile_endpoints(decoded.get("allowed_endpoints"), owner)
 
     if "metadata" in decoded:
         try:
@@ -78,3 +116,26 @@ def get_apikey_metadata(r: redis.Redis, apikey: str) -> Optional[Dict]:
             decoded["metadata"] = {}
 
     return decoded
+
+
+def save_apikey(
+    r: redis.Redis,
+    apikey: str,
+    fields: Dict,
+    channel: str = APIKEY_EVENTS_CHANNEL,
+) -> None:
+    """
+    Create or update `apikey:{apikey}` and notify every API process,
+    in a single round trip. Dict/list values are stored as JSON.
+
+    Use this (or publish on `channel` yourself) when provisioning keys so
+    that per-process caches and negative lookups pick up the change.
+    """
+    mapping = {
+        k: json.dumps(v) if isinstance(v, (dict, list)) else str(v)
+        for k, v in fields.items()
+    }
+    pipe = r.pipeline(transaction=False)
+    pipe.hset(f"apikey:{apikey}", mapping=mapping)
+    pipe.publish(channel, apikey)
+    pipe.execute()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Auto-pipelining Redis wrapper"""
+
+__updated__ = "2026-10-18 08:24:48"
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Optional
+
+import redis
+
+
+class _Command:
+    __slots__ = ("name", "args", "kwargs", "future")
+
+    def __init__(self, name: str, args: tuple, kwargs: dict) -> None:
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.future: Future = Future()
+
+
+def _execute(client: redis.Redis, commands: list) -> None:
+    """
+    Send `commands` in one non-transactional pipeline and resolve their futures.
+    Commands whose caller gave up (cancelled futures) are not sent.
+    """
+    commands = [command for command in commands if command.future.set_running_or_notify_cancel()]
+    if not commands:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for command in commands:
+            getattr(pipe, command.name)(*command.args, **command.kwargs)
+        results = pipe.execute(raise_on_error=False)
+    except Exception as exc:  # pylint: disable=broad-except
+        # Connection-level failure: every command of the batch fails with it
+        for command in commands:
+            command.future.set_exception(exc)
+        return
+    for command, result in zip(commands, results):
+        if isinstance(result, Exception):
+            command.future.set_exception(result)
+        else:
+            command.future.set_result(result)
+
+
+class PipelineBatch:
+    """
+    Commands collected explicitly and sent in one round trip:
+
+        with autopipe.batch() as batch:
+            first = batch.hgetall("apikey:a")
+            second = batch.get("counter")
+        first.result(), second.result()
+
+    Every command returns a Future. The batch is sent when the block ends,
+    or earlier when a result is needed (`batch.execute()`).
+    """
+
+    def __init__(self, client: redis.Redis) -> None:
+        self._client = client
+        self._commands: list[_Command] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> Future:
+            command = _Command(name, args, kwargs)
+            self._commands.append(command)
+            return command.future
+
+        return queue
+
+    def execute(self) -> None:
+        commands, self._commands = self._commands, []
+        if commands:
+            _execute(self._client, commands)
+
+    def __enter__(self) -> "PipelineBatch":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        self.execute()
+        return False
+
+
+class AutoPipeline:
+    """
+    Drop-in for the redis.Redis commands that coalesces concurrent callers.
+
+    `autopipe.hgetall(key)` blocks and returns the reply like redis.Redis
+    does, but the command is handed to a flusher thread that sends whatever
+    has queued up (at most `max_batch` commands) as one pipeline. While one
+    pipeline is on the wire, new commands accumulate for the next one: an
+    idle process pays no extra latency, a busy one pays one round trip per
+    batch instead of per command. `window_us` optionally holds each batch
+    open a few microseconds longer to gather more commands.
+
+    A blocking call waits at most `timeout` seconds (default: the pool's
+    socket timeout plus the window) and then raises redis TimeoutError, so
+    a stalled flusher fails like a slow Redis would; the command is dropped
+    if it was not sent yet.
+
+    `submit(name, *args)` returns the Future instead of waiting for it, and
+    `batch()` groups the commands of one request explicitly. Commands
+    needing a dedicated connection (pub/sub, blocking pops, transactions,
+    scripts) should go to the wrapped `client`.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        *,
+        window_us: float = 0.0,
+        max_batch: int = 128,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.window = max(0.0, float(window_us)) / 1_000_000
+        self.max_batch = max(1, int(max_batch))
+        if timeout is None:
+            pool = getattr(client, "connection_pool", None)
+            socket_timeout = getattr(pool, "connection_kwargs", {}).get("socket_timeout")
+            timeout = None if socket_timeout is None else float(socket_timeout) + self.window
+        self.timeout = timeout
+        self._queue: list[_Command] = []
+        self._cond = threading.Condition(threading.Lock())
+        self._pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.commands = 0
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def submit(self, name: str, *args, **kwargs) -> Future:
+        command = _Command(name, args, kwargs)
+        self._ensure_started()
+        with self._cond:
+            self._queue.append(command)
+            self._cond.notify()
+        return command.future
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not callable(getattr(self.client, name, None)):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs) -> Any:
+            future = self.submit(name, *args, **kwargs)
+            try:
+                return future.result(self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise redis.exceptions.TimeoutError(
+                    f"No auto-pipelined reply to {name} within {self.timeout:.3f}s"
+                ) from None
+
+        return call
+
+    def batch(self) -> PipelineBatch:
+        return PipelineBatch(self.client)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None):
+        return self.client.pipeline(transaction=transaction, shard_hint=shard_hint)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "commands": self.commands,
+            "avg_batch": round(self.commands / self.batches, 2) if self.batches else 0.0,
+            "queued": len(self._queue),
+        }
+
+    def _reset_after_fork(self) -> None:
+        # The parent's flusher does not exist here and its lock may be held
+        self._queue = []
+        self._cond = threading.Condition(threading.Lock())
+        self._pid = None
+
+    def _ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._cond:
+            if self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name="redis-autopipe", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+            if self.window:
+                time.sleep(self.window)
+            with self._cond:
+                commands = self._queue[: self.max_batch]
+                del self._queue[: self.max_batch]
+            self.batches += 1
+            self.commands += len(commands)
+            _execute(self.client, commands)
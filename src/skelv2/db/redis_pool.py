@@ -5,27 +5,152 @@
 
 """Database management package"""
 
-__updated__ = "2025-12-15 17:21:19"
+__updated__ = "2026-10-18 00:38:55"
 
 
+import threading
+import time
+
 import redis
 
 
-def create_redis_pool(config: dict) -> redis.ConnectionPool:
+class RedisPoolTimeout(redis.exceptions.ConnectionError):
+    """
+    No Redis connection became available within the pool timeout.
+    """
+
+
+class InstrumentedBlockingConnectionPool(redis.BlockingConnectionPool):
+    """
+    BlockingConnectionPool (waits up to `timeout` seconds for a free
+    connection instead of failing) with:
+
+    - usage statistics: in use / idle / waiting, checkout wait times, timeouts
+    - idle trimming: sockets unused for `max_idle_time` seconds are closed
+      (checked on release, at most twice per `max_idle_time`); the slot
+      reconnects transparently the next time it is handed out
+    """
+
+    def __init__(self, *args, max_idle_time: float = 0.0, **kwargs) -> None:
+        # reset() runs inside the base __init__ and needs these
+        self._stats_lock = threading.Lock()
+        self._checked_out: set[int] = set()
+        self._waiting = 0
+        self.max_idle_time = float(max_idle_time)
+        self._last_trim = time.monotonic()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.trimmed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        super().__init__(*args, **kwargs)
+
+    def get_connection(self, *args, **kwargs):
+        started = time.monotonic()
+        with self._stats_lock:
+            self._waiting += 1
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except redis.exceptions.ConnectionError as exc:
+            if "No connection available" not in str(exc):
+                raise
+            with self._stats_lock:
+                self.timeouts += 1
+            raise RedisPoolTimeout(f"no Redis connection available within {self.timeout}s") from exc
+        finally:
+            with self._stats_lock:
+                self._waiting -= 1
+
+        wait = time.monotonic() - started
+        with self._stats_lock:
+            self._checked_out.add(id(connection))
+            self.checkouts += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+        return connection
+
+    def release(self, connection) -> None:
+        now = time.monotonic()
+        with self._stats_lock:
+            self._checked_out.discard(id(connection))
+        connection._skel_released_at = now  # pylint: disable=protected-access
+        super().release(connection)
+        if self.max_idle_time > 0 and now - self._last_trim >= self.max_idle_time / 2:
+            self.trim_idle(now)
+
+    def reset(self) -> None:
+        # Also runs after a fork: the parent's checkouts are not ours
+        with self._stats_lock:
+            self._checked_out = set()
+        super().reset()
+
+    def trim_idle(self, now: float = None) -> int:
+        """
+        Disconnect idle connections unused for more than `max_idle_time`.
+        """
+        now = time.monotonic() if now is None else now
+        self._last_trim = now
+        trimmed = 0
+        # Hold the queue's own mutex so nobody checks one out meanwhile
+        with self.pool.mutex:
+            for connection in self.pool.queue:
+                if connection is None or getattr(connection, "_sock", None) is None:
+                    continue
+                if now - getattr(connection, "_skel_released_at", now) > self.max_idle_time:
+                    connection.disconnect()
+                    trimmed += 1
+        with self._stats_lock:
+            self.trimmed += trimmed
+        return trimmed
+
+    def stats(self) -> dict:
+        with self.pool.mutex:
+            idle = sum(
+                1 for c in self.pool.queue if c is not None and getattr(c, "_sock", None) is not None
+            )
+        with self._stats_lock:
+            in_use = len(self._checked_out)
+            return {
+                "in_use": in_use,
+                "idle": idle,
+                "max": self.max_connections,
+                "waiting": self._waiting,
+                "saturation": round(in_use / self.max_connections, 3),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "trimmed": self.trimmed,
+                "wait_avg_ms": round(self._wait_total / self.checkouts * 1000.0, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000.0, 3),
+            }
+
+
+def create_redis_pool(config: dict, **overrides) -> InstrumentedBlockingConnectionPool:
     """
-    Create a Redis connection pool from the provided config.
+    Create a blocking Redis connection pool from the provided config.
     If REDIS_PASSWORD is None, connect without authentication.
+    Keyword `overrides` are passed through to the pool (e.g. socket_timeout).
     """
     password = config.get("REDIS_PASSWORD") or None
 
-    return redis.ConnectionPool(
-        host=config["REDIS_HOST"],
-        port=config["REDIS_PORT"],
-        db=config["REDIS_DB"],
-        password=password,
-        max_connections=int(config.get("REDIS_MAX_CONN", 20)),
-        decode_responses=False,  # keep bytes and decode later in redis_apikeys
-    )
+    kwargs = {
+        "host": config["REDIS_HOST"],
+        "port": config["REDIS_PORT"],
+        "db": config["REDIS_DB"],
+        "password": password,
+        "max_connections": int(config.get("REDIS_MAX_CONN", 20)),
+        # Seconds to wait for a free connection before RedisPoolTimeout
+        "timeout": float(config.get("REDIS_POOL_TIMEOUT", 5)),
+        "socket_timeout": float(config.get("REDIS_SOCKET_TIMEOUT", 5)),
+        "socket_connect_timeout": float(config.get("REDIS_CONNECT_TIMEOUT", 2)),
+        "socket_keepalive": bool(config.get("REDIS_KEEPALIVE", True)),
+        # PING connections idle for longer than this before reusing them
+        "health_check_interval": float(config.get("REDIS_HEALTH_CHECK_INTERVAL", 30)),
+        "max_idle_time": float(config.get("REDIS_MAX_IDLE_TIME", 300)),
+        "decode_responses": False,  # keep bytes and decode later in redis_apikeys
+    }
+    kwargs.update(overrides)
+
+    return InstrumentedBlockingConnectionPool(**kwargs)
 
 
 def create_redis_client(pool: redis.ConnectionPool) -> redis.Redis:
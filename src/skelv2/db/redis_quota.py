@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Write-behind daily quota counters"""
+
+__updated__ = "2026-10-18 07:01:14"
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+# Daily counters outlive their day a little so late flushes still land
+QUOTA_KEY_TTL = 2 * 24 * 3600
+
+
+class QuotaResult(NamedTuple):
+    allowed: bool
+    quota: int
+    used: int  # best known total for today, including this request when allowed
+    reset_after: float  # seconds until the UTC day rolls over
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.quota - self.used)
+
+
+class QuotaCounter:
+    """
+    Per-process daily usage counters (`quota:{apikey}:{YYYYMMDD}` in Redis).
+
+    Increments are accumulated locally and flushed in one pipeline by a
+    background thread every `flush_interval` seconds, or as soon as a key
+    collects `max_overshoot` unflushed increments. That bounds how far this
+    process can run past a quota before it learns about it.
+
+    Keys seen for the first time today, and keys with `sync_margin` or fewer
+    requests left, are counted synchronously (one INCRBY) so the decision
+    near the limit is exact across processes.
+
+    Pending increments are flushed at interpreter exit, which gunicorn
+    workers reach on graceful restarts (max_requests, HUP, TERM).
+    """
+
+    def __init__(
+        self,
+        r: redis.Redis,
+        *,
+        flush_interval: float = 1.0,
+        max_overshoot: int = 50,
+        sync_margin: int = 500,
+        prefix: str = "quota:",
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._redis = r
+        self._flush_interval = float(flush_interval)
+        self._max_overshoot = max(1, int(max_overshoot))
+        self._sync_margin = max(0, int(sync_margin))
+        self._prefix = prefix
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._pending: dict[str, int] = {}
+        self._remote: dict[str, int] = {}
+        self._day: Optional[str] = None
+
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.sync_calls = 0
+        self.flushes = 0
+        self.flush_errors = 0
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="quota-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def close(self) -> None:
+        """
+        Stop the flusher and push whatever is still pending.
+        """
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(5.0)
+            self._thread = None
+        self.flush()
+
+    def consume(self, apikey: str, quota: int, cost: int = 1) -> QuotaResult:
+        """
+        Account `cost` requests for `apikey` against `quota` for the current UTC day.
+        Redis errors on the synchronous path propagate; nothing is lost locally.
+        """
+        now = self._clock()
+        day = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y%m%d")
+        reset_after = 86400 - now % 86400
+        key = f"{self._prefix}{apikey}:{day}"
+
+        with self._lock:
+            if day != self._day:
+                self._roll_day(day)
+            remote = self._remote.get(key)
+            pending = self._pending.get(key, 0)
+            estimate = (remote or 0) + pending
+
+            # Counters only grow during a day, so the estimate is a lower bound
+            if estimate + cost > quota:
+                return QuotaResult(False, quota, estimate, reset_after)
+
+            if remote is not None and quota - estimate > self._sync_margin:
+                pending += cost
+                self._pending[key] = pending
+                if pending >= self._max_overshoot:
+                    self._wakeup.set()
+                return QuotaResult(True, quota, estimate + cost, reset_after)
+
+            # Exact path: hand our pending increments to this call
+            self._pending.pop(key, None)
+
+        try:
+            total = self._incr(key, pending + cost)
+        except redis.exceptions.RedisError:
+            with self._lock:
+                self._pending[key] = self._pending.get(key, 0) + pending
+            raise
+
+        self.sync_calls += 1
+        allowed = total <= quota
+        if not allowed:
+            # Refund the rejected request: only served requests consume quota.
+            # The rejection stands even if Redis fails now; flush() refunds later.
+            try:
+                total = self._incr(key, -cost)
+            except redis.exceptions.RedisError as exc:
+                logger.warning("Quota refund failed, will retry: %s", exc)
+                total -= cost
+                with self._lock:
+                    self._pending[key] = self._pending.get(key, 0) - cost
+        with self._lock:
+            self._remote[key] = max(total, self._remote.get(key, 0))
+        return QuotaResult(allowed, quota, total, reset_after)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for key, amount in pending.items():
+                pipe.incrby(key, amount)
+                pipe.expire(key, QUOTA_KEY_TTL)
+            totals = pipe.execute()[::2]
+        except redis.exceptions.RedisError as exc:
+            self.flush_errors += 1
+            logger.warning("Quota flush failed, will retry: %s", exc)
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + amount
+            return
+
+        self.flushes += 1
+        with self._lock:
+            for key, total in zip(pending, totals):
+                self._remote[key] = max(int(total), self._remote.get(key, 0))
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = sum(self._pending.values())
+            keys = len(self._remote)
+        return {
+            "keys": keys,
+            "pending": pending,
+            "sync_calls": self.sync_calls,
+            "flushes": self.flushes,
+            "flush_errors": self.flush_errors,
+        }
+
+    def _incr(self, key: str, amount: int) -> int:
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.incrby(key, amount)
+        pipe.expire(key, QUOTA_KEY_TTL)
+        return int(pipe.execute()[0])
+
+    def _roll_day(self, day: str) -> None:
+        # Caller holds self._lock; yesterday's pending increments still get flushed
+        self._day = day
+        self._remote = {k: v for k, v in self._remote.items() if k.endswith(day)}
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            self.flush()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Database management package - Redis-backed rate limiting"""
+
+__updated__ = "2026-10-17 11:18:09"
+
+import math
+from typing import NamedTuple
+
+import redis
+
+# GCRA (generic cell rate algorithm) evaluated server-side in one round trip.
+# State is a single "theoretical arrival time" (TAT) in ms per key, using the
+# Redis clock so that every API process agrees on "now".
+#
+# KEYS[1] = rate limit key
+# ARGV[1] = limit (requests per period), ARGV[2] = period in ms, ARGV[3] = cost
+#
+# Returns {allowed (0/1), remaining, retry_after_ms, reset_after_ms}
+GCRA_LUA = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local emission = period / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1]))
+if not tat or tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission * cost
+local allow_at = new_tat - period
+if allow_at > now then
+    return {0, 0, math.ceil(allow_at - now), math.ceil(tat - now)}
+end
+
+redis.call('SET', KEYS[1], math.ceil(new_tat), 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now - allow_at) / emission), 0, math.ceil(new_tat - now)}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float  # seconds until the next request would be allowed
+    reset_after: float  # seconds until the full burst is available again
+
+    def headers(self) -> dict:
+        """
+        `RateLimit-*` (IETF draft) headers, plus `Retry-After` when denied.
+        """
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class RateLimiter:
+    """
+    Per-API-key limiter: `limit` requests per `period` seconds, bursts up to `limit`.
+
+    Each `hit` costs exactly one Redis round trip (EVALSHA). Redis errors,
+    including timeouts, propagate; callers apply `fail_open` (let the
+    request through) or fail closed (reject it) accordingly.
+    """
+
+    def __init__(
+        self,
+        r: redis.Redis,
+        *,
+        period: float = 60.0,
+        prefix: str = "ratelimit:",
+        fail_open: bool = True,
+    ) -> None:
+        self._script = r.register_script(GCRA_LUA)
+        self._period_ms = int(period * 1000)
+        self._prefix = prefix
+        self.fail_open = fail_open
+
+    def hit(self, apikey: str, limit: int, cost: int = 1) -> RateLimitResult:
+        allowed, remaining, retry_after_ms, reset_after_ms = self._script(
+            keys=[f"{self._prefix}{apikey}"],
+            args=[int(limit), self._period_ms, int(cost)],
+        )
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=int(limit),
+            remaining=int(remaining),
+            retry_after=int(retry_after_ms) / 1000.0,
+            reset_after=int(reset_after_ms) / 1000.0,
+        )
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Gunicorn server hooks (run in the master): shared metrics directory and cleanup."""
+
+from __future__ import annotations
+
+__updated__ = "2026-10-18 07:58:31"
+
+import glob
+import os
+import tempfile
+
+from .metrics import archive_process
+
+
+def on_starting(server) -> None:
+    """
+    Give every worker the same METRICS_DIR, emptied of a previous run's
+    files. Workers are forked after this, so they inherit the variable.
+    """
+    directory = os.environ.get("METRICS_DIR") or tempfile.mkdtemp(prefix="metrics-")
+    os.environ["METRICS_DIR"] = directory
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.unlink(path)
+    server.log.info("Metrics directory %s", directory)
+
+
+def child_exit(server, worker) -> None:
+    """
+    Merge the counters of an exited worker into the archive file.
+    """
+    directory = os.environ.get("METRICS_DIR")
+    if not directory:
+        return
+    try:
+        archive_process(directory, worker.pid)
+    except Exception:  # pylint: disable=broad-except
+        server.log.exception("Archiving the metrics of worker %s failed", worker.pid)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Metrics package"""
+
+__updated__ = "2026-10-18 07:52:50"
+
+from .exposition import CONTENT_TYPE, archive_process, generate_latest
+from .registry import REGISTRY, Counter, Gauge, Histogram, Registry
+
+__all__ = [
+    "CONTENT_TYPE",
+    "archive_process",
+    "generate_latest",
+    "REGISTRY",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "Registry",
+]
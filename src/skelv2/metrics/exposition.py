@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Metrics package - Prometheus text exposition across processes"""
+
+__updated__ = "2026-10-18 07:52:26"
+
+import glob
+import json
+import os
+from typing import Optional
+
+from .mmap_store import MmapValueFile, read_values
+from .registry import REGISTRY, Registry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Counter and histogram totals of exited processes, merged by archive_process
+ARCHIVE_FILE = "archive.db"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def collect(registry: Registry = REGISTRY, directory: Optional[str] = None) -> dict:
+    """
+    Merge every process file in the directory:
+    {metric name: {(sample name, sorted label items): value}}
+
+    Counters and histograms keep the totals of exited processes (archived
+    or not yet); gauges only count processes that are still alive.
+    """
+    registry.flush()
+    directory = directory or registry.directory
+    merged: dict[str, dict] = {}
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        name = os.path.basename(path)
+        if name == ARCHIVE_FILE:
+            pid, alive = None, False
+        else:
+            try:
+                pid, alive = int(name[:-3]), None
+            except ValueError:
+                continue
+        try:
+            values = list(read_values(path))
+        except FileNotFoundError:
+            continue  # archived since the glob
+        for key, value in values:
+            metric_name, sample, labels = json.loads(key)
+            metric = registry.get(metric_name)
+            if metric is None:
+                continue
+            if metric.kind == "gauge":
+                if alive is None:
+                    alive = _pid_alive(pid)
+                if not alive:
+                    continue
+            samples = merged.setdefault(metric_name, {})
+            sample_id = (sample, tuple(sorted(labels.items())))
+            samples[sample_id] = samples.get(sample_id, 0.0) + value
+    return merged
+
+
+def archive_process(directory: str, pid: int) -> bool:
+    """
+    Fold the counters and histograms of exited process `pid` into the
+    archive file and delete its own file, so the directory does not grow
+    with every restart. Gauges are dropped. Run by a single process (the
+    gunicorn master); return False when `pid` left no file.
+    """
+    path = os.path.join(directory, f"{pid}.db")
+    if not os.path.exists(path):
+        return False
+    archive = MmapValueFile(os.path.join(directory, ARCHIVE_FILE))
+    try:
+        current = dict(read_values(archive.path))
+        for key, value in read_values(path):
+            metric_name, sample, _labels = json.loads(key)
+            # Gauge samples are the only ones named after their metric
+            # (counters add "_total", histograms "_bucket"/"_sum"/"_count")
+            if sample == metric_name:
+                continue
+            archive.set(key, current.get(key, 0.0) + value)
+    finally:
+        archive.close()
+    os.unlink(path)
+    return True
+
+
+def generate_latest(registry: Registry = REGISTRY, directory: Optional[str] = None) -> str:
+    """
+    Render all metrics in the Prometheus text format (version 0.0.4).
+    """
+    merged = collect(registry, directory)
+    lines: list[str] = []
+    for name in sorted(merged):
+        metric = registry.get(name)
+        samples = merged[name]
+        # Counters are exposed (and typed) under their "_total" sample name
+        family = f"{name}_total" if metric.kind == "counter" else name
+        lines.append(f"# HELP {family} {_escape_help(metric.documentation)}")
+        lines.append(f"# TYPE {family} {metric.kind}")
+        if metric.kind == "histogram":
+            samples = _cumulate_buckets(name, samples, metric.buckets)
+        for (sample, labels), value in sorted(samples.items(), key=_sort_key):
+            lines.append(f"{sample}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _cumulate_buckets(name: str, samples: dict, bounds: tuple) -> dict:
+    bucket_name = f"{name}_bucket"
+    series: dict[tuple, list] = {}
+    result = {}
+    for (sample, labels), value in samples.items():
+        if sample != bucket_name:
+            result[(sample, labels)] = value
+            continue
+        le = dict(labels)["le"]
+        base = tuple(item for item in labels if item[0] != "le")
+        series.setdefault(base, []).append((float(le), le, value))
+    for base, buckets in series.items():
+        # Buckets nobody fell into were never written: expose them all
+        seen = {le for _, le, _ in buckets}
+        buckets += [(b, repr(b), 0.0) for b in bounds if repr(b) not in seen]
+        running = 0.0
+        for _, le, value in sorted(buckets):
+            running += value
+            result[(bucket_name, base + (("le", le),))] = running
+        result[(bucket_name, base + (("le", "+Inf"),))] = running
+    return result
+
+
+def _sort_key(item):
+    (sample, labels), _ = item
+    le = dict(labels).get("le")
+    return sample, tuple(pair for pair in labels if pair[0] != "le"), float(le) if le else 0.0
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels)
+    return "{" + inner + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(text: str) -> str:
+    return str(text).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
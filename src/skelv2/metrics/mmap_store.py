@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Metrics package - Memory-mapped value files shared between processes"""
+
+__updated__ = "2026-10-17 18:02:11"
+
+import mmap
+import os
+import struct
+from typing import Iterator
+
+# File layout (little endian):
+#   [u64 bytes used]
+#   entries: [u32 key length][key utf-8][padding to 8][f64 value]
+# The used counter is written after the entry, so readers never see half an entry.
+_USED = struct.Struct("<Q")
+_KEYLEN = struct.Struct("<I")
+_VALUE = struct.Struct("<d")
+INITIAL_SIZE = 64 * 1024
+
+
+def _padded(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+class MmapValueFile:
+    """
+    Append-only map of string keys to float64 values backed by a mmap'ed file.
+
+    Exactly one writer (the owning process) updates a file; any number of
+    processes may read it concurrently with `read_values`. Aligned 8-byte
+    stores are not torn on the platforms we run on, so no locking is needed.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "a+b")  # pylint: disable=consider-using-with
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(INITIAL_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._used = _USED.unpack_from(self._map, 0)[0] or _USED.size
+        _USED.pack_into(self._map, 0, self._used)
+        self._positions: dict[str, int] = {key: pos for key, pos, _ in _entries(self._map, self._used)}
+
+    def set(self, key: str, value: float) -> None:
+        pos = self._positions.get(key)
+        if pos is None:
+            pos = self._append(key)
+        _VALUE.pack_into(self._map, pos, value)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def _append(self, key: str) -> int:
+        encoded = key.encode()
+        value_pos = _padded(self._used + _KEYLEN.size + len(encoded))
+        end = value_pos + _VALUE.size
+        if end > self._capacity:
+            self._grow(end)
+        _KEYLEN.pack_into(self._map, self._used, len(encoded))
+        self._map[self._used + _KEYLEN.size:self._used + _KEYLEN.size + len(encoded)] = encoded
+        _VALUE.pack_into(self._map, value_pos, 0.0)
+        self._used = end
+        _USED.pack_into(self._map, 0, self._used)
+        self._positions[key] = value_pos
+        return value_pos
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        self._map.close()
+        self._file.truncate(capacity)
+        self._capacity = capacity
+        self._map = mmap.mmap(self._file.fileno(), capacity)
+
+
+def _entries(buf, used: int) -> Iterator[tuple[str, int, float]]:
+    pos = _USED.size
+    while pos < used:
+        (length,) = _KEYLEN.unpack_from(buf, pos)
+        key = bytes(buf[pos + _KEYLEN.size:pos + _KEYLEN.size + length]).decode()
+        value_pos = _padded(pos + _KEYLEN.size + length)
+        yield key, value_pos, _VALUE.unpack_from(buf, value_pos)[0]
+        pos = value_pos + _VALUE.size
+
+
+def read_values(path: str) -> Iterator[tuple[str, float]]:
+    """
+    Yield (key, value) pairs from a value file written by any process.
+    """
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if len(data) < _USED.size:
+        return
+    used = min(_USED.unpack_from(data, 0)[0], len(data))
+    for key, _, value in _entries(data, used):
+        yield key, value
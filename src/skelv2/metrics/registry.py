@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Metrics package - Counters, gauges and histograms"""
+
+__updated__ = "2026-10-18 09:50:12"
+
+import atexit
+import bisect
+import json
+import logging
+import os
+import tempfile
+import threading
+import weakref
+from typing import Callable, Optional, Sequence
+
+from .mmap_store import MmapValueFile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def sample_key(metric: str, sample: str, labels: dict) -> str:
+    """
+    Key of one sample in the value files: JSON [metric, sample name, labels].
+    """
+    return json.dumps([metric, sample, labels], sort_keys=True, separators=(",", ":"))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, registry: "Registry", name: str, documentation: str, labelnames: Sequence[str]) -> None:
+        self._registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+
+    def labels(self, *values, **kwvalues):
+        """
+        Return the child for one label combination (cached, cheap to reuse).
+        """
+        if kwvalues:
+            values = tuple(str(kwvalues[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            child = self._children[values] = self._make_child(dict(zip(self.labelnames, values)))
+        return child
+
+    def _make_child(self, labels: dict):
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("_registry", "_key")
+
+    def __init__(self, registry: "Registry", key: str) -> None:
+        self._registry = registry
+        self._key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        shard = self._registry.shard()
+        shard[self._key] = shard.get(self._key, 0.0) + amount
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _make_child(self, labels: dict) -> _CounterChild:
+        return _CounterChild(self._registry, sample_key(self.name, f"{self.name}_total", labels))
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("_registry", "_key")
+
+    def __init__(self, registry: "Registry", key: str) -> None:
+        self._registry = registry
+        self._key = key
+
+    def set(self, value: float) -> None:
+        # Plain dict assignment: atomic under the GIL, last writer wins
+        self._registry.gauges[self._key] = float(value)
+
+
+class Gauge(_Metric):
+    """
+    Per-process gauge; the exposition sums the values of live processes.
+    """
+
+    kind = "gauge"
+
+    def _make_child(self, labels: dict) -> _GaugeChild:
+        return _GaugeChild(self._registry, sample_key(self.name, self.name, labels))
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_registry", "_bounds", "_bucket_keys", "_sum_key", "_count_key")
+
+    def __init__(self, registry: "Registry", name: str, bounds: tuple, labels: dict) -> None:
+        self._registry = registry
+        self._bounds = bounds
+        self._bucket_keys = [
+            sample_key(name, f"{name}_bucket", {**labels, "le": _format_bound(b)}) for b in bounds
+        ] + [sample_key(name, f"{name}_bucket", {**labels, "le": "+Inf"})]
+        self._sum_key = sample_key(name, f"{name}_sum", labels)
+        self._count_key = sample_key(name, f"{name}_count", labels)
+
+    def observe(self, value: float) -> None:
+        # Buckets are stored non-cumulative; the exposition accumulates them
+        shard = self._registry.shard()
+        bucket = self._bucket_keys[bisect.bisect_left(self._bounds, value)]
+        shard[bucket] = shard.get(bucket, 0.0) + 1.0
+        shard[self._sum_key] = shard.get(self._sum_key, 0.0) + value
+        shard[self._count_key] = shard.get(self._count_key, 0.0) + 1.0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, documentation, labelnames, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def _make_child(self, labels: dict) -> _HistogramChild:
+        return _HistogramChild(self._registry, self.name, self.buckets, labels)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+
+class Registry:
+    """
+    Process-wide metric registry.
+
+    Hot path: every thread increments its own plain dict (no locks). A
+    flusher thread folds the per-thread shards and the gauges into this
+    process' memory-mapped file `<directory>/<pid>.db` every
+    `flush_interval` seconds; `/metrics` aggregates all files in the
+    directory, which gunicorn workers share.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._local = threading.local()
+        self._shards: list[tuple[dict, weakref.ref]] = []
+        self._shards_lock = threading.Lock()
+        # Totals of shards whose thread has exited
+        self._retired: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+        self.directory: Optional[str] = None
+        self._file: Optional[MmapValueFile] = None
+        self._pid: Optional[int] = None
+        self._flush_interval = 1.0
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    # --- definitions -------------------------------------------------------
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(self, name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def add_collector(self, callback: Callable[[], None]) -> None:
+        """
+        Run `callback` before every flush (e.g. to refresh pool gauges).
+        """
+        self._collectors.append(callback)
+
+    # --- recording ---------------------------------------------------------
+
+    def shard(self) -> dict:
+        try:
+            return self._local.values
+        except AttributeError:
+            values = self._local.values = {}
+            with self._shards_lock:
+                self._shards.append((values, weakref.ref(threading.current_thread())))
+            return values
+
+    # --- persistence -------------------------------------------------------
+
+    def configure(self, directory: Optional[str] = None, flush_interval: float = 1.0) -> None:
+        """
+        Choose the shared directory (a private temp dir when empty) and start flushing.
+        """
+        with self._flush_lock:
+            self.directory = directory or tempfile.mkdtemp(prefix="metrics-")
+            os.makedirs(self.directory, exist_ok=True)
+            # Reconfigured (e.g. a second app in the same process): write to the new directory
+            if self._file is not None:
+                self._file.close()
+            self._file = None
+        self._flush_interval = float(flush_interval)
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+            self._flusher.start()
+            atexit.register(self.flush)
+
+    def flush(self) -> None:
+        if self.directory is None:
+            return
+        for callback in self._collectors:
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Metrics collector failed")
+
+        with self._flush_lock:
+            pid = os.getpid()
+            if self._file is None or self._pid != pid:
+                # First flush, or we are a forked child: never write the parent's file
+                self._file = MmapValueFile(os.path.join(self.directory, f"{pid}.db"))
+                self._pid = pid
+
+            totals = dict(self._retired)
+            with self._shards_lock:
+                shards = list(self._shards)
+            for values, thread_ref in shards:
+                snapshot = values.copy()
+                thread = thread_ref()
+                if thread is None or not thread.is_alive():
+                    for key, value in snapshot.items():
+                        self._retired[key] = self._retired.get(key, 0.0) + value
+                    with self._shards_lock:
+                        self._shards.remove((values, thread_ref))
+                for key, value in snapshot.items():
+                    totals[key] = totals.get(key, 0.0) + value
+            totals.update(self.gauges.copy())
+
+            for key, value in totals.items():
+                self._file.set(key, value)
+
+    def _reset_after_fork(self) -> None:
+        # A forked child starts from zero and owns a new file and flusher
+        for values, _ in self._shards:
+            values.clear()
+        self._shards = [(values, ref) for values, ref in self._shards if ref() is threading.current_thread()]
+        self._shards_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._retired = {}
+        self.gauges.clear()
+        self._file = None
+        if self._flusher is not None:
+            self._flusher = threading.Thread(target=self._run, name="metrics-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:  # pylint: disable=broad-except
+                logger.exception("Metrics flush failed")
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+REGISTRY = Registry()
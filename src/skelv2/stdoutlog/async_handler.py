@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Logging management package - Non-blocking JSON handler"""
+
+__updated__ = "2026-10-18 04:18:33"
+
+import logging
+import os
+import threading
+import weakref
+from collections import deque
+from typing import Optional
+
+from .formatter import JsonStdoutHandler
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_debug")
+
+
+class AsyncJsonStdoutHandler(JsonStdoutHandler):
+    """
+    JsonStdoutHandler that never writes on the caller's thread.
+
+    Records are rendered on the caller's thread (so lazy args are captured
+    at log time) and appended to a bounded queue. A background writer joins
+    everything queued into one write + flush per `flush_interval`.
+
+    When the queue is full, `overflow_policy` decides:
+    - "block":       the caller waits for the writer to make room
+    - "drop_oldest": the oldest queued line is discarded
+    - "drop_debug":  DEBUG (and lower) records are discarded, others block
+
+    Dropped records are counted and reported by the writer as a WARNING line.
+    `close()` (called by `logging.shutdown` at exit) drains the queue.
+    """
+
+    def __init__(
+        self,
+        service_name: Optional[str] = None,
+        environment: Optional[str] = None,
+        *args,
+        queue_size: int = 10000,
+        flush_interval: float = 0.05,
+        overflow_policy: str = "drop_debug",
+        **kwargs,
+    ) -> None:
+        super().__init__(service_name, environment, *args, **kwargs)
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy {overflow_policy!r}, use one of {OVERFLOW_POLICIES}")
+        self.queue_size = max(1, int(queue_size))
+        self.flush_interval = float(flush_interval)
+        self.overflow_policy = overflow_policy
+
+        self._queue: deque = deque()
+        self._cond = threading.Condition(threading.Lock())
+        self._closing = False
+        self.dropped = 0
+        self._reported_dropped = 0
+
+        self._writer = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._writer.start()
+
+        # A forked child has no writer and may inherit a held lock: it writes
+        # synchronously until init_logging installs a fresh handler there
+        after_fork = weakref.WeakMethod(self._after_fork_in_child)
+        os.register_at_fork(after_in_child=lambda: after_fork() and after_fork()())
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format_record(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        with self._cond:
+            while len(self._queue) >= self.queue_size and not self._closing:
+                if self.overflow_policy == "drop_oldest":
+                    self._queue.popleft()
+                    self.dropped += 1
+                    break
+                if self.overflow_policy == "drop_debug" and record.levelno <= logging.DEBUG:
+                    self.dropped += 1
+                    return
+                # Wake the writer early and wait for it to make room
+                self._cond.notify_all()
+                self._cond.wait(self.flush_interval)
+
+            closing = self._closing
+            if not closing:
+                self._queue.append(line)
+                if len(self._queue) >= self.queue_size // 2:
+                    self._cond.notify_all()
+
+        if closing:
+            # Writer is gone or going: write synchronously
+            self._write([line])
+
+    def flush(self) -> None:
+        # Called by the base class; the writer flushes after each batch
+        if self.stream and hasattr(self.stream, "flush"):
+            self.stream.flush()
+
+    def close(self) -> None:
+        """
+        Stop accepting queued records and drain everything to the stream.
+        """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._writer.join(5.0)
+        with self._cond:
+            batch = self._take_batch()
+        self._write(batch)
+        super().close()
+
+    def _after_fork_in_child(self) -> None:
+        self._cond = threading.Condition(threading.Lock())
+        self._queue = deque()  # the parent writes these
+        self._closing = True
+
+    def stats(self) -> dict:
+        return {"queued": len(self._queue), "dropped": self.dropped, "policy": self.overflow_policy}
+
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            with self._cond:
+                self._cond.wait(self.flush_interval)
+                batch = self._take_batch()
+                closing = self._closing
+            # I/O happens outside the lock so callers keep queueing meanwhile
+            self._write(batch)
+
+    def _take_batch(self) -> list:
+        # Caller holds self._cond
+        if self.dropped != self._reported_dropped:
+            lost = self.dropped - self._reported_dropped
+            self._reported_dropped = self.dropped
+            notice = logging.makeLogRecord(
+                {
+                    "name": __name__,
+                    "levelno": logging.WARNING,
+                    "levelname": "WARNING",
+                    "msg": "%d log records dropped (queue full, policy %s)",
+                    "args": (lost, self.overflow_policy),
+                }
+            )
+            self._queue.append(self.format_record(notice))
+        batch = list(self._queue)
+        self._queue.clear()
+        # Unblock callers waiting on a full queue
+        self._cond.notify_all()
+        return batch
+
+    def _write(self, lines: list) -> None:
+        if not lines:
+            return
+        try:
+            self.stream.write("".join(lines))
+            self.flush()
+        except Exception:  # pylint: disable=broad-except
+            # Nothing sensible to do when stdout itself is broken
+            pass
@@ -5,18 +5,57 @@
 
 """Logging management package"""
 
-__updated__ = "2025-12-16 14:25:00"
+__updated__ = "2026-10-18 09:41:20"
 
 import json
 import logging
 import re
 import sys
-from datetime import datetime, timezone
+import time
 from typing import Any, Dict, Optional
 
+try:  # optional, noticeably faster JSON backend
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
 ANSI_ESCAPE_RE = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
 WERKZEUG_REQUEST_RE = re.compile(r"\"([A-Z]+ .+?)\"")
 
+# Optional fields copied from logger.extra when present (request_id first,
+# then HTTP / MQTT context, then timings and sampling summaries)
+CONTEXTUAL_FIELDS = (
+    "request_id",
+    "http_method",
+    "http_path",
+    "http_status",
+    "response_bytes",
+    "endpoint",
+    "remote_ip",
+    "client_id",
+    "auth_result",
+    "reason",
+    "callsign",
+    "canonical_cid",
+    "pg_status",
+    "redis_status",
+    "duration_ms",
+    "ttfb_ms",
+    "streamed",
+    "suppressed",
+    "worker",
+)
+
+
+def json_dumps(obj: Any) -> str:
+    """
+    Compact JSON with non-ASCII kept as-is; unknown types fall back to str().
+    Uses orjson when installed, the standard library otherwise.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str)
+
 
 class JsonStdoutHandler(logging.StreamHandler):
     """
@@ -26,6 +65,9 @@ class JsonStdoutHandler(logging.StreamHandler):
     - Code location (file, line, function)
     - request_id when present via logger.extra
     - Exception details (type, message, stacktrace) when applicable
+
+    The constant service/env fragment is serialized once and the timestamp
+    prefix is cached per second, so each record only encodes what changes.
     """
 
     def __init__(
@@ -39,71 +81,89 @@ class JsonStdoutHandler(logging.StreamHandler):
         if "stream" not in kwargs:
             kwargs["stream"] = sys.stdout
         super().__init__(*args, **kwargs)
-        self.service_name = service_name
-        self.environment = environment
+        self._service_name = service_name
+        self._environment = environment
+        self._static_fragment = ""
+        self._build_static_fragment()
+        # (epoch second, "YYYY-MM-DDTHH:MM:SS") swapped as one object for thread safety
+        self._ts_cache: tuple[int, str] = (-1, "")
+
+    @property
+    def service_name(self) -> Optional[str]:
+        return self._service_name
+
+    @service_name.setter
+    def service_name(self, value: Optional[str]) -> None:
+        self._service_name = value
+        self._build_static_fragment()
+
+    @property
+    def environment(self) -> Optional[str]:
+        return self._environment
+
+    @environment.setter
+    def environment(self, value: Optional[str]) -> None:
+        self._environment = value
+        self._build_static_fragment()
+
+    def _build_static_fragment(self) -> None:
+        # '"service":"...","env":"..."' without braces, spliced into every line
+        self._static_fragment = json_dumps({"service": self._service_name, "env": self._environment})[1:-1]
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        cached_second, prefix = self._ts_cache
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._ts_cache = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}Z"
 
     def emit(self, record: logging.LogRecord) -> None:
         try:
-            # Timestamp in UTC with ISO8601 format
-            ts = datetime.fromtimestamp(record.created, tz=timezone.utc)
-            timestamp = ts.isoformat().replace("+00:00", "Z")
-
-            # Strip ANSI color codes if present
-            message = ANSI_ESCAPE_RE.sub("", record.getMessage())
-
-            # Adjust Werkzeug request line to look cleaner
-            if record.name == "werkzeug":
-                message = WERKZEUG_REQUEST_RE.sub(r"[\1] ", message)
-
-            log: Dict[str, Any] = {
-                "timestamp": timestamp,
-                "level": record.levelname,
-                "logger": record.name,
-                "message": message,
-                # Service context
-                "service": self.service_name,
-                "env": self.environment,
-                # Code location (useful for debugging)
-                "file": record.pathname,
-                "line": record.lineno,
-                "function": record.funcName,
-            }
-
-            # Optional request_id (if provided via logger.extra)
-            request_id = getattr(record, "request_id", None)
-            if request_id is not None:
-                log["request_id"] = request_id
-
-            # Additional HTTP / MQTT context when available
-            contextual_fields = (
-                "http_method",
-                "http_path",
-                "remote_ip",
-                "client_id",
-                "auth_result",
-                "reason",
-                "callsign",
-                "canonical_cid",
-                "pg_status",
-                "redis_status",
-            )
-            for field in contextual_fields:
-                value = getattr(record, field, None)
-                if value is not None:
-                    log[field] = value
-
-            duration_ms = getattr(record, "duration_ms", None)
-            if duration_ms is not None:
-                log["duration_ms"] = duration_ms
-
-            # Exception details when present
-            if record.exc_info:
-                exc_type = record.exc_info[0].__name__ if record.exc_info[0] else None
-                log["exception_type"] = exc_type
-                log["exception_message"] = str(record.getMessage())
-                log["stacktrace"] = logging.Formatter().formatException(record.exc_info)
-
-            self.stream.write(json.dumps(log, ensure_ascii=False) + "\n")
+            self.stream.write(self.format_record(record))
             self.flush()
         except Exception:
             self.handleError(record)
+
+    def format_record(self, record: logging.LogRecord) -> str:
+        """
+        Render `record` as one JSON line (newline included).
+        """
+        message = record.getMessage()
+
+        # Strip ANSI color codes if present
+        if "\x1b" in message:
+            message = ANSI_ESCAPE_RE.sub("", message)
+
+        # Adjust Werkzeug request line to look cleaner
+        if record.name == "werkzeug":
+            message = WERKZEUG_REQUEST_RE.sub(r"[\1] ", message)
+
+        log: Dict[str, Any] = {
+            # Timestamp in UTC with ISO8601 format
+            "timestamp": self._timestamp(record.created),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": message,
+            # Code location (useful for debugging)
+            "file": record.pathname,
+            "line": record.lineno,
+            "function": record.funcName,
+        }
+
+        # Optional request_id and HTTP / MQTT context (if provided via logger.extra)
+        attrs = record.__dict__
+        for field in CONTEXTUAL_FIELDS:
+            value = attrs.get(field)
+            if value is not None:
+                log[field] = value
+
+        # Exception details when present
+        if record.exc_info:
+            exc_type = record.exc_info[0].__name__ if record.exc_info[0] else None
+            log["exception_type"] = exc_type
+            log["exception_message"] = str(message)
+            log["stacktrace"] = logging.Formatter().formatException(record.exc_info)
+
+        # Service context goes first, from the pre-serialized fragment
+        return "{" + self._static_fragment + "," + json_dumps(log)[1:] + "\n"
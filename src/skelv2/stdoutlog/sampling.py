@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Logging management package - Sampling and rate limiting of noisy loggers"""
+
+__updated__ = "2026-10-18 08:13:30"
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+SUMMARY_LOGGER = "stdoutlog.sampling"
+
+# (logger name, level name or None for every level)
+RuleKey = tuple[str, Optional[str]]
+
+
+def parse_rules(spec: Optional[str]) -> dict[RuleKey, float]:
+    """
+    Parse "logger[:LEVEL]=value,..." into {(logger, LEVEL or None): value}.
+
+        "werkzeug=0.1,util.decorators:DEBUG=0.01"
+    """
+    rules: dict[RuleKey, float] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        target, _, value = item.partition("=")
+        name, _, level = target.strip().partition(":")
+        rules[(name.strip(), level.strip().upper() or None)] = float(value)
+    return rules
+
+
+class TokenBucket:
+    """
+    Allow `rate` events per second on average, with bursts of up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1.0))
+        self._tokens = self.burst
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+
+class _Rule:
+    __slots__ = ("sample_rate", "bucket")
+
+    def __init__(self, sample_rate: float = 1.0, bucket: Optional[TokenBucket] = None):
+        self.sample_rate = sample_rate
+        self.bucket = bucket
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Handler filter that thins out high-volume loggers.
+
+    - `sample_rates`: keep roughly this fraction of matching records
+    - `rate_limits`:  keep at most this many matching records per second
+    Rules match a logger and its children ("werkzeug" covers "werkzeug.x"),
+    optionally for one level only; the most specific rule wins. Only records
+    that reach the handler are seen: loggers that do not propagate to it
+    (gunicorn.access, gunicorn.error) cannot be sampled.
+
+    WARNING and above always pass. Suppressed records are counted per logger
+    and reported every `summary_interval` seconds as one INFO record.
+    """
+
+    def __init__(
+        self,
+        sample_rates: Optional[dict[RuleKey, float]] = None,
+        rate_limits: Optional[dict[RuleKey, float]] = None,
+        *,
+        summary_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        super().__init__()
+        self._rules: dict[RuleKey, _Rule] = {}
+        for key, rate in (sample_rates or {}).items():
+            self._rules.setdefault(key, _Rule()).sample_rate = min(1.0, max(0.0, rate))
+        for key, limit in (rate_limits or {}).items():
+            self._rules.setdefault(key, _Rule()).bucket = TokenBucket(limit, clock=clock)
+
+        self._resolved: dict[tuple[str, int], Optional[_Rule]] = {}
+        self._summary_interval = float(summary_interval)
+        self._clock = clock
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._suppressed: dict[str, int] = {}
+        self._last_summary = clock()
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or record.name == SUMMARY_LOGGER:
+            return True
+
+        key = (record.name, record.levelno)
+        rule = self._resolved.get(key, False)
+        if rule is False:
+            rule = self._resolved[key] = self._resolve(record.name, record.levelname)
+
+        keep = rule is None or (
+            (rule.sample_rate >= 1.0 or self._rng() < rule.sample_rate)
+            and (rule.bucket is None or rule.bucket.allow())
+        )
+
+        summary = None
+        with self._lock:
+            if not keep:
+                self._suppressed[record.name] = self._suppressed.get(record.name, 0) + 1
+                self.suppressed_total += 1
+            now = self._clock()
+            if self._suppressed and now - self._last_summary >= self._summary_interval:
+                summary, self._suppressed = self._suppressed, {}
+                self._last_summary = now
+        if summary:
+            logging.getLogger(SUMMARY_LOGGER).info(
+                "%d log records suppressed in the last %ds",
+                sum(summary.values()),
+                self._summary_interval,
+                extra={"suppressed": summary},
+            )
+        return keep
+
+    def _resolve(self, name: str, level: str) -> Optional[_Rule]:
+        while True:
+            rule = self._rules.get((name, level)) or self._rules.get((name, None))
+            if rule is not None:
+                return rule
+            if "." not in name:
+                return None
+            name = name.rsplit(".", 1)[0]
@@ -5,11 +5,15 @@
 
 """Logging management package"""
 
-__updated__ = "2025-12-15 17:21:58"
+__updated__ = "2026-10-18 09:05:12"
 
 import logging
+import signal
+import threading
 
+from .async_handler import AsyncJsonStdoutHandler
 from .formatter import JsonStdoutHandler
+from .sampling import SamplingFilter, parse_rules
 
 
 def init_logging(config: dict) -> None:
@@ -17,6 +21,8 @@ def init_logging(config: dict) -> None:
     Configure global logging:
     - Log level taken from config["LOG_LEVEL"]
     - Single JsonStdoutHandler writing to STDOUT
+    - LOG_ASYNC=true swaps it for AsyncJsonStdoutHandler (background writer)
+    - LOG_SAMPLE_RATES / LOG_RATE_LIMITS thin out noisy loggers below WARNING
     """
     level_name = config.get("LOG_LEVEL", "INFO").upper()
     service_name = config.get("SERVICE_NAME", "skel-service")
@@ -28,6 +34,53 @@ def init_logging(config: dict) -> None:
     # Avoid duplicates if this function is called more than once
     for h in list(root.handlers):
         root.removeHandler(h)
+        h.close()
 
-    handler = JsonStdoutHandler(service_name=service_name, environment=environment)
+    if config.get("LOG_ASYNC", False):
+        handler = AsyncJsonStdoutHandler(
+            service_name=service_name,
+            environment=environment,
+            queue_size=int(config.get("LOG_QUEUE_SIZE", 10000)),
+            flush_interval=float(config.get("LOG_FLUSH_INTERVAL", 0.05)),
+            overflow_policy=config.get("LOG_OVERFLOW_POLICY", "drop_debug"),
+        )
+        _drain_on_sigterm()
+    else:
+        handler = JsonStdoutHandler(service_name=service_name, environment=environment)
+
+    sample_rates = parse_rules(config.get("LOG_SAMPLE_RATES"))
+    rate_limits = parse_rules(config.get("LOG_RATE_LIMITS"))
+    if sample_rates or rate_limits:
+        handler.addFilter(
+            SamplingFilter(
+                sample_rates,
+                rate_limits,
+                summary_interval=float(config.get("LOG_SUPPRESSED_SUMMARY_INTERVAL", 60)),
+            )
+        )
     root.addHandler(handler)
+
+
+def _drain_on_sigterm() -> None:
+    """
+    Make sure queued records reach stdout when SIGTERM kills the process.
+
+    Only installed when nobody else handles SIGTERM: gunicorn workers and the
+    worker runtime exit through sys.exit, where logging.shutdown drains anyway.
+
+    The handler itself must not drain: it may interrupt the main thread
+    inside the handler's lock. It only raises SystemExit, which unwinds
+    (releasing that lock) and lets the atexit logging.shutdown close and
+    drain the handlers from normal control flow.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    if signal.getsignal(signal.SIGTERM) is not signal.SIG_DFL:
+        return
+
+    def _handle_sigterm(signum, _frame):
+        # A second SIGTERM while unwinding kills the process as usual
+        signal.signal(signum, signal.SIG_DFL)
+        raise SystemExit(128 + signum)
+
+    signal.signal(signal.SIGTERM, _handle_sigterm)
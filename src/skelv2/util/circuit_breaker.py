@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Various utilities package - Circuit breaker"""
+
+__updated__ = "2026-10-17 23:48:20"
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    The breaker is open: the call was not attempted.
+    """
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"circuit {name!r} is open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Stop calling a dependency that keeps failing or answering slowly.
+
+    - closed:    calls go through; the last `window` outcomes are kept and
+                 the breaker opens once at least `min_calls` of them are
+                 recorded and the share of bad ones reaches `error_rate`.
+                 A call is bad when it raises one of `failure_exceptions`
+                 or takes longer than `slow_call_ms` (its result is still
+                 returned).
+    - open:      calls fail at once with CircuitOpenError for `open_seconds`.
+    - half_open: up to `half_open_calls` trial calls go through; a good one
+                 closes the breaker, a bad one opens it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        error_rate: float = 0.5,
+        min_calls: int = 10,
+        window: int = 20,
+        slow_call_ms: Optional[float] = None,
+        open_seconds: float = 10.0,
+        half_open_calls: int = 1,
+        failure_exceptions: tuple = (Exception,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.error_rate = float(error_rate)
+        self.min_calls = max(1, int(min_calls))
+        self.slow_call = float(slow_call_ms) / 1000.0 if slow_call_ms else None
+        self.open_seconds = float(open_seconds)
+        self.half_open_calls = max(1, int(half_open_calls))
+        self.failure_exceptions = failure_exceptions
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=max(self.min_calls, int(window)))
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+
+        self.opened = 0
+        self.rejected = 0
+        self.failures = 0
+        self.slow_calls = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run `func` through the breaker; raise CircuitOpenError when open.
+        """
+        self._before_call()
+        started = self._clock()
+        try:
+            result = func(*args, **kwargs)
+        except self.failure_exceptions:
+            self._record(False)
+            raise
+        except BaseException:
+            # Not a dependency failure (e.g. a bug): do not count it, free the trial slot
+            self._record(None)
+            raise
+        slow = self.slow_call is not None and self._clock() - started > self.slow_call
+        if slow:
+            self.slow_calls += 1
+        self._record(not slow)
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            bad = self._outcomes.count(False)
+            stats = {
+                "state": state,
+                "recent_calls": len(self._outcomes),
+                "recent_failures": bad,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+            }
+            if state == OPEN:
+                stats["retry_after_s"] = round(self._opened_at + self.open_seconds - now, 3)
+            return stats
+
+    def _current_state(self, now: float) -> str:
+        # Caller holds self._lock
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def _before_call(self) -> None:
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return
+            self.rejected += 1
+            retry_after = max(0.0, self._opened_at + self.open_seconds - now) if state == OPEN else 0.0
+        raise CircuitOpenError(self.name, retry_after)
+
+    def _record(self, good: Optional[bool]) -> None:
+        with self._lock:
+            if good is False:
+                self.failures += 1
+            if self._state == HALF_OPEN:
+                self._trials = max(0, self._trials - 1)
+                if good is True:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    logger.info("Circuit %s closed", self.name)
+                elif good is False:
+                    self._open()
+                return
+            if good is None or self._state != CLOSED:
+                return
+            self._outcomes.append(good)
+            if len(self._outcomes) >= self.min_calls:
+                if self._outcomes.count(False) / len(self._outcomes) >= self.error_rate:
+                    self._open()
+
+    def _open(self) -> None:
+        # Caller holds self._lock
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self.opened += 1
+        logger.warning("Circuit %s opened for %.1fs", self.name, self.open_seconds)
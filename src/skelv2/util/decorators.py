@@ -5,16 +5,19 @@
 
 """Various utilities package"""
 
-__updated__ = "2025-12-16 03:00:59"
+__updated__ = "2026-10-18 09:57:40"
 
+import math
 import time
 import logging
 import redis.exceptions
 from functools import wraps
-from flask import request, jsonify, g
+from flask import request, jsonify, g, make_response
 
 from db.redis_apikeys import get_apikey_metadata
+from util.circuit_breaker import CircuitOpenError
 from util.request_id import get_or_create_request_id
+from util.timing import timed_phase
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +48,146 @@ def handle_errors(func):
 
 
 def require_apikey(stores: dict | None):
-    redis_client = stores.get("redis") if stores else None
+    # Uncached lookups from concurrent requests share pipelines when available
+    redis_client = (stores.get("redis_autopipe") or stores.get("redis")) if stores else None
+    apikey_cache = stores.get("apikey_cache") if stores else None
+    apikey_filter = stores.get("apikey_filter") if stores else None
+    ratelimiter = stores.get("ratelimiter") if stores else None
+    quota_counter = stores.get("quota_counter") if stores else None
+    # With a cache, the breaker already wraps the cache's loader
+    breaker = stores.get("apikey_breaker") if stores else None
+
+    def lookup(apikey: str | None):
+        if apikey_cache is not None:
+            return apikey_cache.get(apikey)
+        if breaker is not None:
+            return breaker.call(get_apikey_metadata, redis_client, apikey)
+        return get_apikey_metadata(redis_client, apikey)
+
+    def last_known_good(apikey: str | None):
+        if apikey_cache is None or not apikey:
+            return None
+        return apikey_cache.last_known_good(apikey)
+
+    def authorize(log):
+        """
+        Run every API key check for the current request.
+        Return (denial response, None) or (None, rate limit result or None).
+        """
+        if redis_client is None:
+            log(logging.ERROR, "Redis client not configured for API key validation", redis_status="missing")
+            return (
+                jsonify(
+                    {"ok": False, "error": "Internal configuration error"},
+                ),
+                500,
+            ), None
+
+        apikey = request.headers.get("X-API-Key")
+        if apikey and apikey_filter is not None:
+            reason = apikey_filter.rejection_reason(apikey)
+            if reason is not None:
+                log(logging.INFO, "Invalid or disabled API key", redis_status="skipped", reason=reason)
+                return (jsonify({"ok": False, "error": "Unauthorized"}), 401), None
+
+        log(logging.DEBUG, "Validating API key via Redis", redis_status="query", has_apikey=bool(apikey))
+
+        # A creation event during the lookup makes its "missing" answer stale
+        generation = apikey_filter.generation if apikey_filter is not None else None
+        stale_reason = None
+        try:
+            with timed_phase("redis"):
+                metadata = lookup(apikey)
+        except CircuitOpenError as exc:
+            metadata = last_known_good(apikey)
+            if metadata is None:
+                log(logging.WARNING, f"API key store unavailable, failing fast: {exc}", redis_status="circuit_open")
+                return (
+                    jsonify({"ok": False, "error": "API key store unavailable"}),
+                    503,
+                    {"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+                ), None
+            stale_reason = "circuit_open"
+        except redis.exceptions.AuthenticationError as exc:
+            log(
+                logging.ERROR,
+                f"Redis authentication error during API key lookup: {exc}",
+                redis_status="auth_error",
+            )
+            return (
+                jsonify(
+                    {"ok": False, "error": "API key store authentication error"},
+                ),
+                500,
+            ), None
+        except redis.exceptions.RedisError as exc:
+            metadata = last_known_good(apikey)
+            if metadata is None:
+                log(logging.ERROR, f"Redis error during API key lookup: {exc}", redis_status="error")
+                return (
+                    jsonify(
+                        {"ok": False, "error": "API key store unavailable"},
+                    ),
+                    500,
+                ), None
+            stale_reason = "redis_error"
+
+        if stale_reason is not None:
+            log(logging.WARNING, "Serving last-known-good API key metadata", redis_status="stale", reason=stale_reason)
+
+        if metadata is None:
+            if apikey and apikey_filter is not None:
+                apikey_filter.record_missing(apikey, generation)
+            log(logging.INFO, "Invalid or disabled API key", redis_status="ok", reason="invalid_or_disabled")
+            return (jsonify({"ok": False, "error": "Unauthorized"}), 401), None
+
+        matcher = metadata.get("endpoint_matcher")
+        if matcher is not None and not matcher.allows(request.path):
+            log(logging.INFO, "API key not allowed on this endpoint", redis_status="ok", reason="endpoint_forbidden")
+            return (jsonify({"ok": False, "error": "Forbidden"}), 403), None
+
+        ratelimit = None
+        if ratelimiter is not None and metadata.get("rate_limit", 0) > 0:
+            try:
+                with timed_phase("redis"):
+                    ratelimit = ratelimiter.hit(apikey, metadata["rate_limit"])
+            except redis.exceptions.RedisError as exc:
+                if not ratelimiter.fail_open:
+                    log(
+                        logging.ERROR,
+                        f"Rate limiter unavailable, rejecting request: {exc}",
+                        redis_status="error",
+                        reason="ratelimit_unavailable",
+                    )
+                    return (
+                        jsonify({"ok": False, "error": "Rate limiter unavailable"}),
+                        503,
+                        {"Retry-After": "1"},
+                    ), None
+                log(logging.WARNING, f"Rate limiter unavailable, allowing request: {exc}", redis_status="error")
+            else:
+                if not ratelimit.allowed:
+                    log(logging.INFO, "Rate limit exceeded", redis_status="ok", reason="rate_limited")
+                    return (jsonify({"ok": False, "error": "Too Many Requests"}), 429, ratelimit.headers()), None
+
+        if quota_counter is not None and metadata.get("quota_daily", 0) > 0:
+            try:
+                with timed_phase("redis"):
+                    quota = quota_counter.consume(apikey, metadata["quota_daily"])
+            except redis.exceptions.RedisError as exc:
+                log(logging.WARNING, f"Quota store unavailable, allowing request: {exc}", redis_status="error")
+            else:
+                if not quota.allowed:
+                    log(logging.INFO, "Daily quota exceeded", redis_status="ok", reason="quota_exceeded")
+                    return (
+                        jsonify({"ok": False, "error": "Daily quota exceeded"}),
+                        429,
+                        {"Retry-After": str(math.ceil(quota.reset_after))},
+                    ), None
+
+        g.customer = metadata
+        log(logging.DEBUG, "API key validated", redis_status="ok")
+        return None, ratelimit
 
     def decorator(func):
         @wraps(func)
@@ -62,49 +204,17 @@ def require_apikey(stores: dict | None):
                 payload.update({k: v for k, v in extra_fields.items() if v is not None})
                 logger.log(level, message, extra=payload)
 
-            if redis_client is None:
-                log(logging.ERROR, "Redis client not configured for API key validation", redis_status="missing")
-                return (
-                    jsonify(
-                        {"ok": False, "error": "Internal configuration error"},
-                    ),
-                    500,
-                )
+            with timed_phase("auth"):
+                denial, ratelimit = authorize(log)
+            if denial is not None:
+                return denial
 
-            apikey = request.headers.get("X-API-Key")
-            log(logging.DEBUG, "Validating API key via Redis", redis_status="query", has_apikey=bool(apikey))
+            if ratelimit is None:
+                return func(*args, **kwargs)
 
-            try:
-                metadata = get_apikey_metadata(redis_client, apikey)
-            except redis.exceptions.AuthenticationError as exc:
-                log(
-                    logging.ERROR,
-                    f"Redis authentication error during API key lookup: {exc}",
-                    redis_status="auth_error",
-                )
-                return (
-                    jsonify(
-                        {"ok": False, "error": "API key store authentication error"},
-                    ),
-                    500,
-                )
-            except redis.exceptions.RedisError as exc:
-                log(logging.ERROR, f"Redis error during API key lookup: {exc}", redis_status="error")
-                return (
-                    jsonify(
-                        {"ok": False, "error": "API key store unavailable"},
-                    ),
-                    500,
-                )
-
-            if metadata is None:
-                log(logging.INFO, "Invalid or disabled API key", redis_status="ok", reason="invalid_or_disabled")
-                return jsonify({"ok": False, "error": "Unauthorized"}), 401
-
-            g.customer = metadata
-            log(logging.DEBUG, "API key validated", redis_status="ok")
-
-            return func(*args, **kwargs)
+            response = make_response(func(*args, **kwargs))
+            response.headers.update(ratelimit.headers())
+            return response
 
         return wrapper
 
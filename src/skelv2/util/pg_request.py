@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Various utilities package - Request-scoped Postgres connection"""
+
+__updated__ = "2026-10-17 21:02:44"
+
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from flask import current_app, g
+from psycopg2 import extensions
+
+from .timing import timed_phase
+
+EXTENSION_KEY = "pg_pool"
+
+
+def init_request_pg(app, pg_pool) -> None:
+    """
+    Make `pg_pool` available to `get_db()` and release the request's
+    connection when the request ends, whatever happened in the handler.
+    """
+    app.extensions[EXTENSION_KEY] = pg_pool
+
+    @app.teardown_request
+    def _release_request_pg(exc=None):  # pylint: disable=unused-argument
+        conn = g.pop("pg_conn", None)
+        g.pop("pg_tx_depth", None)
+        if conn is not None:
+            # Uncommitted work is rolled back by the pool
+            current_app.extensions[EXTENSION_KEY].putconn(conn)
+
+
+def get_db() -> Any:
+    """
+    The current request's Postgres connection, checked out on first use and
+    reused until the request ends: at most one checkout per request.
+    """
+    conn = g.get("pg_conn")
+    if conn is None:
+        pg_pool = current_app.extensions.get(EXTENSION_KEY)
+        if pg_pool is None:
+            raise RuntimeError("Postgres is not enabled for this app (see init_request_pg)")
+        with timed_phase("pg"):
+            conn = pg_pool.getconn()
+        g.pg_conn = conn
+    return conn
+
+
+@contextmanager
+def transaction() -> Iterator[Any]:
+    """
+    Run the block in a transaction and yield a cursor: commit on success,
+    roll back on error. Nested blocks use savepoints, so an inner failure
+    only undoes the inner block.
+    """
+    conn = get_db()
+    depth = g.get("pg_tx_depth", 0)
+    g.pg_tx_depth = depth + 1
+    try:
+        with conn.cursor() as cursor:
+            if depth:
+                savepoint = f"request_sp_{depth}"
+                cursor.execute(f"SAVEPOINT {savepoint};")
+                try:
+                    yield cursor
+                except BaseException:
+                    cursor.execute(f"ROLLBACK TO SAVEPOINT {savepoint};")
+                    raise
+                cursor.execute(f"RELEASE SAVEPOINT {savepoint};")
+            else:
+                try:
+                    yield cursor
+                except BaseException:
+                    conn.rollback()
+                    raise
+                with timed_phase("pg"):
+                    conn.commit()
+    finally:
+        g.pg_tx_depth = depth
+
+
+@contextmanager
+def read_only() -> Iterator[Any]:
+    """
+    Like `transaction()`, but the database rejects writes. Must be the
+    outermost transaction of the connection.
+    """
+    conn = get_db()
+    if g.get("pg_tx_depth", 0) or conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+        raise RuntimeError("read_only() must start a new transaction")
+    with transaction() as cursor:
+        cursor.execute("SET TRANSACTION READ ONLY;")
+        yield cursor
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Various utilities package"""
+
+__updated__ = "2026-10-18 09:41:45"
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from flask import g, has_request_context
+
+
+def record_phase(name: str, duration_ms: float) -> None:
+    """
+    Add `duration_ms` to the named phase of the current request
+    (reported in the Server-Timing header and the access log).
+    Outside of a request (e.g. worker mode) this is a no-op.
+    """
+    if not has_request_context():
+        return
+    phases = g.setdefault("server_timing", {})
+    phases[name] = phases.get(name, 0.0) + duration_ms
+
+
+@contextmanager
+def timed_phase(name: str) -> Iterator[None]:
+    """
+    Time the enclosed block as phase `name` of the current request.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, (time.perf_counter() - start) * 1000.0)
+
+
+def server_timing_header(phases: dict, total_ms: float, total_name: str = "total") -> str:
+    """
+    Render phases as a Server-Timing header value, e.g.
+    "auth;dur=1.20, redis;dur=0.85, total;dur=4.10".
+    """
+    entries = [f"{name};dur={duration:.2f}" for name, duration in phases.items()]
+    entries.append(f"{total_name};dur={total_ms:.2f}")
+    return ", ".join(entries)
@@ -5,8 +5,8 @@
 
 """WORKER package"""
 
-__updated__ = "2025-12-15 18:01:49"
+__updated__ = "2026-10-18 04:50:02"
 
-from .runtime import run_worker_app
+from .runtime import run_worker_app, run_worker_process
 
-__all__ = ["run_worker_app"]
+__all__ = ["run_worker_app", "run_worker_process"]
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Bounded thread/process executor for worker units."""
+
+from __future__ import annotations
+
+__updated__ = "2026-10-18 04:49:31"
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+def _timed_call(handler: Callable[[Any], Any], unit: Any) -> float:
+    """
+    Run one unit and return its duration in seconds. Module level, so the
+    process pool can pickle it; the duration is measured where the unit
+    runs, queueing time excluded.
+    """
+    started = time.perf_counter()
+    handler(unit)
+    return time.perf_counter() - started
+
+
+class WorkExecutor:
+    """
+    Run `handler(unit)` on a thread or process pool of `size` workers.
+
+    `submit()` blocks while `max_in_flight` units are queued or running, so
+    a fast producer cannot pile up unbounded work (backpressure).
+    `shutdown(timeout)` stops accepting units and waits up to `timeout`
+    seconds for the in-flight ones. With `kind="process"`, `handler` must
+    be picklable and `initializer(*initargs)` runs once in every child
+    (open the datastores there, not in the parent).
+
+    Every unit is logged at DEBUG with its duration; a throughput summary
+    goes to INFO every `stats_interval` seconds and at shutdown.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Any],
+        *,
+        kind: str = "thread",
+        size: int = 4,
+        max_in_flight: Optional[int] = None,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: tuple = (),
+        stats_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unsupported executor kind {kind!r}, use one of {EXECUTOR_KINDS}")
+        self.kind = kind
+        self.size = max(1, int(size))
+        self.max_in_flight = max(self.size, int(max_in_flight or 2 * self.size))
+        self.stats_interval = float(stats_interval)
+        self._handler = handler
+        self._clock = clock
+
+        if kind == "process":
+            self._pool = ProcessPoolExecutor(self.size, initializer=initializer, initargs=initargs)
+        else:
+            self._pool = ThreadPoolExecutor(
+                self.size, thread_name_prefix="worker-unit", initializer=initializer, initargs=initargs
+            )
+
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Condition(threading.Lock())
+        self._in_flight = 0
+        self._closed = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self._duration_total = 0.0
+        self._duration_max = 0.0
+        self._window_started = clock()
+        self._window_units = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def submit(self, unit: Any) -> Future:
+        """
+        Queue one unit, waiting for a free slot first.
+        """
+        if self._closed:
+            raise RuntimeError("executor is shut down")
+        self._slots.acquire()
+        with self._lock:
+            self._in_flight += 1
+            self.submitted += 1
+        try:
+            future = self._pool.submit(_timed_call, self._handler, unit)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def shutdown(self, timeout: float) -> bool:
+        """
+        Stop accepting units and wait up to `timeout` seconds for the
+        in-flight ones. Return True when everything finished in time.
+        """
+        self._closed = True
+        deadline = self._clock() + max(0.0, float(timeout))
+        with self._lock:
+            while self._in_flight:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    break
+                self._lock.wait(remaining)
+            abandoned = self._in_flight
+
+        if abandoned:
+            logger.warning("Worker drain timed out, abandoning %d in-flight unit(s)", abandoned)
+            # Threads cannot be stopped; child processes can, so exit does not wait on them
+            processes = list((getattr(self._pool, "_processes", None) or {}).values())
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            for process in processes:
+                process.terminate()
+        else:
+            self._pool.shutdown(wait=True)
+        self._log_throughput(force=True)
+        return not abandoned
+
+    def stats(self) -> dict:
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "kind": self.kind,
+                "size": self.size,
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "duration_avg_ms": round(self._duration_total / finished * 1000.0, 3) if finished else 0.0,
+                "duration_max_ms": round(self._duration_max * 1000.0, 3),
+            }
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._lock.notify_all()
+        self._slots.release()
+
+    def _on_done(self, future: Future) -> None:
+        if future.cancelled():
+            self._release()
+            return
+        error = future.exception()
+        duration = None if error is not None else future.result()
+        with self._lock:
+            if error is None:
+                self.completed += 1
+                self._duration_total += duration
+                self._duration_max = max(self._duration_max, duration)
+            else:
+                self.failed += 1
+            self._window_units += 1
+        self._release()
+
+        if error is not None:
+            logger.error("Worker unit failed", exc_info=(type(error), error, error.__traceback__))
+        else:
+            logger.debug("Worker unit done", extra={"duration_ms": round(duration * 1000.0, 3)})
+        self._log_throughput()
+
+    def _log_throughput(self, force: bool = False) -> None:
+        now = self._clock()
+        with self._lock:
+            elapsed = now - self._window_started
+            if not force and elapsed < self.stats_interval:
+                return
+            units, self._window_units = self._window_units, 0
+            self._window_started = now
+        summary = self.stats()
+        summary["units"] = units
+        summary["units_per_s"] = round(units / elapsed, 3) if elapsed > 0 else 0.0
+        logger.info("Worker throughput", extra={"worker": summary})
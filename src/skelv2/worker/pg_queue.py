@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Postgres job queue (FOR UPDATE SKIP LOCKED + LISTEN/NOTIFY) for the worker."""
+
+from __future__ import annotations
+
+__updated__ = "2026-10-18 09:36:40"
+
+import logging
+import select
+import threading
+import time
+from typing import Any, Iterable, NamedTuple, Optional
+
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from db.pg_bulk import quote_ident
+
+logger = logging.getLogger(__name__)
+
+# One table can hold several queues. run_at is both the scheduled time and the
+# visibility timeout: claiming a job pushes it forward, so a job whose worker
+# died becomes visible again. Every claim counts as an attempt, and attempts
+# doubles as the claim token: a worker may only settle the claim it made.
+# Jobs are deleted once done; failed_at marks jobs that used up their
+# attempts (dead letters, kept for inspection).
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id          bigserial PRIMARY KEY,
+    queue       text        NOT NULL DEFAULT 'default',
+    payload     jsonb       NOT NULL,
+    attempts    integer     NOT NULL DEFAULT 0,
+    run_at      timestamptz NOT NULL DEFAULT now(),
+    failed_at   timestamptz,
+    last_error  text,
+    created_at  timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS {index} ON {table} (queue, run_at) WHERE failed_at IS NULL;
+"""
+
+# Jobs whose last attempt timed out (the worker crashed or hung on them)
+_DEAD_LETTER_SQL = """
+WITH exhausted AS (
+    SELECT id FROM {table}
+    WHERE queue = %(queue)s AND failed_at IS NULL AND run_at <= now() AND attempts >= %(max_attempts)s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE {table} AS job
+SET failed_at = now(), last_error = 'visibility timeout expired on attempt ' || job.attempts
+FROM exhausted
+WHERE job.id = exhausted.id
+"""
+
+_CLAIM_SQL = """
+WITH next AS (
+    SELECT id FROM {table}
+    WHERE queue = %(queue)s AND failed_at IS NULL AND run_at <= now() AND attempts < %(max_attempts)s
+    ORDER BY run_at, id
+    LIMIT %(limit)s
+    FOR UPDATE SKIP LOCKED
+)
+UPDATE {table} AS job
+SET run_at = now() + make_interval(secs => %(visibility)s::float8), attempts = job.attempts + 1
+FROM next
+WHERE job.id = next.id
+RETURNING job.id, job.payload, job.attempts
+"""
+
+_NEXT_DUE_SQL = """
+SELECT EXTRACT(EPOCH FROM min(run_at) - now()) FROM {table}
+WHERE queue = %s AND failed_at IS NULL
+"""
+
+_CLAIMS = "unnest(%(ids)s::bigint[], %(attempts)s::integer[]) AS claim(id, attempts)"
+
+_DELETE_SQL = f"""
+DELETE FROM {{table}} AS job
+USING {_CLAIMS}
+WHERE job.id = claim.id AND job.attempts = claim.attempts
+"""
+
+_RETRY_SQL = f"""
+UPDATE {{table}} AS job
+SET failed_at = CASE WHEN job.attempts >= %(max_attempts)s THEN now() END,
+    run_at = now() + make_interval(secs => %(delay)s::float8 * power(2, greatest(job.attempts - 1, 0))),
+    last_error = %(error)s
+FROM {_CLAIMS}
+WHERE job.id = claim.id AND job.attempts = claim.attempts
+"""
+
+
+class PgJob(NamedTuple):
+    id: int
+    payload: Any
+    attempts: int
+
+
+def create_queue_table(cursor, table: str = "worker_jobs") -> None:
+    """
+    Create the queue table and its index if missing; the caller commits.
+    """
+    index = quote_ident(table.split(".")[-1] + "_due_idx")
+    cursor.execute(SCHEMA_SQL.format(table=quote_ident(table), index=index))
+
+
+def enqueue(
+    cursor,
+    payloads: Iterable[Any],
+    *,
+    table: str = "worker_jobs",
+    queue: str = "default",
+    channel: Optional[str] = "worker_jobs",
+) -> int:
+    """
+    Insert one job per payload (JSON-serializable) and notify `channel`
+    so listening workers wake up. The notification is delivered when the
+    caller commits. Return the number of jobs inserted.
+    """
+    rows = [(queue, Json(payload)) for payload in payloads]
+    if not rows:
+        return 0
+    execute_values(cursor, f"INSERT INTO {quote_ident(table)} (queue, payload) VALUES %s", rows)
+    if channel:
+        cursor.execute("SELECT pg_notify(%s, %s)", (channel, queue))
+    return len(rows)
+
+
+class PgQueueSource:
+    """
+    Claim jobs from a Postgres table with FOR UPDATE SKIP LOCKED, so any
+    number of replicas drain one queue without waiting on each other.
+
+    `fetch()` claims up to `batch_size` due jobs in one short transaction
+    (one pooled connection per claim, nothing held while jobs run) and
+    returns them as one unit. When nothing is due it waits on a LISTEN
+    connection until a NOTIFY on `channel` arrives, the next job becomes
+    due (delayed, retried or timed-out jobs), or `max_wait` passes.
+
+    - claiming pushes `run_at` forward by `visibility_timeout` seconds:
+      jobs of a crashed worker are picked up again after that
+    - every claim is an attempt; a job is never claimed more than
+      `max_attempts` times, and one whose last attempt timed out is
+      dead-lettered (`failed_at` set), so a poison job cannot loop
+    - `done(batch, ok=True)` deletes the jobs
+    - `done(batch, ok=False)` retries them after `retry_delay` seconds,
+      doubled per attempt, until `max_attempts` (then `failed_at` is set)
+    - `done()` only touches jobs still holding the attempt they were
+      claimed with: after a timeout and a re-claim, the slow first worker
+      cannot delete or reschedule the job now owned by another one
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        pg_pool,
+        *,
+        table: str = "worker_jobs",
+        queue: str = "default",
+        channel: Optional[str] = "worker_jobs",
+        batch_size: int = 100,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 5,
+        retry_delay: float = 10.0,
+        max_wait: float = 5.0,
+        wakeup=None,
+    ) -> None:
+        self.pool = pg_pool
+        self.table = table
+        self.queue = queue
+        self.channel = channel
+        self.batch_size = max(1, int(batch_size))
+        self.visibility_timeout = float(visibility_timeout)
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_delay = float(retry_delay)
+        self.max_wait = float(max_wait)
+        # Anything with fileno() that becomes readable to cut waits short (worker stop)
+        self.wakeup = wakeup
+
+        quoted = quote_ident(table)
+        self._dead_letter_sql = _DEAD_LETTER_SQL.format(table=quoted)
+        self._claim_sql = _CLAIM_SQL.format(table=quoted)
+        self._next_due_sql = _NEXT_DUE_SQL.format(table=quoted)
+        self._retry_sql = _RETRY_SQL.format(table=quoted)
+        self._delete_sql = _DELETE_SQL.format(table=quoted)
+
+        self._listener = None
+        self._lock = threading.Lock()
+
+        self.claimed = 0
+        self.completed = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.stale = 0
+        self.notifications = 0
+
+    def fetch(self) -> list[list[PgJob]]:
+        self._ensure_listener()
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(self._dead_letter_sql, {"queue": self.queue, "max_attempts": self.max_attempts})
+                dead = max(0, cur.rowcount)
+                cur.execute(
+                    self._claim_sql,
+                    {
+                        "queue": self.queue,
+                        "limit": self.batch_size,
+                        "visibility": self.visibility_timeout,
+                        "max_attempts": self.max_attempts,
+                    },
+                )
+                rows = cur.fetchall()
+                if not rows:
+                    cur.execute(self._next_due_sql, (self.queue,))
+                    next_due = cur.fetchone()[0]
+            conn.commit()
+
+        if dead:
+            self.dead_lettered += dead
+            logger.error("Dead-lettered %d job(s) of queue %s: last attempt timed out", dead, self.queue)
+        if rows:
+            self.claimed += len(rows)
+            return [[PgJob(*row) for row in sorted(rows)]]
+
+        wait = self.max_wait if next_due is None else min(self.max_wait, max(0.0, float(next_due)))
+        self._wait(wait)
+        return []
+
+    def done(self, batch: list[PgJob], ok: bool, error: Optional[str] = None) -> None:
+        claims = {"ids": [job.id for job in batch], "attempts": [job.attempts for job in batch]}
+        with self.pool.connection() as conn:
+            with conn.cursor() as cur:
+                if ok:
+                    cur.execute(self._delete_sql, claims)
+                else:
+                    cur.execute(
+                        self._retry_sql,
+                        dict(claims, max_attempts=self.max_attempts, delay=self.retry_delay, error=error),
+                    )
+                settled = cur.rowcount
+            conn.commit()
+
+        stale = len(batch) - settled
+        if stale > 0:
+            self.stale += stale
+            logger.warning(
+                "%d job(s) of queue %s timed out and were claimed again, result ignored", stale, self.queue
+            )
+        if ok:
+            self.completed += settled
+        elif settled:
+            self.retried += settled
+            logger.warning("Retrying %d job(s) of queue %s later", settled, self.queue)
+
+    def close(self) -> None:
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is None:
+            return
+        # Back to the pool in the state it came out: no LISTEN (other users
+        # would collect our notifications forever) and no autocommit
+        try:
+            with listener.cursor() as cur:
+                cur.execute("UNLISTEN *")
+            listener.notifies.clear()
+            listener.autocommit = False
+        except psycopg2.Error:
+            self.pool.putconn(listener, close=True)
+            return
+        self.pool.putconn(listener)
+
+    def stats(self) -> dict:
+        return {
+            "claimed": self.claimed,
+            "completed": self.completed,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "stale": self.stale,
+            "notifications": self.notifications,
+            "listening": self._listener is not None,
+        }
+
+    # --- LISTEN connection ---------------------------------------------------
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None or not self.channel:
+            return
+        conn = self.pool.getconn()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {quote_ident(self.channel)}")
+        except psycopg2.Error:
+            self.pool.putconn(conn, close=True)
+            raise
+        with self._lock:
+            self._listener = conn
+
+    def _wait(self, timeout: float) -> None:
+        """
+        Sleep until a notification arrives or `timeout` seconds pass.
+        """
+        listener = self._listener
+        if timeout <= 0:
+            return
+        waitables = [w for w in (listener, self.wakeup) if w is not None]
+        if not waitables:
+            # No channel configured: plain polling
+            time.sleep(timeout)
+            return
+        try:
+            readable, _, _ = select.select(waitables, [], [], timeout)
+            if listener is not None and listener in readable:
+                listener.poll()
+                self.notifications += len(listener.notifies)
+                listener.notifies.clear()
+        except (psycopg2.Error, OSError, ValueError):
+            # Broken listener: drop it, the next fetch opens a new one
+            logger.warning("LISTEN connection lost, reconnecting", exc_info=True)
+            with self._lock:
+                self._listener = None
+            self.pool.putconn(listener, close=True)
+
+
+def create_pg_queue_source(config: dict, stores: dict[str, Any], wakeup=None) -> PgQueueSource:
+    pg_pool = stores.get("pg_pool")
+    if pg_pool is None:
+        raise RuntimeError("WORKER_SOURCE=pg_queue needs PG_ENABLED=true")
+    return PgQueueSource(
+        pg_pool,
+        table=config.get("WORKER_PG_QUEUE_TABLE", "worker_jobs"),
+        queue=config.get("WORKER_PG_QUEUE", "default"),
+        channel=config.get("WORKER_PG_QUEUE_CHANNEL", "worker_jobs") or None,
+        batch_size=int(config.get("WORKER_BATCH_SIZE", 100)),
+        visibility_timeout=float(config.get("WORKER_PG_VISIBILITY_TIMEOUT", 300)),
+        max_attempts=int(config.get("WORKER_PG_MAX_ATTEMPTS", 5)),
+        retry_delay=float(config.get("WORKER_PG_RETRY_DELAY", 10)),
+        max_wait=float(config.get("WORKER_POLL_INTERVAL", 5)),
+        wakeup=wakeup,
+    )
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Redis Streams consumer-group job source for the worker."""
+
+from __future__ import annotations
+
+__updated__ = "2026-10-18 07:18:52"
+
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class StreamMessage(NamedTuple):
+    """
+    One stream entry; `fields` as returned by Redis (bytes keys/values).
+    """
+
+    id: str
+    fields: dict
+
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _entries(entries) -> list[StreamMessage]:
+    messages = []
+    for entry_id, fields in entries or ():
+        if fields is None:  # deleted from the stream while pending
+            continue
+        if isinstance(entry_id, bytes):
+            entry_id = entry_id.decode()
+        messages.append(StreamMessage(entry_id, fields))
+    return messages
+
+
+class RedisStreamSource:
+    """
+    Read jobs from `stream` as member `consumer` of consumer group `group`,
+    so many replicas share one stream and each entry goes to one of them.
+
+    `fetch()` returns at most one batch of up to `batch_size` entries:
+    - every `claim_interval` seconds it first takes over entries left
+      pending for `claim_idle_ms` by other (dead or stuck) consumers with
+      XAUTOCLAIM
+    - otherwise it waits up to `block_ms` in XREADGROUP for new entries,
+      so an idle worker costs one blocked call instead of a poll loop.
+      Keep `block_ms` below the pool's socket timeout. With `block_ms=0`
+      the read does not block and the source reports `blocking = False`,
+      so the worker's poll delays apply instead.
+
+    `done(batch, ok)` acknowledges a processed batch. Acks are buffered
+    and sent as one XACK once `batch_size` ids are waiting, before every
+    fetch, and on `close()`. Failed batches are not acknowledged: they stay
+    pending and are redelivered by XAUTOCLAIM after `claim_idle_ms`.
+    A reclaimed entry delivered more than `max_deliveries` times is moved
+    to the `dead_letter` stream (default "<stream>:dead") and acknowledged
+    instead of being handed out again.
+    """
+
+    blocking = True
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        stream: str,
+        group: str,
+        consumer: Optional[str] = None,
+        *,
+        batch_size: int = 100,
+        block_ms: int = 2000,
+        claim_idle_ms: int = 60000,
+        claim_interval: float = 30.0,
+        max_deliveries: int = 5,
+        dead_letter: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client = client
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer or default_consumer_name()
+        self.batch_size = max(1, int(batch_size))
+        self.block_ms = max(0, int(block_ms))
+        # XREADGROUP without BLOCK returns at once: let the worker pace the polls
+        self.blocking = self.block_ms > 0
+        self.claim_idle_ms = max(1, int(claim_idle_ms))
+        self.claim_interval = float(claim_interval)
+        # 0 disables the cap
+        self.max_deliveries = max(0, int(max_deliveries))
+        self.dead_letter = dead_letter or f"{stream}:dead"
+        self._clock = clock
+
+        self._ack_lock = threading.Lock()
+        self._pending_acks: list[str] = []
+        self._claim_cursor = "0-0"
+        self._next_claim = clock()
+        self._group_ready = False
+
+        self.received = 0
+        self.claimed = 0
+        self.acked = 0
+        self.dead_lettered = 0
+
+    def ensure_group(self) -> None:
+        """
+        Create the stream and the group (reading new entries only) if needed.
+        """
+        try:
+            self.client.xgroup_create(self.stream, self.group, id="$", mkstream=True)
+            logger.info("Created consumer group %s on stream %s", self.group, self.stream)
+        except redis.ResponseError as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+        self._group_ready = True
+
+    def fetch(self) -> list[list[StreamMessage]]:
+        if not self._group_ready:
+            self.ensure_group()
+        self.flush_acks()
+
+        if self._clock() >= self._next_claim:
+            batch = self._claim()
+            if batch:
+                return [batch]
+
+        response = self.client.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.batch_size,
+            block=self.block_ms if self.blocking else None,
+        )
+        if isinstance(response, dict):  # RESP3: {stream: [entries]}
+            streams = [(name, value[0] if value else ()) for name, value in response.items()]
+        else:  # RESP2: [[stream, entries]]
+            streams = response or ()
+        batch = []
+        for _name, entries in streams:
+            batch.extend(_entries(entries))
+        self.received += len(batch)
+        return [batch] if batch else []
+
+    def done(self, batch: list[StreamMessage], ok: bool, error: Optional[str] = None) -> None:
+        if not ok:
+            logger.warning("Leaving %d stream entries pending for redelivery: %s", len(batch), error)
+            return
+        with self._ack_lock:
+            self._pending_acks.extend(message.id for message in batch)
+            due = len(self._pending_acks) >= self.batch_size
+        if due:
+            self.flush_acks()
+
+    def flush_acks(self) -> None:
+        with self._ack_lock:
+            ids, self._pending_acks = self._pending_acks, []
+        if not ids:
+            return
+        try:
+            self.client.xack(self.stream, self.group, *ids)
+        except redis.RedisError:
+            # Keep them for the next flush; worst case they are redelivered
+            logger.warning("XACK of %d entries failed, will retry", len(ids), exc_info=True)
+            with self._ack_lock:
+                self._pending_acks[:0] = ids
+            return
+        self.acked += len(ids)
+
+    def close(self) -> None:
+        self.flush_acks()
+
+    def stats(self) -> dict:
+        return {
+            "received": self.received,
+            "claimed": self.claimed,
+            "acked": self.acked,
+            "dead_lettered": self.dead_lettered,
+            "ack_pending": len(self._pending_acks),
+        }
+
+    def _claim(self) -> list[StreamMessage]:
+        response = self.client.xautoclaim(
+            self.stream,
+            self.group,
+            self.consumer,
+            self.claim_idle_ms,
+            start_id=self._claim_cursor,
+            count=self.batch_size,
+        )
+        cursor = response[0]
+        self._claim_cursor = cursor.decode() if isinstance(cursor, bytes) else str(cursor)
+        if self._claim_cursor in ("0-0", "0"):
+            # Whole pending list scanned: wait for the next interval
+            self._claim_cursor = "0-0"
+            self._next_claim = self._clock() + self.claim_interval
+        batch = _entries(response[1])
+        if batch and self.max_deliveries:
+            batch = self._drop_dead_letters(batch)
+        if batch:
+            self.claimed += len(batch)
+            logger.info("Reclaimed %d stale stream entries", len(batch))
+        return batch
+
+    def _drop_dead_letters(self, batch: list[StreamMessage]) -> list[StreamMessage]:
+        """
+        Move entries past `max_deliveries` to the dead-letter stream (XADD +
+        XACK in one MULTI) and return the others.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for message in batch:
+            pipe.xpending_range(self.stream, self.group, message.id, message.id, 1)
+        deliveries = {}
+        for pending in pipe.execute():
+            for entry in pending:
+                entry_id = entry["message_id"]
+                deliveries[entry_id.decode() if isinstance(entry_id, bytes) else entry_id] = entry["times_delivered"]
+
+        dead = [m for m in batch if deliveries.get(m.id, 0) > self.max_deliveries]
+        if not dead:
+            return batch
+        pipe = self.client.pipeline(transaction=True)
+        for message in dead:
+            fields = dict(message.fields)
+            fields.update({"dead_letter_id": message.id, "dead_letter_deliveries": deliveries[message.id]})
+            pipe.xadd(self.dead_letter, fields)
+        pipe.xack(self.stream, self.group, *(m.id for m in dead))
+        pipe.execute()
+        self.dead_lettered += len(dead)
+        logger.error(
+            "Moved %d stream entries delivered more than %d times to %s",
+            len(dead),
+            self.max_deliveries,
+            self.dead_letter,
+        )
+        dead_ids = {m.id for m in dead}
+        return [m for m in batch if m.id not in dead_ids]
+
+
+def create_stream_source(config: dict, stores: dict[str, Any]) -> RedisStreamSource:
+    client = stores.get("redis")
+    if client is None:
+        raise RuntimeError("WORKER_SOURCE=redis_stream needs REDIS_ENABLED=true")
+    return RedisStreamSource(
+        client,
+        config.get("WORKER_STREAM", "jobs"),
+        config.get("WORKER_STREAM_GROUP", "workers"),
+        config.get("WORKER_STREAM_CONSUMER") or None,
+        batch_size=int(config.get("WORKER_BATCH_SIZE", 100)),
+        block_ms=int(config.get("WORKER_STREAM_BLOCK_MS", 2000)),
+        claim_idle_ms=int(config.get("WORKER_STREAM_CLAIM_IDLE_MS", 60000)),
+        claim_interval=float(config.get("WORKER_STREAM_CLAIM_INTERVAL", 30)),
+        max_deliveries=int(config.get("WORKER_STREAM_MAX_DELIVERIES", 5)),
+        dead_letter=config.get("WORKER_STREAM_DEAD_LETTER") or None,
+    )
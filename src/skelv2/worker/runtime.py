@@ -7,51 +7,210 @@
 
 from __future__ import annotations
 
-__updated__ = "2025-12-16 12:44:07"
+__updated__ = "2026-10-18 09:21:37"
 
+import functools
 import logging
-import signal
 import time
-from typing import Any
+from typing import Any, Optional
 
 from db import init_datastores
 from stdoutlog import init_logging
 
+from .executor import WorkExecutor
+from .pg_queue import create_pg_queue_source
+from .redis_stream import create_stream_source
+from .scheduler import Backoff, Scheduler, WakeupEvent, install_stop_signals
+from .supervisor import Supervisor, current_rss_mb
+
 logger = logging.getLogger(__name__)
 
+# Datastores of a process-pool child, opened by _init_process_child
+_child_stores: dict[str, Any] = {}
+
+# When the placeholder _fetch_work last handed out its periodic unit
+_last_tick: Optional[float] = None
+
+
+class IntervalUnits(list):
+    """
+    Units due on a timer rather than found work: the loop keeps backing off
+    after them instead of polling again at once.
+    """
+
 
-def _perform_work(config: dict, stores: dict[str, Any]) -> None:
+def _fetch_work(config: dict, stores: dict[str, Any]) -> list:
+    """
+    Work source for WORKER_SOURCE=poll: return the units available now
+    (empty when idle). Each unit is handed to _perform_work on the executor.
+    After a non-empty fetch the loop polls again at once; idle polls back off.
+
+    Placeholder: until replaced it hands out one `None` unit every
+    WORKER_POLL_INTERVAL seconds, so a _perform_work filled in on its own
+    runs on that interval.
+    """
+    ############################################################################
+    #
+    # CODE SHOULD COME HERE: return the units to hand to _perform_work
+    #
+    ############################################################################
+    global _last_tick  # pylint: disable=global-statement
+    now = time.monotonic()
+    if _last_tick is not None and now - _last_tick < float(config.get("WORKER_POLL_INTERVAL", 5)):
+        return []
+    _last_tick = now
+    return IntervalUnits([None])
+
+
+def _register_tasks(scheduler: Scheduler, config: dict, stores: dict[str, Any], executor: WorkExecutor) -> None:
+    """
+    Placeholder for periodic / cron tasks, e.g.:
+
+        scheduler.every(300, refresh_cache)
+        scheduler.cron("0 3 * * *", lambda: executor.submit("nightly-report"))
+    """
+
+    def heartbeat() -> None:
+        logger.info("Worker alive", extra={"service": config.get("SERVICE_NAME"), "worker": executor.stats()})
+
+    scheduler.every(float(config.get("WORKER_HEARTBEAT_INTERVAL", 60)), heartbeat, name="heartbeat")
+
+
+def _perform_work(config: dict, stores: dict[str, Any], unit: Any = None) -> None:
     """
     Placeholder unit of work to be replaced with domain-specific logic.
+    Runs on an executor thread (or child process): keep it thread-safe.
     """
     ############################################################################
     #
     # CODE SHOULD COME HERE AND/OR IN ADDITIONAL MODULES IN THIS PACKAGE FOLDER
     #
+    # Write batches with db.copy_rows / db.insert_many, not row by row.
+    #
     ############################################################################
     logger.info("Worker heartbeat", extra={"service": config.get("SERVICE_NAME")})
 
 
+def _init_process_child(config: dict) -> None:
+    # Connections must not be shared across fork: each child opens its own
+    global _child_stores  # pylint: disable=global-statement
+    init_logging(config)
+    _child_stores = init_datastores(config)
+
+
+def _perform_work_in_child(config: dict, unit: Any) -> None:
+    _perform_work(config, _child_stores, unit)
+
+
+def build_executor(config: dict, stores: dict[str, Any]) -> WorkExecutor:
+    """
+    Executor for _perform_work sized from the WORKER_EXECUTOR* settings.
+    """
+    kind = config.get("WORKER_EXECUTOR", "thread")
+    if kind == "process":
+        handler = functools.partial(_perform_work_in_child, config)
+        initializer, initargs = _init_process_child, (config,)
+    else:
+        handler = functools.partial(_perform_work, config, stores)
+        initializer, initargs = None, ()
+    return WorkExecutor(
+        handler,
+        kind=kind,
+        size=int(config.get("WORKER_EXECUTOR_SIZE", 4)),
+        max_in_flight=int(config.get("WORKER_MAX_IN_FLIGHT", 0)) or None,
+        initializer=initializer,
+        initargs=initargs,
+        stats_interval=float(config.get("WORKER_STATS_INTERVAL", 60)),
+    )
+
+
+def build_source(config: dict, stores: dict[str, Any], stop: WakeupEvent = None):
+    """
+    Job source selected by WORKER_SOURCE, or None for the _fetch_work poll.
+
+    A source has `fetch()` (list of units), `done(unit, ok, error)`,
+    `close()` and a `blocking` flag (fetch waits for work itself, no poll
+    sleep needed).
+    """
+    kind = config.get("WORKER_SOURCE", "poll")
+    if kind == "redis_stream":
+        return create_stream_source(config, stores)
+    if kind == "pg_queue":
+        return create_pg_queue_source(config, stores, wakeup=stop)
+    if kind != "poll":
+        raise ValueError(f"Unsupported WORKER_SOURCE {kind!r}")
+    return None
+
+
+def _settle(source, unit: Any, future) -> None:
+    error = future.exception() if not future.cancelled() else "cancelled at shutdown"
+    try:
+        source.done(unit, error is None, None if error is None else repr(error))
+    except Exception:  # pylint: disable=broad-except
+        # Not settled: the source redelivers the unit after its timeout
+        logger.exception("Settling a worker unit failed")
+
+
 def _cleanup(config: dict, stores: dict[str, Any]) -> None:
     logger.info("Worker cleanup complete", extra={"service": config.get("SERVICE_NAME")})
 
 
+def _recycle_reason(executor: WorkExecutor, max_tasks: int, max_rss_mb: float) -> str:
+    if max_tasks and executor.submitted >= max_tasks:
+        return f"{executor.submitted} units done"
+    if max_rss_mb:
+        rss = current_rss_mb()
+        if rss > max_rss_mb:
+            return f"RSS {rss:.0f} MiB above {max_rss_mb:.0f} MiB"
+    return ""
+
+
 def run_worker_app(config: dict) -> None:
     """
-    Initialize logging/datastores and run the worker loop.
+    Run the worker: WORKER_CONCURRENCY > 1 forks that many worker processes
+    under a supervisor, otherwise this process runs the worker loop itself.
     """
+    concurrency = int(config.get("WORKER_CONCURRENCY", 1))
+    if concurrency <= 1:
+        run_worker_process(config)
+        return
+
+    # No datastores here: every child opens its own after the fork
     init_logging(config)
-    stores = init_datastores(config)
-    poll_interval = int(config.get("WORKER_POLL_INTERVAL", 5))
-    stopping = False
+    supervisor = Supervisor(
+        functools.partial(run_worker_process, config),
+        concurrency,
+        restart_max_delay=float(config.get("WORKER_RESTART_MAX_DELAY", 60)),
+        # Children get the drain timeout plus a margin for cleanup
+        shutdown_timeout=float(config.get("WORKER_DRAIN_TIMEOUT", 30)) + 5.0,
+    )
+    supervisor.run()
 
-    def _handle_stop(signum, _frame):
-        nonlocal stopping
-        logger.info("Received signal %s, preparing to stop", signum)
-        stopping = True
 
-    signal.signal(signal.SIGTERM, _handle_stop)
-    signal.signal(signal.SIGINT, _handle_stop)
+def run_worker_process(config: dict) -> None:
+    """
+    Initialize logging/datastores and run the worker loop until stopped
+    or, with WORKER_MAX_TASKS_PER_CHILD / WORKER_MAX_RSS_MB, recycled.
+    """
+    init_logging(config)
+    stores = init_datastores(config)
+    poll_interval = int(config.get("WORKER_POLL_INTERVAL", 5))
+    drain_timeout = float(config.get("WORKER_DRAIN_TIMEOUT", 30))
+    max_tasks = int(config.get("WORKER_MAX_TASKS_PER_CHILD", 0))
+    max_rss_mb = float(config.get("WORKER_MAX_RSS_MB", 0))
+    # SIGTERM/SIGINT set `stop`, which ends every wait below at once
+    stop = WakeupEvent()
+    install_stop_signals(stop)
+    source = build_source(config, stores, stop)
+    executor = build_executor(config, stores)
+    backoff = Backoff(
+        initial=float(config.get("WORKER_POLL_MIN_INTERVAL", 0.05)),
+        maximum=poll_interval,
+        jitter=float(config.get("WORKER_POLL_JITTER", 0.2)),
+    )
+    scheduler = Scheduler()
+    _register_tasks(scheduler, config, stores, executor)
+    scheduler.start(stop)
 
     logger.info(
         "Worker starting",
@@ -59,13 +218,41 @@ def run_worker_app(config: dict) -> None:
             "service": config.get("SERVICE_NAME"),
             "env": config.get("SERVICE_ENV"),
             "poll_interval": poll_interval,
+            "source": config.get("WORKER_SOURCE", "poll"),
+            "worker": {"executor": executor.kind, "size": executor.size, "max_in_flight": executor.max_in_flight},
         },
     )
     try:
-        while not stopping:
-            _perform_work(config, stores)
-            time.sleep(poll_interval)
+        while not stop.is_set():
+            try:
+                units = source.fetch() if source is not None else _fetch_work(config, stores)
+            except Exception:  # pylint: disable=broad-except
+                delay = backoff.next_delay()
+                logger.exception("Fetching work failed, retrying in %.2fs", delay)
+                stop.wait(delay)
+                continue
+            for unit in units:
+                # Blocks while max_in_flight units are pending (backpressure)
+                future = executor.submit(unit)
+                if source is not None:
+                    future.add_done_callback(functools.partial(_settle, source, unit))
+            if units and not isinstance(units, IntervalUnits):
+                backoff.reset()
+            elif source is None or not source.blocking:
+                stop.wait(backoff.next_delay())
+            reason = _recycle_reason(executor, max_tasks, max_rss_mb)
+            if reason:
+                # Exit cleanly: the supervisor (or the container runtime) starts a fresh process
+                logger.info("Worker recycling: %s", reason)
+                break
     except (KeyboardInterrupt, SystemExit):
         logger.info("Worker interrupted, shutting down")
     finally:
+        if stop.signum is not None:
+            logger.info("Received signal %s, preparing to stop", stop.signum)
+        stop.set()
+        logger.info("Worker draining %d in-flight unit(s)", executor.in_flight)
+        executor.shutdown(drain_timeout)
+        if source is not None:
+            source.close()
         _cleanup(config, stores)
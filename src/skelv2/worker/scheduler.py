@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Worker scheduling helpers: interruptible waits, adaptive poll backoff, periodic/cron tasks."""
+
+from __future__ import annotations
+
+__updated__ = "2026-10-18 06:52:30"
+
+import datetime
+import heapq
+import itertools
+import logging
+import os
+import random
+import select
+import signal
+import threading
+import time
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class WakeupEvent:
+    """
+    Event that is safe to set from a signal handler and can be waited on
+    together with sockets.
+
+    A flag plus a pipe: `set()` writes one byte (no lock, so it cannot
+    deadlock against the interrupted thread) and `wait()` is a select() on
+    the pipe, which returns as soon as the event is set, also when the
+    setter is a signal handler running on the waiting thread.
+    `fileno()` lets other select() calls (e.g. on a LISTEN connection)
+    wake up too. `signum` records the signal that set it, if any.
+    """
+
+    def __init__(self) -> None:
+        self._flag = False
+        self.signum: Optional[int] = None
+        self._read_fd, self._write_fd = os.pipe()
+        os.set_blocking(self._read_fd, False)
+        os.set_blocking(self._write_fd, False)
+
+    def fileno(self) -> int:
+        return self._read_fd
+
+    def is_set(self) -> bool:
+        return self._flag
+
+    def set(self) -> None:
+        if self._flag:
+            return
+        self._flag = True
+        try:
+            os.write(self._write_fd, b"\0")
+        except BlockingIOError:
+            pass  # already readable
+
+    def clear(self) -> None:
+        self._flag = False
+        try:
+            while os.read(self._read_fd, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Return True once set, False after `timeout` seconds.
+        """
+        return wait_any((self,), timeout) is not None
+
+
+def wait_any(events: Iterable[WakeupEvent], timeout: Optional[float] = None) -> Optional[WakeupEvent]:
+    """
+    Wait until one of `events` is set; return it, or None on timeout.
+    """
+    events = tuple(events)
+    for event in events:
+        if event.is_set():
+            return event
+    if timeout is not None and timeout <= 0:
+        return None
+    select.select(events, [], [], timeout)
+    for event in events:
+        if event.is_set():
+            return event
+    return None
+
+
+def install_stop_signals(stop: WakeupEvent, signals: Iterable[int] = (signal.SIGTERM, signal.SIGINT)) -> None:
+    """
+    Set `stop` on SIGTERM/SIGINT (main thread only).
+
+    The handler only records the signal and sets the event: logging from a
+    signal handler can deadlock on a handler lock held by the interrupted
+    thread, so callers log `stop.signum` once their wait returns.
+    """
+
+    def _handle_stop(signum, _frame):
+        stop.signum = signum
+        stop.set()
+
+    for signum in signals:
+        signal.signal(signum, _handle_stop)
+
+
+class Backoff:
+    """
+    Delay before the next poll: `reset()` after a poll that found work
+    (poll again at once), `next_delay()` after an idle one. Idle delays
+    start at `initial`, grow by `factor` up to `maximum`, and are spread
+    by +/- `jitter` (a fraction) so replicas do not poll in lockstep.
+    """
+
+    def __init__(
+        self,
+        initial: float = 0.05,
+        maximum: float = 5.0,
+        factor: float = 2.0,
+        jitter: float = 0.2,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        self.initial = max(0.001, float(initial))
+        self.maximum = max(self.initial, float(maximum))
+        self.factor = max(1.0, float(factor))
+        self.jitter = min(1.0, max(0.0, float(jitter)))
+        self._rand = rand
+        self._current = self.initial
+
+    def reset(self) -> None:
+        self._current = self.initial
+
+    def next_delay(self) -> float:
+        delay = self._current
+        self._current = min(self.maximum, self._current * self.factor)
+        spread = 1.0 + self.jitter * (2.0 * self._rand() - 1.0)
+        return min(self.maximum, delay * spread)
+
+
+# --- cron ----------------------------------------------------------------------
+
+_CRON_FIELDS = (("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7))
+
+
+def _parse_cron_field(spec: str, low: int, high: int) -> frozenset:
+    values = set()
+    for part in spec.split(","):
+        rng, _, step = part.partition("/")
+        step_n = int(step) if step else 1
+        if rng == "*":
+            start, end = low, high
+        elif "-" in rng:
+            start, end = (int(x) for x in rng.split("-", 1))
+        else:
+            start = int(rng)
+            end = high if step else start
+        if step_n < 1 or not low <= start <= end <= high:
+            raise ValueError(f"invalid cron field {spec!r} (allowed {low}-{high})")
+        values.update(range(start, end + 1, step_n))
+    return frozenset(values)
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression ("minute hour day month weekday",
+    weekday 0/7 = Sunday) evaluated in UTC. Supports *, lists, ranges and
+    steps; when both day and weekday are restricted either one matches.
+    """
+
+    def __init__(self, expression: str) -> None:
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        fields = [_parse_cron_field(p, low, high) for p, (_name, low, high) in zip(parts, _CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    def _day_matches(self, when: datetime.datetime) -> bool:
+        day_ok = when.day in self.days
+        weekday_ok = (when.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, when: datetime.datetime) -> datetime.datetime:
+        """
+        First matching minute strictly after `when` (timezone-aware UTC).
+        """
+        when = when.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = when + datetime.timedelta(days=366 * 5)
+        while when < limit:
+            if when.month not in self.months:
+                year, month = (when.year + 1, 1) if when.month == 12 else (when.year, when.month + 1)
+                when = when.replace(year=year, month=month, day=1, hour=0, minute=0)
+            elif not self._day_matches(when):
+                when = when.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif when.hour not in self.hours:
+                when = when.replace(minute=0) + datetime.timedelta(hours=1)
+            elif when.minute not in self.minutes:
+                when += datetime.timedelta(minutes=1)
+            else:
+                return when
+        raise ValueError(f"cron expression never matches: {self.expression!r}")
+
+
+# --- scheduler -------------------------------------------------------------------
+
+
+class ScheduledTask:
+    __slots__ = ("name", "func", "interval", "cron", "cancelled", "runs", "failures")
+
+    def __init__(self, name: str, func: Callable[[], None], interval: Optional[float], cron: Optional[CronSchedule]):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.cron = cron
+        self.cancelled = False
+        self.runs = 0
+        self.failures = 0
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    Periodic and cron tasks on one min-heap of due times, run by a single
+    thread (`start(stop)`) instead of one thread per task.
+
+    The thread sleeps until the earliest due task, a newly added task or
+    `stop`. Tasks run one after the other on that thread: keep them short,
+    or hand the work to the executor. A periodic task that falls behind
+    (a long run, a busy thread) skips the runs it missed.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        utcnow: Callable[[], datetime.datetime] = lambda: datetime.datetime.now(datetime.timezone.utc),
+    ) -> None:
+        self._clock = clock
+        self._utcnow = utcnow
+        self._heap: list = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._changed = WakeupEvent()
+        self._thread: Optional[threading.Thread] = None
+
+    def every(
+        self, interval: float, func: Callable[[], None], *, name: Optional[str] = None, run_now: bool = False
+    ) -> ScheduledTask:
+        interval = float(interval)
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        task = ScheduledTask(name or getattr(func, "__name__", "task"), func, interval, None)
+        self._push(self._clock() + (0.0 if run_now else interval), task)
+        return task
+
+    def cron(self, expression: str, func: Callable[[], None], *, name: Optional[str] = None) -> ScheduledTask:
+        task = ScheduledTask(name or getattr(func, "__name__", "task"), func, None, CronSchedule(expression))
+        self._push(self._cron_due(task.cron), task)
+        return task
+
+    def run_pending(self) -> Optional[float]:
+        """
+        Run every due task; return seconds until the next one (None if none).
+        """
+        while True:
+            with self._lock:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap:
+                    return None
+                due, _, task = self._heap[0]
+                now = self._clock()
+                if due > now:
+                    return due - now
+                heapq.heappop(self._heap)
+            self._run(task)
+            if task.interval is not None:
+                next_due, now = due + task.interval, self._clock()
+                if next_due <= now:
+                    # Fell behind: skip the missed runs but keep the phase
+                    next_due += ((now - next_due) // task.interval + 1) * task.interval
+                self._push(next_due, task)
+            else:
+                self._push(self._cron_due(task.cron), task)
+
+    def start(self, stop: WakeupEvent) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, args=(stop,), name="worker-scheduler", daemon=True)
+        self._thread.start()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _loop(self, stop: WakeupEvent) -> None:
+        while not stop.is_set():
+            delay = self.run_pending()
+            if wait_any((stop, self._changed), delay) is self._changed:
+                self._changed.clear()
+
+    def _push(self, due: float, task: ScheduledTask) -> None:
+        with self._lock:
+            heapq.heappush(self._heap, (due, next(self._seq), task))
+            earliest = self._heap[0][2] is task
+        if earliest:
+            self._changed.set()
+
+    def _cron_due(self, cron: CronSchedule) -> float:
+        now = self._utcnow()
+        return self._clock() + (cron.next_after(now) - now).total_seconds()
+
+    def _run(self, task: ScheduledTask) -> None:
+        started = time.perf_counter()
+        try:
+            task.func()
+        except Exception:  # pylint: disable=broad-except
+            task.failures += 1
+            logger.exception("Scheduled task %s failed", task.name)
+        task.runs += 1
+        logger.debug(
+            "Scheduled task %s ran", task.name, extra={"duration_ms": round((time.perf_counter() - started) * 1000.0, 3)}
+        )
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Multi-process worker supervisor (fork, restart, recycle, coordinated shutdown)."""
+
+from __future__ import annotations
+
+__updated__ = "2026-10-18 09:30:15"
+
+import logging
+import os
+import resource
+import signal
+import time
+from typing import Callable, Optional
+
+from .scheduler import WakeupEvent, install_stop_signals, wait_any
+
+logger = logging.getLogger(__name__)
+
+EXIT_OK = 0
+EXIT_CRASH = 1
+
+
+def current_rss_mb() -> float:
+    """
+    Resident set size of this process in MiB (peak RSS where /proc is missing).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss: KiB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _exit_code(code) -> int:
+    """
+    Process exit status for `SystemExit(code)`, by the interpreter's rule:
+    None is success, an int is itself, anything else (a message) is 1.
+    """
+    if code is None:
+        return EXIT_OK
+    if isinstance(code, int):
+        return code
+    return EXIT_CRASH
+
+
+class _Child:
+    __slots__ = ("slot", "pid", "started_at", "crashes", "restart_at")
+
+    def __init__(self, slot: int) -> None:
+        self.slot = slot
+        self.pid: Optional[int] = None
+        self.started_at = 0.0
+        self.crashes = 0
+        self.restart_at = 0.0
+
+
+class Supervisor:
+    """
+    Fork `concurrency` children that each run `target()` and keep them alive.
+
+    - children start from a process without open connections or threads:
+      `target` opens its datastores itself, after the fork
+    - a child exiting with 0 (recycled after max tasks / RSS) is replaced at
+      once, at most once per `restart_delay`; a crash is restarted after
+      `restart_delay` seconds, doubled per consecutive crash up to
+      `restart_max_delay` (reset once a child has lived `stable_after`
+      seconds)
+    - SIGTERM/SIGINT are forwarded as SIGTERM to every child; children still
+      alive after `shutdown_timeout` seconds are killed
+    """
+
+    def __init__(
+        self,
+        target: Callable[[], None],
+        concurrency: int,
+        *,
+        restart_delay: float = 1.0,
+        restart_max_delay: float = 60.0,
+        stable_after: float = 60.0,
+        shutdown_timeout: float = 35.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.target = target
+        self.concurrency = max(1, int(concurrency))
+        self.restart_delay = float(restart_delay)
+        self.restart_max_delay = max(self.restart_delay, float(restart_max_delay))
+        self.stable_after = float(stable_after)
+        self.shutdown_timeout = float(shutdown_timeout)
+        self._clock = clock
+        self._children = [_Child(slot) for slot in range(self.concurrency)]
+        self._stop = WakeupEvent()
+        self._child_exited = WakeupEvent()
+        self.restarts = 0
+
+    def run(self) -> int:
+        """
+        Supervise until SIGTERM/SIGINT; return the exit code for the parent.
+        """
+        install_stop_signals(self._stop)
+        signal.signal(signal.SIGCHLD, lambda _signum, _frame: self._child_exited.set())
+        logger.info("Worker supervisor starting %d children", self.concurrency)
+
+        for child in self._children:
+            self._spawn(child)
+        while not self._stop.is_set():
+            self._reap()
+            self._restart_due()
+            if wait_any((self._stop, self._child_exited), self._next_restart_in()) is self._child_exited:
+                self._child_exited.clear()
+        return self._shutdown()
+
+    # --- children ------------------------------------------------------------
+
+    def _spawn(self, child: _Child) -> None:
+        pid = os.fork()
+        if pid == 0:
+            self._child_main(child.slot)
+        child.pid = pid
+        child.started_at = self._clock()
+        logger.info("Worker child %d started (pid %d)", child.slot, pid)
+
+    def _child_main(self, slot: int) -> None:
+        # Never returns: the child must not run the supervisor loop or atexit hooks
+        code = EXIT_OK
+        try:
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                signal.signal(signum, signal.SIG_DFL)
+            self.target()
+        except SystemExit as exc:
+            code = _exit_code(exc.code)
+        except BaseException:  # pylint: disable=broad-except
+            logger.exception("Worker child %d crashed", slot)
+            code = EXIT_CRASH
+        finally:
+            # Close (not just flush) the handlers: the async one drains its
+            # queue on close, and os._exit skips the atexit logging.shutdown
+            logging.shutdown()
+            os._exit(code)  # pylint: disable=protected-access
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            child = next((c for c in self._children if c.pid == pid), None)
+            if child is None:
+                continue
+            self._exited(child, os.waitstatus_to_exitcode(status))
+
+    def _exited(self, child: _Child, code: int) -> None:
+        now = self._clock()
+        lived = now - child.started_at
+        child.pid = None
+        if self._stop.is_set():
+            return
+        if code == EXIT_OK:
+            logger.info("Worker child %d recycled after %.0fs", child.slot, lived)
+            child.crashes = 0
+            # At most one recycle per restart_delay, should a limit be set too low
+            child.restart_at = max(now, child.started_at + self.restart_delay)
+            return
+        if lived >= self.stable_after:
+            child.crashes = 0
+        child.crashes += 1
+        delay = min(self.restart_max_delay, self.restart_delay * 2 ** (child.crashes - 1))
+        child.restart_at = now + delay
+        how = f"signal {-code}" if code < 0 else f"code {code}"
+        logger.error("Worker child %d died (%s) after %.0fs, restarting in %.1fs", child.slot, how, lived, delay)
+
+    def _restart_due(self) -> None:
+        now = self._clock()
+        for child in self._children:
+            if child.pid is None and child.restart_at <= now and not self._stop.is_set():
+                self.restarts += 1
+                self._spawn(child)
+
+    def _next_restart_in(self) -> Optional[float]:
+        waiting = [c.restart_at for c in self._children if c.pid is None]
+        if not waiting:
+            return None
+        return max(0.0, min(waiting) - self._clock())
+
+    def _shutdown(self) -> int:
+        if self._stop.signum is not None:
+            logger.info("Received signal %s, preparing to stop", self._stop.signum)
+        alive = [c for c in self._children if c.pid is not None]
+        logger.info("Worker supervisor stopping %d children", len(alive))
+        for child in alive:
+            self._signal(child, signal.SIGTERM)
+
+        deadline = self._clock() + self.shutdown_timeout
+        while any(c.pid is not None for c in self._children):
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                break
+            self._child_exited.wait(min(remaining, 1.0))
+            self._child_exited.clear()
+            self._reap()
+
+        for child in self._children:
+            if child.pid is not None:
+                logger.warning("Worker child %d did not stop in time, killing it", child.slot)
+                self._signal(child, signal.SIGKILL)
+                try:
+                    os.waitpid(child.pid, 0)
+                except ChildProcessError:
+                    pass
+                child.pid = None
+        logger.info("Worker supervisor stopped")
+        return EXIT_OK
+
+    @staticmethod
+    def _signal(child: _Child, signum: int) -> None:
+        try:
+            os.kill(child.pid, signum)
+        except ProcessLookupError:
+            pass
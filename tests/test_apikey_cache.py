@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""API key cache tests."""
+
+__updated__ = "2026-10-17 09:48:52"
+
+from skelv2.db.apikey_cache import ApiKeyCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cache_hits_within_ttl():
+    calls = []
+    clock = FakeClock()
+    cache = ApiKeyCache(lambda key: calls.append(key) or {"customer_id": key}, ttl=10, clock=clock)
+
+    assert cache.get("k1") == {"customer_id": "k1"}
+    clock.now = 5
+    assert cache.get("k1") == {"customer_id": "k1"}
+    assert calls == ["k1"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ApiKeyCache(lambda key: {"customer_id": key}, max_size=2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+    assert cache.peek("a") is not None
+    assert cache.peek("b") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_invalidate_forces_reload():
+    calls = []
+    cache = ApiKeyCache(lambda key: calls.append(key) or {"customer_id": key})
+    cache.get("k1")
+    cache.invalidate("k1")
+    cache.get("k1")
+    cache.invalidate()
+    cache.get("k1")
+    assert calls == ["k1", "k1", "k1"]
+
+
+def test_cache_does_not_store_unknown_keys():
+    calls = []
+    cache = ApiKeyCache(lambda key: calls.append(key))
+    assert cache.get("missing") is None
+    assert cache.get("missing") is None
+    assert cache.get("") is None
+    assert calls == ["missing", "missing"]
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""allowed_endpoints matcher tests."""
+
+__updated__ = "2026-10-18 06:06:02"
+
+from skelv2.db.apikey_endpoints import DENY_ALL, compile_endpoints
+
+
+def test_empty_endpoints_are_unrestricted():
+    assert compile_endpoints(None) is None
+    assert compile_endpoints([]) is None
+
+
+def test_invalid_endpoints_deny_everything():
+    assert compile_endpoints({"/hello": True}) is DENY_ALL
+    assert compile_endpoints("/hello") is DENY_ALL
+    assert compile_endpoints([1, None, ""]) is DENY_ALL
+    assert not DENY_ALL.allows("/hello")
+
+
+def test_exact_prefix_and_segment_patterns():
+    matcher = compile_endpoints(["/hello", "/reports/*", "/users/*/profile"])
+    assert matcher.allows("/hello")
+    assert not matcher.allows("/hello/world")
+    assert matcher.allows("/reports/2026/10")
+    assert not matcher.allows("/reports")
+    assert matcher.allows("/users/42/profile")
+    assert not matcher.allows("/users/42/settings")
+    assert not matcher.allows("/calc")
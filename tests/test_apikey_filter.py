@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""API key negative lookup tests."""
+
+__updated__ = "2026-10-18 09:59:05"
+
+from skelv2.db.apikey_filter import ApiKeyFilter, BloomFilter, NegativeCache
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter.for_capacity(1000, 0.01)
+    keys = [f"key-{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other-{i}" in bloom for i in range(1000))
+    assert false_positives < 50
+
+
+def test_negative_cache_expires_entries():
+    now = [0.0]
+    cache = NegativeCache(ttl=10, clock=lambda: now[0])
+    cache.add("bogus")
+    assert "bogus" in cache
+    now[0] = 11
+    assert "bogus" not in cache
+
+
+def test_filter_accepts_key_after_change_event():
+    apikey_filter = ApiKeyFilter(NegativeCache())
+    apikey_filter.record_missing("new-key")
+    assert apikey_filter.rejection_reason("new-key") == "negative_cache"
+    apikey_filter.on_change("new-key")
+    assert apikey_filter.rejection_reason("new-key") is None
+
+
+def test_miss_is_not_recorded_after_a_concurrent_change_event():
+    apikey_filter = ApiKeyFilter(NegativeCache())
+    generation = apikey_filter.generation
+    # The key is created (and announced) while its lookup is in flight
+    apikey_filter.on_change("new-key")
+    assert not apikey_filter.record_missing("new-key", generation)
+    assert apikey_filter.rejection_reason("new-key") is None
+
+    assert apikey_filter.record_missing("new-key", apikey_filter.generation)
+    assert apikey_filter.rejection_reason("new-key") == "negative_cache"
@@ -5,10 +5,15 @@
 
 """TESTS"""
 
-__updated__ = "2025-12-15 20:42:13"
+__updated__ = "2026-10-18 09:47:30"
 
 import json
+import logging
+import re
+import time
+
 import pytest
+from flask import Response
 
 from skelv2.api import create_api_app
 from skelv2.config import get_config
@@ -47,6 +52,52 @@ def test_ready(client):
     assert data["status"] == "ready"
 
 
+def test_server_timing_header(client):
+    resp = client.get("/health")
+    assert resp.headers["Server-Timing"].startswith("total;dur=")
+
+
+def test_metrics_endpoint(client):
+    client.get("/health")
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert 'http_requests_total{endpoint="health",method="GET",status="200"}' in resp.get_data(as_text=True)
+
+
+def test_streamed_response_is_timed_when_the_body_is_done(client):
+    app = client.application
+
+    @app.route("/stream")
+    def stream():
+        def generate():
+            yield "a\n"
+            time.sleep(0.05)
+            yield "b\n"
+
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logging.getLogger("api.access").addHandler(handler)
+    try:
+        resp = client.get("/stream")
+        # Headers only know the time to the first byte
+        assert resp.headers["Server-Timing"].startswith("ttfb;dur=")
+        assert not records
+        assert resp.get_data(as_text=True) == "a\nb\n"
+        resp.close()
+    finally:
+        logging.getLogger("api.access").removeHandler(handler)
+
+    (record,) = records
+    assert record.streamed is True
+    assert record.duration_ms >= 50.0 > record.ttfb_ms
+    text = client.get("/metrics").get_data(as_text=True)
+    observed = re.search(r'http_request_duration_seconds_sum\{endpoint="stream",status="200"\} (\S+)', text)
+    assert float(observed.group(1)) >= 0.05
+
+
 def test_root_discovery(client):
     resp = client.get("/")
     assert resp.status_code == 200
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Circuit breaker tests."""
+
+__updated__ = "2026-10-18 00:16:32"
+
+import pytest
+
+from skelv2.util.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def fail():
+    raise ConnectionError("down")
+
+
+def test_opens_on_errors_then_half_opens_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("store", error_rate=0.5, min_calls=4, window=4, open_seconds=10, clock=clock)
+    breaker.call(lambda: "ok")
+    breaker.call(lambda: "ok")
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    assert breaker.state == OPEN
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.call(lambda: "never runs")
+    assert excinfo.value.retry_after == 10
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state == OPEN
+
+    clock.now = 20
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.stats()["opened"] == 2
+
+
+def test_slow_calls_count_as_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker("store", error_rate=1.0, min_calls=2, slow_call_ms=100, clock=clock)
+
+    def slow():
+        clock.now += 0.2
+        return "late"
+
+    assert breaker.call(slow) == "late"
+    assert breaker.call(slow) == "late"
+    assert breaker.state == OPEN
+    assert breaker.stats()["slow_calls"] == 2
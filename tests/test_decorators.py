@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""require_apikey decorator tests (no Redis required)."""
+
+__updated__ = "2026-10-18 10:00:12"
+
+import pytest
+import redis
+from flask import Flask, jsonify
+
+from skelv2.db.apikey_endpoints import compile_endpoints
+from skelv2.db.apikey_filter import ApiKeyFilter, NegativeCache
+from skelv2.db.redis_apikeys import _decode_apikey
+from skelv2.db.redis_quota import QuotaCounter
+from skelv2.db.redis_ratelimit import RateLimitResult
+from skelv2.util import decorators
+from skelv2.util.decorators import require_apikey
+
+
+class FakeCache:
+    def __init__(self, keys):
+        self.keys = keys
+
+    def get(self, apikey):
+        return self.keys.get(apikey)
+
+
+class FakeLimiter:
+    fail_open = True
+
+    def __init__(self, allowed):
+        self.allowed = allowed
+
+    def hit(self, apikey, limit):
+        return RateLimitResult(self.allowed, limit, limit - 1 if self.allowed else 0, 0 if self.allowed else 2.5, 60)
+
+
+def make_client(stores):
+    app = Flask(__name__)
+
+    @app.route("/hello")
+    @require_apikey(stores)
+    def hello():
+        return jsonify({"ok": True})
+
+    return app.test_client()
+
+
+@pytest.fixture
+def stores():
+    return {
+        "redis": object(),
+        "apikey_cache": FakeCache({"good": {"customer_id": "c001", "rate_limit": 10}}),
+    }
+
+
+def test_unknown_key_is_unauthorized(stores):
+    resp = make_client(stores).get("/hello", headers={"X-API-Key": "bad"})
+    assert resp.status_code == 401
+
+
+def test_endpoint_outside_allowed_list_is_forbidden(stores):
+    stores["apikey_cache"].keys["good"]["endpoint_matcher"] = compile_endpoints(["/calc"])
+    resp = make_client(stores).get("/hello", headers={"X-API-Key": "good"})
+    assert resp.status_code == 403
+
+
+@pytest.mark.parametrize("allowed", [b'["/hello"', b'{"/hello": true}', b"[1, null, true]"])
+def test_invalid_allowed_endpoints_deny_everything(stores, allowed):
+    metadata = _decode_apikey({b"customer_id": b"c001", b"allowed_endpoints": allowed})
+    stores["apikey_cache"].keys["good"] = metadata
+    resp = make_client(stores).get("/hello", headers={"X-API-Key": "good"})
+    assert resp.status_code == 403
+
+
+def test_rate_limit_headers_on_success(stores):
+    stores["ratelimiter"] = FakeLimiter(allowed=True)
+    resp = make_client(stores).get("/hello", headers={"X-API-Key": "good"})
+    assert resp.status_code == 200
+    assert resp.headers["RateLimit-Limit"] == "10"
+    assert resp.headers["RateLimit-Remaining"] == "9"
+
+
+def test_rate_limit_exceeded_returns_429(stores):
+    stores["ratelimiter"] = FakeLimiter(allowed=False)
+    resp = make_client(stores).get("/hello", headers={"X-API-Key": "good"})
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "3"
+
+
+class FakeRedis:
+    """Just enough of redis.Redis for QuotaCounter (INCRBY/EXPIRE pipelines)."""
+
+    def __init__(self):
+        self.values = {}
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, r):
+        self.r = r
+        self.results = []
+
+    def incrby(self, key, amount):
+        self.r.values[key] = self.r.values.get(key, 0) + amount
+        self.results.append(self.r.values[key])
+
+    def expire(self, key, ttl):
+        self.results.append(True)
+
+    def execute(self):
+        return self.results
+
+
+def test_daily_quota_is_enforced(stores):
+    r = FakeRedis()
+    stores["apikey_cache"].keys["good"]["quota_daily"] = 3
+    stores["quota_counter"] = QuotaCounter(r, sync_margin=1)
+    client = make_client(stores)
+    statuses = [client.get("/hello", headers={"X-API-Key": "good"}).status_code for _ in range(5)]
+    stores["quota_counter"].flush()
+    assert statuses == [200, 200, 200, 429, 429]
+    assert sum(r.values.values()) == 3
+
+
+class FlakyRedis(FakeRedis):
+    """FakeRedis whose n-th pipeline (1-based) fails on execute."""
+
+    def __init__(self, fail_on):
+        super().__init__()
+        self.fail_on = fail_on
+        self.pipelines = 0
+
+    def pipeline(self, transaction=False):
+        self.pipelines += 1
+        if self.pipelines == self.fail_on:
+            return BrokenPipeline()
+        return super().pipeline(transaction)
+
+
+class BrokenPipeline:
+    def incrby(self, key, amount):
+        pass
+
+    def expire(self, key, ttl):
+        pass
+
+    def execute(self):
+        raise redis.exceptions.ConnectionError("connection reset")
+
+
+def test_failed_quota_refund_still_rejects_and_refunds_later(stores):
+    # Another process used the whole quota; here the exact increment (pipeline 2)
+    # goes over and the refund (pipeline 3) fails
+    r = FlakyRedis(fail_on=3)
+    stores["apikey_cache"].keys["good"]["quota_daily"] = 1
+    assert QuotaCounter(r).consume("good", 1).allowed
+    stores["quota_counter"] = QuotaCounter(r)
+    resp = make_client(stores).get("/hello", headers={"X-API-Key": "good"})
+    assert resp.status_code == 429
+
+    stores["quota_counter"].flush()
+    assert sum(r.values.values()) == 1
+
+
+class CreatedDuringLookupCache(FakeCache):
+    """Misses, while the creation event for the key lands mid-lookup."""
+
+    def __init__(self, keys, apikey_filter):
+        super().__init__(keys)
+        self.apikey_filter = apikey_filter
+
+    def get(self, apikey):
+        metadata = self.keys.get(apikey)
+        self.keys[apikey] = {"customer_id": "c002"}
+        self.apikey_filter.on_change(apikey)
+        return metadata
+
+
+def test_key_created_during_lookup_is_not_negatively_cached():
+    apikey_filter = ApiKeyFilter(NegativeCache())
+    stores = {
+        "redis": object(),
+        "apikey_cache": CreatedDuringLookupCache({}, apikey_filter),
+        "apikey_filter": apikey_filter,
+    }
+    client = make_client(stores)
+
+    assert client.get("/hello", headers={"X-API-Key": "fresh"}).status_code == 401
+    assert apikey_filter.rejection_reason("fresh") is None
+    assert client.get("/hello", headers={"X-API-Key": "fresh"}).status_code == 200
+
+
+class BrokenStoreCache(FakeCache):
+    def __init__(self, keys, error):
+        super().__init__(keys)
+        self.error = error
+
+    def get(self, apikey):
+        raise self.error
+
+    def last_known_good(self, apikey):
+        return self.keys.get(apikey)
+
+
+def test_open_circuit_serves_last_known_good_or_fails_fast():
+    stores = {
+        "redis": object(),
+        "apikey_cache": BrokenStoreCache(
+            {"good": {"customer_id": "c001"}},
+            # The class the decorator module catches (it imports util.*, not skelv2.util.*)
+            decorators.CircuitOpenError("apikey_store", 4.2),
+        ),
+    }
+    client = make_client(stores)
+    assert client.get("/hello", headers={"X-API-Key": "good"}).status_code == 200
+
+    resp = client.get("/hello", headers={"X-API-Key": "unseen"})
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "5"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Structured logging tests."""
+
+__updated__ = "2026-10-18 09:08:40"
+
+import io
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from skelv2.stdoutlog.async_handler import AsyncJsonStdoutHandler
+from skelv2.stdoutlog.formatter import JsonStdoutHandler
+from skelv2.stdoutlog.sampling import SamplingFilter, parse_rules
+
+
+def make_record(level, msg):
+    return logging.LogRecord("test", level, __file__, 1, msg, None, None)
+
+
+def test_encoder_output():
+    handler = JsonStdoutHandler("svc", "prod")
+    record = make_record(logging.INFO, "\x1b[31mred\x1b[0m ñ")
+    record.created = 1760000000.25
+    record.request_id = "rid-1"
+    line = handler.format_record(record)
+    assert line.endswith("\n")
+    payload = json.loads(line)
+    assert payload["timestamp"] == "2025-10-09T08:53:20.250000Z"
+    assert payload["message"] == "red ñ"
+    assert payload["service"] == "svc"
+    assert payload["env"] == "prod"
+    assert payload["request_id"] == "rid-1"
+
+
+def test_async_handler_drains_on_close():
+    stream = io.StringIO()
+    handler = AsyncJsonStdoutHandler("svc", "test", stream=stream, flush_interval=10)
+    for i in range(3):
+        handler.handle(make_record(logging.INFO, f"line {i}"))
+    handler.close()
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["message"] for line in lines] == ["line 0", "line 1", "line 2"]
+    assert lines[0]["service"] == "svc"
+
+
+class StalledStream(io.StringIO):
+    """Stream whose writes hang until released, like a backed-up log pipe."""
+
+    def __init__(self):
+        super().__init__()
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def write(self, s):
+        self.writing.set()
+        self.release.wait(5)
+        return super().write(s)
+
+
+SIGTERM_INSIDE_EMIT = """
+import logging, os, signal
+from skelv2.stdoutlog import init_logging
+
+init_logging({"LOG_ASYNC": True, "LOG_FLUSH_INTERVAL": 30})
+handler = logging.getLogger().handlers[0]
+logging.getLogger("t").info("queued before the signal")
+with handler._cond:  # as if SIGTERM interrupted emit()
+    os.kill(os.getpid(), signal.SIGTERM)
+"""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="needs SIGTERM")
+def test_sigterm_inside_emit_exits_and_drains():
+    src = os.path.join(os.path.dirname(__file__), "..", "src")
+    result = subprocess.run(
+        [sys.executable, "-c", SIGTERM_INSIDE_EMIT],
+        capture_output=True,
+        text=True,
+        timeout=10,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join([src, os.path.join(src, "skelv2")])),
+        check=False,
+    )
+    assert result.returncode == 143
+    assert "queued before the signal" in result.stdout
+
+
+def test_async_handler_drops_debug_when_pipe_is_stalled():
+    stream = StalledStream()
+    handler = AsyncJsonStdoutHandler(stream=stream, queue_size=2, flush_interval=0.01, overflow_policy="drop_debug")
+    handler.handle(make_record(logging.INFO, "first"))
+    assert stream.writing.wait(5)
+
+    # The writer is stuck on "first": the caller must not block
+    handler.handle(make_record(logging.INFO, "a"))
+    handler.handle(make_record(logging.INFO, "b"))
+    handler.handle(make_record(logging.DEBUG, "dropped"))
+    assert handler.dropped == 1
+
+    stream.release.set()
+    handler.close()
+    messages = [json.loads(line)["message"] for line in stream.getvalue().splitlines()]
+    assert messages[:3] == ["first", "a", "b"]
+    assert "dropped" not in messages
+    assert "1 log records dropped (queue full, policy drop_debug)" in messages
+
+
+def test_parse_sampling_rules():
+    assert parse_rules("werkzeug=0.1, util.decorators:debug=0.01") == {
+        ("werkzeug", None): 0.1,
+        ("util.decorators", "DEBUG"): 0.01,
+    }
+
+
+def test_sampling_filter_limits_noisy_logger_and_keeps_warnings():
+    now = [0.0]
+    sampling = SamplingFilter(rate_limits={("werkzeug", None): 2}, clock=lambda: now[0])
+    kept = [sampling.filter(logging.LogRecord("werkzeug.serving", logging.INFO, "", 1, "hit", None, None)) for _ in range(5)]
+    assert kept == [True, True, False, False, False]
+    assert sampling.filter(logging.LogRecord("werkzeug", logging.ERROR, "", 1, "boom", None, None))
+    assert sampling.filter(logging.LogRecord("other", logging.DEBUG, "", 1, "x", None, None))
+    assert sampling.suppressed_total == 3
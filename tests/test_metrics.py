@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Multi-process metrics tests."""
+
+__updated__ = "2026-10-18 08:03:12"
+
+import logging
+import os
+from types import SimpleNamespace
+
+from skelv2 import gunicorn_conf
+from skelv2.metrics import Registry, archive_process, generate_latest
+from skelv2.metrics.mmap_store import MmapValueFile, read_values
+from skelv2.metrics.registry import sample_key
+
+
+def test_mmap_value_file_roundtrip_and_growth(tmp_path):
+    path = str(tmp_path / "1.db")
+    values = MmapValueFile(path)
+    for i in range(3000):
+        values.set(f"key-{i}", float(i))
+    values.set("key-7", 70.0)
+    data = dict(read_values(path))
+    assert len(data) == 3000
+    assert data["key-7"] == 70.0
+    assert data["key-2999"] == 2999.0
+
+
+def test_exposition_aggregates_processes(tmp_path):
+    registry = Registry()
+    registry.directory = str(tmp_path)
+    requests = registry.counter("http_requests", "Requests.", ("status",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    pool = registry.gauge("pool_connections", "Pool.")
+
+    requests.labels("200").inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    pool.set(3)
+
+    # A second worker that already exited: its counters count, its gauges do not
+    other = MmapValueFile(os.path.join(str(tmp_path), "999999999.db"))
+    other.set(sample_key("http_requests", "http_requests_total", {"status": "200"}), 4)
+    other.set(sample_key("pool_connections", "pool_connections", {}), 10)
+
+    text = generate_latest(registry)
+    assert "# TYPE http_requests_total counter" in text
+    assert 'http_requests_total{status="200"} 5' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    assert "pool_connections 3" in text
+
+
+def test_exited_process_files_are_archived(tmp_path):
+    registry = Registry()
+    registry.directory = str(tmp_path)
+    requests = registry.counter("http_requests", "Requests.", ("status",))
+    pool = registry.gauge("pool_connections", "Pool.")
+    counter_key = sample_key("http_requests", "http_requests_total", {"status": "200"})
+
+    # Two worker generations that exited one after the other
+    for pid, count in ((999999998, 4), (999999999, 6)):
+        dead = MmapValueFile(os.path.join(str(tmp_path), f"{pid}.db"))
+        dead.set(counter_key, count)
+        dead.set(sample_key("pool_connections", "pool_connections", {}), 10)
+        dead.close()
+        assert archive_process(str(tmp_path), pid)
+    assert not archive_process(str(tmp_path), 999999999)
+
+    requests.labels("200").inc()
+    pool.set(3)
+    assert sorted(os.listdir(tmp_path)) == ["archive.db"]
+    text = generate_latest(registry)
+    assert 'http_requests_total{status="200"} 11' in text
+    assert "pool_connections 3" in text
+
+
+def test_gunicorn_hooks_share_and_clean_the_directory(tmp_path, monkeypatch):
+    server = SimpleNamespace(log=logging.getLogger("gunicorn.error"))
+    (tmp_path / "1234.db").write_bytes(b"")  # left over from a previous run
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+    gunicorn_conf.on_starting(server)
+    assert os.listdir(tmp_path) == []
+
+    MmapValueFile(os.path.join(str(tmp_path), "4321.db")).set(
+        sample_key("http_requests", "http_requests_total", {}), 2
+    )
+    gunicorn_conf.child_exit(server, SimpleNamespace(pid=4321))
+    assert dict(read_values(str(tmp_path / "archive.db"))) == {
+        sample_key("http_requests", "http_requests_total", {}): 2
+    }
+
+    monkeypatch.delenv("METRICS_DIR")
+    gunicorn_conf.on_starting(server)
+    assert os.path.isdir(os.environ["METRICS_DIR"])  # one temp dir, inherited by the workers
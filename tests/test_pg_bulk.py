@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Bulk write helper tests (no server needed)."""
+
+__updated__ = "2026-10-17 22:31:08"
+
+import datetime
+
+from skelv2.db import pg_bulk
+
+
+def test_copy_stream_encodes_rows_incrementally():
+    produced = []
+
+    def rows():
+        for i in range(1000):
+            produced.append(i)
+            yield (i, "tab\there", None, True, datetime.date(2026, 10, 17), b"\x01", {"k": "v"})
+
+    stream = pg_bulk.CopyStream(rows())
+    first = stream.read(200)
+    assert len(first) == 200
+    assert len(produced) < 10  # only what one read needed
+    assert first.startswith('0\ttab\\there\t\\N\tt\t2026-10-17\t\\\\x01\t{"k":"v"}\n')
+
+    rest = stream.read()
+    assert (first + rest).count("\n") == 1000
+    assert stream.rows == 1000
+    assert stream.read(10) == ""
+
+
+def test_insert_sql_and_paging(monkeypatch):
+    assert pg_bulk.insert_sql("ops.qso", ["id", "call"], conflict_columns=["id"], update_columns=["call"]) == (
+        'INSERT INTO "ops"."qso" ("id", "call") VALUES %s '
+        'ON CONFLICT ("id") DO UPDATE SET "call" = EXCLUDED."call"'
+    )
+    assert pg_bulk.insert_sql("qso", ["id"], conflict_columns=["id"]).endswith('ON CONFLICT ("id") DO NOTHING')
+
+    pages = []
+    monkeypatch.setattr(pg_bulk, "execute_values", lambda cur, sql, page, page_size: pages.append(len(page)))
+    sent = pg_bulk.insert_many(None, "qso", ["id"], ((i,) for i in range(25)), page_size=10)
+    assert sent == 25
+    assert pages == [10, 10, 5]
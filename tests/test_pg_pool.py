@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Blocking Postgres pool tests (fake connections, no server needed)."""
+
+__updated__ = "2026-10-17 20:47:36"
+
+import threading
+import time
+
+import pytest
+from psycopg2 import extensions
+
+from skelv2.db.pg_pool import BlockingPgPool, PoolTimeout
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        pass
+
+
+class FakeConn:
+    def __init__(self):
+        self.closed = 0
+        self.autocommit = False
+        self.info = FakeInfo()
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor()
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_checkout_waits_then_times_out():
+    pool = BlockingPgPool(FakeConn, minconn=0, maxconn=1, timeout=0.1)
+    conn = pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+
+    released = threading.Timer(0.05, pool.putconn, args=(conn,))
+    released.start()
+    started = time.monotonic()
+    with pool.connection(timeout=1) as again:
+        assert again is conn
+    assert time.monotonic() - started >= 0.04
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1
+    assert stats["checkouts_waited"] == 1
+    assert stats["in_use"] == 0 and stats["idle"] == 1
+
+
+def test_concurrent_checkouts_never_exceed_maxconn():
+    pool = BlockingPgPool(FakeConn, minconn=0, maxconn=3, timeout=5)
+    peak = []
+
+    def work():
+        for _ in range(50):
+            with pool.connection():
+                peak.append(pool.stats()["in_use"])
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(peak) <= 3
+    assert pool.stats()["size"] <= 3
+
+
+def test_broken_transaction_is_rolled_back_and_closed_conn_replaced():
+    pool = BlockingPgPool(FakeConn, minconn=0, maxconn=2)
+    conn = pool.getconn()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+
+    conn.closed = 2  # dropped by the server while idle
+    fresh = pool.getconn()
+    assert fresh is not conn
+    assert pool.stats()["replaced"] == 1
+
+
+def test_lifetime_and_idle_reaping():
+    clock = FakeClock()
+    pool = BlockingPgPool(FakeConn, minconn=1, maxconn=3, max_lifetime=100, max_idle=10, clock=clock)
+    first, second = pool.getconn(), pool.getconn()
+    pool.putconn(first)
+    pool.putconn(second)
+    assert pool.stats()["idle"] == 2
+
+    clock.now = 20
+    assert pool.reap() == 1  # minconn survives idling
+    clock.now = 120
+    assert pool.reap() == 1  # but not its lifetime
+    assert pool.stats()["size"] == 0
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Request-scoped Postgres connection tests (fake pool, no server needed)."""
+
+__updated__ = "2026-10-17 21:08:55"
+
+import pytest
+from flask import Flask
+from psycopg2 import extensions
+
+from skelv2.util.pg_request import get_db, init_request_pg, read_only, transaction
+
+
+class FakeInfo:
+    transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeCursor:
+    def __init__(self, log):
+        self.log = log
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql):
+        self.log.append(sql)
+
+
+class FakeConn:
+    def __init__(self):
+        self.log = []
+        self.info = FakeInfo()
+
+    def cursor(self):
+        return FakeCursor(self.log)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+class FakePool:
+    def __init__(self):
+        self.checkouts = 0
+        self.returned = []
+
+    def getconn(self):
+        self.checkouts += 1
+        return FakeConn()
+
+    def putconn(self, conn):
+        self.returned.append(conn)
+
+
+@pytest.fixture
+def app_and_pool():
+    app = Flask(__name__)
+    pool = FakePool()
+    init_request_pg(app, pool)
+    return app, pool
+
+
+def test_one_lazy_checkout_per_request_released_on_error(app_and_pool):
+    app, pool = app_and_pool
+
+    @app.route("/boom")
+    def boom():
+        assert get_db() is get_db()
+        raise RuntimeError("handler failed")
+
+    @app.route("/nothing")
+    def nothing():
+        return "ok"
+
+    client = app.test_client()
+    assert client.get("/nothing").status_code == 200
+    assert pool.checkouts == 0
+    assert client.get("/boom").status_code == 500
+    assert pool.checkouts == 1
+    assert len(pool.returned) == 1
+
+
+def test_transaction_helpers(app_and_pool):
+    app, _ = app_and_pool
+    with app.test_request_context():
+        with transaction() as cur:
+            cur.execute("INSERT outer")
+            with pytest.raises(ValueError):
+                with transaction() as inner:
+                    inner.execute("INSERT inner")
+                    raise ValueError
+        with read_only() as cur:
+            cur.execute("SELECT 1")
+        log = get_db().log
+
+    assert log == [
+        "INSERT outer",
+        "SAVEPOINT request_sp_1;",
+        "INSERT inner",
+        "ROLLBACK TO SAVEPOINT request_sp_1;",
+        "COMMIT",
+        "SET TRANSACTION READ ONLY;",
+        "SELECT 1",
+        "COMMIT",
+    ]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Prepared statement registry tests (fake connections, no server needed)."""
+
+__updated__ = "2026-10-17 21:35:02"
+
+import pytest
+from psycopg2 import errors, extensions
+
+from skelv2.db.pg_statements import PreparedStatements, Statement
+
+
+class FakeInfo:
+    def __init__(self):
+        self.backend_pid = 100
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+
+class FakeConn:
+    def __init__(self):
+        self.info = FakeInfo()
+        self.server_statements = set()
+        self.log = []
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.connection = conn
+
+    def execute(self, sql, params=None):
+        conn = self.connection
+        conn.log.append(sql)
+        if sql.startswith("PREPARE "):
+            conn.server_statements.add(sql.split()[1])
+        elif sql.startswith("EXECUTE "):
+            name = sql.split()[1].rstrip(";")
+            if name not in conn.server_statements:
+                raise errors.InvalidSqlStatementName(f"prepared statement {name} does not exist")
+
+
+def test_statement_rewrites_placeholders():
+    positional = Statement("by_id", "SELECT * FROM t WHERE id = %s AND name LIKE 'a%%' AND x = %s")
+    assert positional.server_sql == "SELECT * FROM t WHERE id = $1 AND name LIKE 'a%' AND x = $2"
+    assert positional.execute_sql() == "EXECUTE by_id (%s, %s);"
+
+    named = Statement("by_name", "SELECT %(a)s, %(b)s, %(a)s")
+    assert named.server_sql == "SELECT $1, $2, $1"
+    assert named.bind({"b": 2, "a": 1}) == (1, 2)
+
+    with pytest.raises(ValueError):
+        Statement("Bad-Name", "SELECT 1")
+
+
+def test_prepares_once_per_connection_and_backend():
+    statements = PreparedStatements()
+    statements.register("by_id", "SELECT %s")
+    conn = FakeConn()
+    cursor = FakeCursor(conn)
+
+    statements.execute(cursor, "by_id", (1,))
+    statements.execute(cursor, "by_id", (2,))
+    assert [sql for sql in conn.log if sql.startswith("PREPARE")] == ["PREPARE by_id AS SELECT $1"]
+
+    # Reconnected under the same object: new backend, prepare again
+    conn.info.backend_pid = 200
+    conn.server_statements.clear()
+    statements.execute(cursor, "by_id", (3,))
+    assert statements.stats()["prepares"] == 2
+
+    other = FakeConn()
+    statements.execute(FakeCursor(other), "by_id", (4,))
+    assert statements.stats() == {"statements": 1, "connections": 2, "prepares": 3, "executions": 4}
+
+
+def test_lost_statements_are_prepared_again():
+    statements = PreparedStatements()
+    statements.register("by_id", "SELECT %s")
+    conn = FakeConn()
+    cursor = FakeCursor(conn)
+    statements.execute(cursor, "by_id", (1,))
+
+    conn.server_statements.clear()  # DISCARD ALL behind our back
+    statements.execute(cursor, "by_id", (2,))
+    assert conn.log[-3:] == ["ROLLBACK", "PREPARE by_id AS SELECT $1", "EXECUTE by_id (%s);"]
+
+    # Mid-transaction the failure cannot be replayed: surface it, recover next time
+    conn.server_statements.clear()
+    conn.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    with pytest.raises(errors.InvalidSqlStatementName):
+        statements.execute(cursor, "by_id", (3,))
+    assert not statements.is_prepared(conn, "by_id")
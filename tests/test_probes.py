@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Background dependency prober tests."""
+
+__updated__ = "2026-10-17 20:14:20"
+
+import threading
+import time
+
+from skelv2.api.probes import DependencyProber
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_snapshot_reports_cached_status_latency_and_age():
+    clock = FakeClock()
+    calls = []
+
+    def ok():
+        calls.append("ok")
+        clock.now += 0.25
+
+    def broken():
+        raise ConnectionError("refused")
+
+    prober = DependencyProber({"pg": ok, "redis": broken}, interval=5, clock=clock)
+    assert prober.snapshot()["pg"] == {"status": "pending"}
+
+    prober.probe_once()
+    clock.now += 2
+    snapshot = prober.snapshot()
+    snapshot2 = prober.snapshot()
+    assert calls == ["ok"]  # reading the snapshot never runs a check
+    assert snapshot == snapshot2
+    assert snapshot["pg"] == {"status": "ok", "latency_ms": 250.0, "age_s": 2.0}
+    assert snapshot["redis"]["status"] == "error"
+    assert snapshot["redis"]["error"] == "refused"
+
+    clock.now += 15
+    assert prober.snapshot()["pg"]["status"] == "stale"
+
+
+class HangingCheck:
+    def __init__(self):
+        self.released = threading.Event()
+        self.cancelled = False
+
+    def __call__(self):
+        self.released.wait(5)
+
+    def cancel(self):
+        self.cancelled = True
+        self.released.set()
+
+
+def test_checks_run_concurrently_under_one_deadline():
+    hanging = HangingCheck()
+    checks = {f"slow{i}": (lambda: time.sleep(0.2)) for i in range(4)}
+    checks["hung"] = hanging
+    prober = DependencyProber(checks, deadline=0.5)
+
+    started = time.monotonic()
+    prober.probe_once()
+    elapsed = time.monotonic() - started
+
+    snapshot = prober.snapshot()
+    assert elapsed < 0.8  # not 4 x 0.2 + 0.5
+    assert all(snapshot[f"slow{i}"]["status"] == "ok" for i in range(4))
+    assert snapshot["hung"]["status"] == "timeout"
+    assert hanging.cancelled
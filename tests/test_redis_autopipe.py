@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Auto-pipelining wrapper tests (fake Redis, no server needed)."""
+
+__updated__ = "2026-10-18 08:27:15"
+
+import threading
+
+import pytest
+import redis
+
+from skelv2.db.redis_apikeys import get_apikey_metadata_many
+from skelv2.db.redis_autopipe import AutoPipeline
+
+
+class FakePipeline:
+    def __init__(self, server):
+        self.server = server
+        self.calls = []
+
+    def hgetall(self, key):
+        self.calls.append(lambda: self.server.data.get(key, {}))
+
+    def get(self, key):
+        self.calls.append(lambda: self.server.data.get(key))
+
+    def incr(self, key):
+        def run():
+            if isinstance(self.server.data.get(key), dict):
+                return ValueError("WRONGTYPE")
+            self.server.data[key] = self.server.data.get(key, 0) + 1
+            return self.server.data[key]
+
+        self.calls.append(run)
+
+    def execute(self, raise_on_error=True):  # pylint: disable=unused-argument
+        self.server.round_trips += 1
+        # Slow round trip: lets commands of other threads queue up meanwhile
+        self.server.gate.wait(0.01)
+        return [call() for call in self.calls]
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+        self.gate = threading.Event()
+
+    def pipeline(self, transaction=True, shard_hint=None):  # pylint: disable=unused-argument
+        return FakePipeline(self)
+
+    def get(self, key):  # only here so AutoPipeline knows the command exists
+        raise AssertionError("must go through a pipeline")
+
+    incr = hgetall = get
+
+
+def test_concurrent_commands_share_round_trips():
+    server = FakeRedis()
+    autopipe = AutoPipeline(server)
+    results = []
+
+    def worker():
+        for _ in range(10):
+            results.append(autopipe.incr("hits"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == list(range(1, 81))
+    assert server.round_trips < 80
+    assert autopipe.stats()["commands"] == 80
+
+
+def test_batch_errors_and_bulk_apikeys():
+    server = FakeRedis()
+    server.data = {
+        "apikey:a": {b"customer_id": b"c1", b"disabled": b"0"},
+        "apikey:b": {b"customer_id": b"c2", b"disabled": b"1"},
+    }
+    autopipe = AutoPipeline(server)
+    with autopipe.batch() as batch:
+        counter = batch.incr("n")
+        broken = batch.incr("apikey:a")
+    assert server.round_trips == 1
+    assert counter.result() == 1
+    with pytest.raises(ValueError):
+        broken.result()
+
+    found = get_apikey_metadata_many(autopipe, ["a", "b", "missing", "a"])
+    assert server.round_trips == 2
+    assert found["a"]["customer_id"] == "c1"
+    assert found["b"] is None and found["missing"] is None
+
+
+class StallingRedis(FakeRedis):
+    """FakeRedis whose round trips hang until `release` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.sending = threading.Event()
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
+
+        def stalled(raise_on_error=True):
+            self.sending.set()
+            self.release.wait(5)
+            return execute(raise_on_error)
+
+        pipe.execute = stalled
+        return pipe
+
+
+def test_stalled_flusher_times_out_instead_of_hanging():
+    server = StallingRedis()
+    autopipe = AutoPipeline(server, timeout=0.05)
+
+    first = autopipe.submit("incr", "hits")  # occupies the flusher
+    assert server.sending.wait(5)
+    with pytest.raises(redis.exceptions.TimeoutError):
+        autopipe.incr("hits")  # queued behind it, gives up
+    server.release.set()
+
+    assert first.result(5) == 1
+    assert autopipe.incr("hits") == 2  # the abandoned command was never sent
+
+
+def test_default_timeout_follows_the_socket_timeout():
+    client = redis.Redis(socket_timeout=0.5)
+    assert AutoPipeline(client, window_us=200).timeout == pytest.approx(0.5002)
+    assert AutoPipeline(FakeRedis()).timeout is None
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Blocking Redis pool tests (fake connections, no server needed)."""
+
+__updated__ = "2026-10-18 06:46:03"
+
+import threading
+import time
+
+import pytest
+import redis
+
+from skelv2 import db
+from skelv2.api import health
+from skelv2.db.redis_pool import InstrumentedBlockingConnectionPool, RedisPoolTimeout, create_redis_pool
+
+
+class FakeConnection(redis.Connection):
+    def connect(self):
+        if self._sock is None:
+            self._sock = object()
+
+    def disconnect(self, *args):
+        self._sock = None
+
+    def can_read(self, timeout=0):
+        return False
+
+
+def make_pool(**kwargs):
+    kwargs.setdefault("max_connections", 2)
+    kwargs.setdefault("timeout", 0.05)
+    return InstrumentedBlockingConnectionPool(connection_class=FakeConnection, **kwargs)
+
+
+def test_create_redis_pool_applies_config_and_overrides():
+    config = {
+        "REDIS_HOST": "redis",
+        "REDIS_PORT": 6379,
+        "REDIS_DB": 0,
+        "REDIS_MAX_CONN": 7,
+        "REDIS_POOL_TIMEOUT": 3,
+        "REDIS_KEEPALIVE": True,
+        "REDIS_HEALTH_CHECK_INTERVAL": 15,
+    }
+    pool = create_redis_pool(config, socket_timeout=0.5)
+
+    assert pool.max_connections == 7
+    assert pool.timeout == 3
+    assert pool.connection_kwargs["socket_keepalive"] is True
+    assert pool.connection_kwargs["health_check_interval"] == 15
+    assert pool.connection_kwargs["socket_timeout"] == 0.5
+
+
+def test_dedicated_pools_wait_no_longer_than_their_budget(monkeypatch):
+    config = {
+        "REDIS_HOST": "redis",
+        "REDIS_PORT": 6379,
+        "REDIS_DB": 0,
+        "REDIS_ENABLED": True,
+        "REDIS_POOL_TIMEOUT": 5,
+        "RATELIMIT_TIMEOUT_MS": 50,
+        "READY_CHECK_TIMEOUT": 2,
+        "APIKEY_CACHE_ENABLED": False,
+        "APIKEY_NEGATIVE_ENABLED": False,
+        "QUOTA_ENABLED": False,
+    }
+    created = []
+
+    def spy(config, **overrides):
+        created.append(create_redis_pool(config, **overrides))
+        return created[-1]
+
+    monkeypatch.setattr(db, "create_redis_pool", spy)
+    monkeypatch.setattr(health, "create_redis_pool", spy)
+    db.init_apikey_stores(config, {"redis": redis.Redis()})
+    health.build_prober(config, {"redis": object()})
+
+    ratelimit_pool, probe_pool = created
+    assert ratelimit_pool.timeout == 0.05 and ratelimit_pool.connection_kwargs["socket_timeout"] == 0.05
+    assert probe_pool.timeout == 2 and probe_pool.connection_kwargs["socket_timeout"] == 2
+
+
+def test_exhausted_pool_waits_then_times_out():
+    pool = make_pool()
+    first = pool.get_connection()
+    second = pool.get_connection()
+    assert pool.stats()["in_use"] == 2
+
+    with pytest.raises(RedisPoolTimeout):
+        pool.get_connection()
+
+    # A release during the wait hands the connection over
+    threading.Timer(0.01, pool.release, args=(first,)).start()
+    pool.timeout = 1.0
+    assert pool.get_connection() is first
+
+    pool.release(first)
+    pool.release(second)
+    stats = pool.stats()
+    assert stats["in_use"] == 0
+    assert stats["idle"] == 2
+    assert stats["timeouts"] == 1
+    assert stats["checkouts"] == 3
+    assert stats["wait_max_ms"] > 0
+
+
+def test_trim_idle_closes_old_sockets_only():
+    pool = make_pool(max_idle_time=60)
+    old = pool.get_connection()
+    recent = pool.get_connection()
+    pool.release(old)
+    pool.release(recent)
+    old._skel_released_at = time.monotonic() - 120
+
+    assert pool.trim_idle() == 1
+    assert old._sock is None and recent._sock is not None
+    assert pool.stats()["idle"] == 1
+
+    # The trimmed slot reconnects when handed out again
+    conns = [pool.get_connection(), pool.get_connection()]
+    assert all(conn._sock is not None for conn in conns)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Streaming response tests (fake named cursor, no server needed)."""
+
+__updated__ = "2026-10-17 22:08:19"
+
+import json
+
+import pytest
+from flask import Flask
+
+from skelv2.api.streaming import stream_query
+
+ROWS = [(i, f"EA{i}XYZ") for i in range(7)]
+
+
+class FakeNamedCursor:
+    def __init__(self, name):
+        self.name = name
+        self.itersize = None
+        self.closed = False
+        self.description = None
+        self.fetches = 0
+        self._position = 0
+
+    def execute(self, sql, params=None):
+        self.sql = sql
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        self.description = (("id",), ("callsign",))
+        batch = ROWS[self._position : self._position + size]
+        self._position += len(batch)
+        return batch
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConn:
+    def cursor(self, name=None):
+        assert name, "streaming must use a named (server-side) cursor"
+        self.last_cursor = FakeNamedCursor(name)
+        return self.last_cursor
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConn()
+        self.returned = 0
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn):
+        self.returned += 1
+
+
+@pytest.fixture
+def app():
+    return Flask(__name__)
+
+
+def test_ndjson_and_json_array(app):
+    pool = FakePool()
+    with app.test_request_context():
+        response = stream_query("SELECT 1", fmt="ndjson", itersize=3, pg_pool=pool)
+        chunks = list(response.response)
+        response.close()
+    assert len(chunks) == 3  # one chunk per batch of 3
+    lines = "".join(chunks).splitlines()
+    assert json.loads(lines[0]) == {"id": 0, "callsign": "EA0XYZ"}
+    assert len(lines) == 7
+    assert pool.returned == 1
+    assert pool.conn.last_cursor.closed
+
+    with app.test_request_context():
+        response = stream_query("SELECT 1", fmt="json", itersize=4, pg_pool=pool)
+        body = "".join(response.response)
+        response.close()
+    assert [row["id"] for row in json.loads(body)] == list(range(7))
+    assert pool.returned == 2
+
+
+def test_client_disconnect_releases_connection(app):
+    pool = FakePool()
+    with app.test_request_context():
+        response = stream_query("SELECT 1", itersize=2, pg_pool=pool)
+        body = iter(response.response)
+        next(body)
+        # The WSGI server closes the body when the client goes away
+        response.close()
+    assert pool.returned == 1
+    assert pool.conn.last_cursor.fetches == 1
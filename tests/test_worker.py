@@ -5,7 +5,7 @@
 
 """Worker runtime tests."""
 
-__updated__ = "2025-12-15 20:43:24"
+__updated__ = "2026-10-18 09:24:02"
 
 import logging
 import pytest
@@ -22,3 +22,24 @@ def test_perform_work_logs_heartbeat(worker_config, caplog):
     caplog.set_level(logging.INFO, logger="skelv2.worker.runtime")
     worker_runtime._perform_work(worker_config, {})  # noqa: SLF001
     assert "Worker heartbeat" in caplog.text
+
+
+def test_placeholder_fetch_work_runs_perform_work(worker_config, monkeypatch):
+    stops, ran = [], []
+
+    def perform(config, stores, unit=None):
+        ran.append(unit)
+        stops[0].set()
+
+    monkeypatch.setattr(worker_runtime, "init_logging", lambda config: None)
+    monkeypatch.setattr(worker_runtime, "install_stop_signals", stops.append)
+    monkeypatch.setattr(worker_runtime, "_perform_work", perform)
+    monkeypatch.setattr(worker_runtime, "_last_tick", None)
+    worker_runtime.run_worker_process(dict(worker_config, WORKER_POLL_INTERVAL=1, WORKER_DRAIN_TIMEOUT=5))
+    assert ran == [None]
+
+    # One unit per poll interval, which keeps the idle backoff going
+    assert worker_runtime._fetch_work(worker_config, {}) == []  # noqa: SLF001
+    monkeypatch.setattr(worker_runtime, "_last_tick", worker_runtime._last_tick - 5)  # noqa: SLF001
+    units = worker_runtime._fetch_work(worker_config, {})  # noqa: SLF001
+    assert units == [None] and isinstance(units, worker_runtime.IntervalUnits)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Worker executor tests."""
+
+__updated__ = "2026-10-18 01:21:37"
+
+import logging
+import threading
+
+import pytest
+
+from skelv2.worker.executor import WorkExecutor
+
+
+def test_submit_blocks_at_max_in_flight():
+    release = threading.Event()
+    started = []
+
+    def handler(unit):
+        started.append(unit)
+        release.wait(5)
+
+    executor = WorkExecutor(handler, size=1, max_in_flight=2)
+    executor.submit(1)
+    executor.submit(2)
+    assert executor.in_flight == 2
+
+    third = threading.Thread(target=executor.submit, args=(3,))
+    third.start()
+    third.join(0.1)
+    assert third.is_alive()  # waiting for a slot
+
+    release.set()
+    third.join(5)
+    assert executor.shutdown(5) is True
+    assert started == [1, 2, 3]
+    assert executor.stats()["completed"] == 3
+
+
+def test_shutdown_reports_units_that_miss_the_drain_deadline():
+    release = threading.Event()
+    executor = WorkExecutor(lambda unit: release.wait(5), size=1)
+    executor.submit(None)
+
+    assert executor.shutdown(0.05) is False
+    release.set()
+    with pytest.raises(RuntimeError):
+        executor.submit(None)
+
+
+def test_failures_and_throughput_are_logged(caplog):
+    caplog.set_level(logging.INFO, logger="skelv2.worker.executor")
+
+    def handler(unit):
+        if unit == "bad":
+            raise ValueError("boom")
+
+    executor = WorkExecutor(handler, size=2)
+    for unit in ("ok", "bad", "ok"):
+        executor.submit(unit)
+    assert executor.shutdown(5) is True
+
+    stats = executor.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"]) == (2, 1, 0)
+    assert "Worker unit failed" in caplog.text
+    summary = [r for r in caplog.records if r.getMessage() == "Worker throughput"][-1]
+    assert summary.worker["units"] == 3
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Postgres job queue tests (fake pool, no server needed)."""
+
+__updated__ = "2026-10-18 09:38:05"
+
+from contextlib import contextmanager
+
+import psycopg2
+
+from skelv2.worker.pg_queue import PgJob, PgQueueSource
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self._rows = []
+        self.rowcount = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append((" ".join(sql.split()), params))
+        self._rows = self.conn.results.pop(0) if self.conn.results else []
+        self.rowcount = len(self._rows)
+
+    def fetchall(self):
+        return self._rows
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+
+class FakeConn:
+    def __init__(self, results):
+        self.results = results
+        self.executed = []
+        self.commits = 0
+        self.autocommit = False
+        self.notifies = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+        self.returned = []
+
+    @contextmanager
+    def connection(self):
+        yield self.conn
+
+    def getconn(self):
+        return self.conn
+
+    def putconn(self, conn, close=False):
+        self.returned.append((conn, close))
+
+
+def test_fetch_claims_one_batch_with_skip_locked():
+    conn = FakeConn([[], [(2, {"n": 2}, 1), (1, {"n": 1}, 3)]])
+    source = PgQueueSource(FakePool(conn), channel=None, batch_size=10, visibility_timeout=60)
+
+    assert source.fetch() == [[PgJob(1, {"n": 1}, 3), PgJob(2, {"n": 2}, 1)]]
+    sql, params = conn.executed[1]
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert params == {"queue": "default", "limit": 10, "visibility": 60.0, "max_attempts": 5}
+    assert conn.commits == 1
+
+
+def test_timed_out_poison_jobs_are_dead_lettered_not_reclaimed():
+    # The dead-letter update hits two exhausted jobs, the claim finds nothing
+    conn = FakeConn([[None, None], [], [(None,)]])
+    source = PgQueueSource(FakePool(conn), channel=None, max_attempts=3, max_wait=0.01)
+
+    assert source.fetch() == []
+    dead_sql, dead_params = conn.executed[0]
+    assert "SET failed_at = now()" in dead_sql and "attempts >= %(max_attempts)s" in dead_sql
+    assert dead_params == {"queue": "default", "max_attempts": 3}
+    claim_sql, claim_params = conn.executed[1]
+    assert "attempts < %(max_attempts)s" in claim_sql and claim_params["max_attempts"] == 3
+    assert source.stats()["dead_lettered"] == 2
+
+
+def test_empty_queue_returns_nothing_and_checks_next_due():
+    conn = FakeConn([[], [], [(None,)]])
+    source = PgQueueSource(FakePool(conn), channel=None, max_wait=0.01)
+
+    assert source.fetch() == []
+    assert "min(run_at)" in conn.executed[2][0]
+
+
+def test_done_deletes_or_schedules_a_retry():
+    conn = FakeConn([[None, None], [None, None]])
+    source = PgQueueSource(FakePool(conn), channel=None, max_attempts=3, retry_delay=5)
+    batch = [PgJob(1, {}, 1), PgJob(2, {}, 3)]
+
+    source.done(batch, True)
+    source.done(batch, False, "ValueError('boom')")
+
+    delete_sql, delete_params = conn.executed[0]
+    assert delete_sql.startswith("DELETE") and delete_params == {"ids": [1, 2], "attempts": [1, 3]}
+    retry_sql, retry_params = conn.executed[1]
+    assert "failed_at = CASE WHEN job.attempts >=" in retry_sql
+    assert retry_params == {
+        "ids": [1, 2],
+        "attempts": [1, 3],
+        "max_attempts": 3,
+        "delay": 5.0,
+        "error": "ValueError('boom')",
+    }
+    assert source.stats()["completed"] == 2 and source.stats()["retried"] == 2
+
+
+def test_done_ignores_jobs_reclaimed_by_another_worker():
+    # Job 2 timed out and was claimed again (attempt 2): only job 1 matches
+    conn = FakeConn([[None], [None]])
+    source = PgQueueSource(FakePool(conn), channel=None)
+    batch = [PgJob(1, {}, 1), PgJob(2, {}, 1)]
+
+    source.done(batch, True)
+    source.done(batch, False, "boom")
+
+    for sql, _ in conn.executed:
+        assert "job.attempts = claim.attempts" in sql
+    stats = source.stats()
+    assert (stats["completed"], stats["retried"], stats["stale"]) == (1, 1, 2)
+
+
+def test_close_unlistens_before_returning_the_listener():
+    conn = FakeConn([])
+    pool = FakePool(conn)
+    source = PgQueueSource(pool, channel="jobs")
+    source._ensure_listener()
+    assert conn.executed[-1] == ('LISTEN "jobs"', None) and conn.autocommit
+
+    conn.notifies.append("stale")
+    source.close()
+
+    assert conn.executed[-1] == ("UNLISTEN *", None)
+    assert not conn.notifies and not conn.autocommit
+    assert pool.returned == [(conn, False)]
+    assert not source.stats()["listening"]
+
+
+def test_close_discards_a_listener_that_cannot_unlisten():
+    class BrokenConn(FakeConn):
+        def cursor(self):
+            raise psycopg2.OperationalError("connection closed")
+
+    conn = BrokenConn([])
+    pool = FakePool(conn)
+    source = PgQueueSource(pool, channel="jobs")
+    source._listener = conn
+
+    source.close()
+
+    assert pool.returned == [(conn, True)]
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Redis Streams job source tests (fake Redis, no server needed)."""
+
+__updated__ = "2026-10-18 07:24:16"
+
+import redis
+
+from skelv2.worker.redis_stream import RedisStreamSource, StreamMessage
+
+
+class FakeStreamRedis:
+    def __init__(self):
+        self.entries = []
+        self.pending = {}  # id -> (consumer, fields)
+        self.acks = []
+        self.groups = set()
+        self.claimable = []
+        self.deliveries = {}  # id -> times delivered
+        self.added = []
+        self.blocks = []
+
+    def xgroup_create(self, stream, group, id="$", mkstream=False):
+        if (stream, group) in self.groups:
+            raise redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.groups.add((stream, group))
+
+    def xreadgroup(self, group, consumer, streams, count=None, block=None):
+        self.blocks.append(block)
+        stream = next(iter(streams))
+        taken, self.entries = self.entries[:count], self.entries[count:]
+        for entry_id, fields in taken:
+            self.pending[entry_id] = (consumer, fields)
+        return [[stream.encode(), taken]] if taken else []
+
+    def xautoclaim(self, stream, group, consumer, min_idle_time, start_id="0-0", count=None):
+        claimed, self.claimable = self.claimable, []
+        return [b"0-0", claimed, []]
+
+    def xack(self, stream, group, *ids):
+        self.acks.append(ids)
+        return len(ids)
+
+    def xpending_range(self, stream, group, min, max, count):  # pylint: disable=redefined-builtin
+        return [{"message_id": min.encode(), "times_delivered": self.deliveries.get(min, 1)}]
+
+    def xadd(self, stream, fields):
+        self.added.append((stream, fields))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    def execute(self):
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+def test_fetch_reads_batches_and_acks_them_together():
+    client = FakeStreamRedis()
+    client.entries = [(f"{i}-0".encode(), {b"n": str(i).encode()}) for i in range(5)]
+    source = RedisStreamSource(client, "jobs", "workers", "c1", batch_size=2)
+
+    first, second = source.fetch()[0], source.fetch()[0]
+    assert first == [StreamMessage("0-0", {b"n": b"0"}), StreamMessage("1-0", {b"n": b"1"})]
+
+    source.done(first, ok=True)
+    assert client.acks == [("0-0", "1-0")]  # batch_size ids waiting -> one XACK
+
+    source.done(second, ok=False)
+    source.fetch()
+    assert client.acks == [("0-0", "1-0")]  # failed batch stays pending
+    assert source.stats()["received"] == 5
+
+
+def test_existing_group_and_reclaimed_entries():
+    client = FakeStreamRedis()
+    client.groups.add(("jobs", "workers"))
+    client.claimable = [(b"7-0", {b"n": b"7"}), (b"8-0", None)]  # 8-0 was deleted
+    source = RedisStreamSource(client, "jobs", "workers", "c2", claim_interval=30)
+
+    assert source.fetch() == [[StreamMessage("7-0", {b"n": b"7"})]]
+    # Next claim only after claim_interval: the empty stream is read instead
+    assert source.fetch() == []
+    assert source.stats()["claimed"] == 1
+
+
+def test_zero_block_ms_does_not_claim_to_block():
+    client = FakeStreamRedis()
+    source = RedisStreamSource(client, "jobs", "workers", "c1", block_ms=0)
+
+    assert source.blocking is False  # the worker loop applies its poll delays
+    assert source.fetch() == []
+    assert client.blocks == [None]
+
+
+def test_entries_past_max_deliveries_go_to_the_dead_letter_stream():
+    client = FakeStreamRedis()
+    client.groups.add(("jobs", "workers"))
+    client.claimable = [(b"7-0", {b"n": b"7"}), (b"9-0", {b"n": b"9"})]
+    client.deliveries = {"7-0": 4, "9-0": 2}
+    source = RedisStreamSource(client, "jobs", "workers", "c2", max_deliveries=3)
+
+    assert source.fetch() == [[StreamMessage("9-0", {b"n": b"9"})]]
+    assert client.added == [
+        ("jobs:dead", {b"n": b"7", "dead_letter_id": "7-0", "dead_letter_deliveries": 4}),
+    ]
+    assert client.acks == [("7-0",)]
+    assert source.stats()["dead_lettered"] == 1 and source.stats()["claimed"] == 1
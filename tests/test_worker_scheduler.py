@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903
+
+"""Worker scheduler tests."""
+
+__updated__ = "2026-10-18 06:54:05"
+
+import datetime
+import logging
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from skelv2.worker.scheduler import Backoff, CronSchedule, Scheduler, WakeupEvent, install_stop_signals
+
+UTC = datetime.timezone.utc
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_backoff_grows_with_jitter_and_resets():
+    backoff = Backoff(initial=0.1, maximum=1.0, factor=2.0, jitter=0.5, rand=lambda: 1.0)
+    assert [round(backoff.next_delay(), 3) for _ in range(5)] == [0.15, 0.3, 0.6, 1.0, 1.0]
+    backoff.reset()
+    assert backoff.next_delay() == pytest.approx(0.15)
+
+
+def test_cron_next_after():
+    start = datetime.datetime(2026, 1, 30, 23, 59, 30, tzinfo=UTC)  # a Friday
+    assert CronSchedule("*/15 * * * *").next_after(start) == datetime.datetime(2026, 1, 31, 0, 0, tzinfo=UTC)
+    # Weekdays only: Saturday the 31st is skipped
+    assert CronSchedule("30 3 * * 1-5").next_after(start) == datetime.datetime(2026, 2, 2, 3, 30, tzinfo=UTC)
+    # Day and weekday both restricted: either matches (the 1st, or a Sunday)
+    assert CronSchedule("0 0 1 * 0").next_after(start) == datetime.datetime(2026, 2, 1, 0, 0, tzinfo=UTC)
+    with pytest.raises(ValueError):
+        CronSchedule("61 * * * *")
+
+
+def test_scheduler_runs_due_tasks_from_one_heap():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock, utcnow=lambda: datetime.datetime(2026, 1, 1, 0, 0, 30, tzinfo=UTC))
+    runs = []
+    fast = scheduler.every(10, lambda: runs.append("fast"))
+    scheduler.every(25, lambda: runs.append("slow"))
+    scheduler.cron("* * * * *", lambda: runs.append("cron"))  # next minute: 30s away
+
+    assert scheduler.run_pending() == pytest.approx(10)
+    clock.now += 30
+    assert scheduler.run_pending() == pytest.approx(10)  # fast: next due at 140, not 120
+    assert runs.count("fast") == 1 and "slow" in runs and "cron" in runs
+
+    fast.cancel()
+    clock.now += 100
+    runs.clear()
+    scheduler.run_pending()
+    assert "fast" not in runs
+
+
+def test_failing_task_keeps_its_schedule():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock)
+
+    def broken():
+        raise RuntimeError("boom")
+
+    task = scheduler.every(5, broken, run_now=True)
+    scheduler.run_pending()
+    clock.now += 5
+    scheduler.run_pending()
+    assert (task.runs, task.failures) == (2, 2)
+
+
+def test_signal_interrupts_wait_immediately():
+    stop = WakeupEvent()
+    previous = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+    install_stop_signals(stop)
+    try:
+        threading.Timer(0.05, os.kill, args=(os.getpid(), signal.SIGTERM)).start()
+        started = time.monotonic()
+        assert stop.wait(5) is True
+        assert time.monotonic() - started < 2
+        assert stop.signum == signal.SIGTERM
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+
+def test_stop_signal_handler_does_not_log(monkeypatch):
+    # A handler lock held by the interrupted thread would deadlock the handler
+    stop = WakeupEvent()
+    previous = signal.getsignal(signal.SIGTERM)
+    install_stop_signals(stop, (signal.SIGTERM,))
+
+    def forbidden(*_args, **_kwargs):
+        raise AssertionError("logged from a signal handler")
+
+    monkeypatch.setattr(logging.Logger, "_log", forbidden)
+    try:
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert stop.wait(5) is True
+    finally:
+        signal.signal(signal.SIGTERM, previous)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# pylint: disable=W0102,E0712,C0103,R0903,protected-access
+
+"""Worker supervisor tests."""
+
+__updated__ = "2026-10-18 09:31:02"
+
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from skelv2.stdoutlog.async_handler import AsyncJsonStdoutHandler
+from skelv2.worker.supervisor import Supervisor, _exit_code, current_rss_mb
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_crash_restart_backoff_and_recycle():
+    clock = FakeClock()
+    supervisor = Supervisor(lambda: None, 1, restart_delay=1, restart_max_delay=4, stable_after=60, clock=clock)
+    child = supervisor._children[0]
+
+    delays = []
+    for _ in range(4):
+        child.started_at = clock.now
+        supervisor._exited(child, 1)
+        delays.append(child.restart_at - clock.now)
+    assert delays == [1, 2, 4, 4]
+
+    # A clean exit (recycling) is replaced at once and forgets the crashes
+    child.started_at = clock.now - 30
+    supervisor._exited(child, 0)
+    assert child.restart_at == clock.now and child.crashes == 0
+
+    # A crash after a long healthy run starts the backoff over
+    child.crashes = 3
+    child.started_at = clock.now - 120
+    supervisor._exited(child, -9)
+    assert child.restart_at - clock.now == 1
+
+
+@pytest.mark.parametrize("code, expected", [(None, 0), (0, 0), (False, 0), (3, 3), ("fatal", 1), ("", 1)])
+def test_system_exit_codes_follow_the_interpreter(code, expected):
+    assert _exit_code(code) == expected
+    # Same status as a plain interpreter exiting with SystemExit(code)
+    status = subprocess.run([sys.executable, "-c", f"raise SystemExit({code!r})"], capture_output=True, check=False)
+    assert status.returncode == expected
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_child_sys_exit_is_a_clean_exit():
+    def target():
+        sys.exit()
+
+    supervisor = Supervisor(target, 1)
+    pid = os.fork()
+    if pid == 0:
+        supervisor._child_main(0)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+
+
+def test_current_rss_mb_is_positive():
+    assert current_rss_mb() > 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_supervisor_forks_children_and_forwards_sigterm(tmp_path):
+    marker = tmp_path / "started"
+
+    def target():
+        with open(marker, "a", encoding="utf-8") as out:
+            out.write(f"{os.getpid()}\n")
+        time.sleep(30)  # default SIGTERM action ends it
+
+    previous = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD)}
+    supervisor = Supervisor(target, 2, shutdown_timeout=5)
+    threading.Timer(0.5, os.kill, args=(os.getpid(), signal.SIGTERM)).start()
+    try:
+        started = time.monotonic()
+        assert supervisor.run() == 0
+        assert time.monotonic() - started < 5
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    pids = marker.read_text(encoding="utf-8").split()
+    assert len(pids) == 2 and os.getpid() not in map(int, pids)
+    assert all(child.pid is None for child in supervisor._children)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_child_crash_log_is_drained_before_exit(tmp_path):
+    log_path = tmp_path / "child.log"
+
+    def target():
+        # Long flush interval: only the drain on exit can write the records
+        stream = open(log_path, "w", encoding="utf-8")  # pylint: disable=consider-using-with
+        logging.getLogger().addHandler(AsyncJsonStdoutHandler(stream=stream, flush_interval=30))
+        raise RuntimeError("boom")
+
+    supervisor = Supervisor(target, 1)
+    pid = os.fork()
+    if pid == 0:
+        supervisor._child_main(0)
+    _, status = os.waitpid(pid, 0)
+
+    assert os.waitstatus_to_exitcode(status) == 1
+    assert "Worker child 0 crashed" in log_path.read_text(encoding="utf-8")